@@ -81,7 +81,8 @@ class AnalystAgent:
         
         Return a concise paragraph.
         """
-        summary = await llm_service.get_completion(summary_prompt, system_prompt="You are a financial analyst.")
+        # Same headlines and events -> same summary for a while
+        summary = await llm_service.get_completion(summary_prompt, system_prompt="You are a financial analyst.", cache_ttl=900)
         
         # Calculate aggregate scores
         avg_sentiment = sum(a.get('sentiment_score', 0) for a in analyzed_articles) / len(analyzed_articles) if analyzed_articles else 0
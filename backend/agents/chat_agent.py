@@ -10,18 +10,29 @@ logger = logging.getLogger(__name__)
 
 class ChatAgent:
     def __init__(self):
+        self.tools = [fetch_news_tool, fetch_stock_info_tool, fetch_price_history_tool, resolve_symbol_tool]
+        self._build_agent()
+
+    def _build_agent(self):
+        # Built on the shared pooled clients; remember which pool generation they came from
+        self._generation = llm_service.pool.generation
         self.llm = llm_service.get_llm()
         if not self.llm:
             logger.warning("ChatAgent: No LLM available (API Key missing?)")
             self.agent = None
             return
 
-        self.tools = [fetch_news_tool, fetch_stock_info_tool, fetch_price_history_tool, resolve_symbol_tool]
-        
         # Use LangGraph's prebuilt ReAct agent for simplicity and robustness
         self.agent = create_react_agent(self.llm, self.tools)
 
+    def _refresh(self):
+        """Rebuilds the agent after LLMService.reload_keys() replaced the pooled clients."""
+        if self._generation != llm_service.pool.generation:
+            logger.info("ChatAgent: LLM keys changed, rebuilding agent")
+            self._build_agent()
+
     async def stream_message(self, message: str, history: List[Dict[str, str]] = []):
+        self._refresh()
         if not self.agent:
             yield {"type": "content", "data": "I am unable to function because the LLM service is not available. Please check API keys."}
             return
@@ -68,6 +79,7 @@ class ChatAgent:
             yield {"type": "content", "data": f"I encountered an error processing your request: {str(e)}"}
 
     async def processed_message(self, message: str, history: List[Dict[str, str]] = []) -> str:
+        self._refresh()
         if not self.agent:
             return "I am unable to function because the LLM service is not available. Please check API keys."
             
@@ -1,4 +1,4 @@
-from typing import List, Optional, Any, Dict, TypedDict, Annotated
+from typing import List, Optional, Any, AsyncIterator, Dict, Tuple, TypedDict, Annotated
 from pydantic import BaseModel, ConfigDict
 from backend.models import TradeSignal, SignalType, NewsArticle, FinancialEvent, PriceCandle, CompanyInfo
 from .analyst_agent import AnalystAgent
@@ -10,11 +10,13 @@ from backend.configs.settings import settings
 import asyncio
 import logging
 import operator
+import time
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, HumanMessage
 
 from backend.agents.search_tool import resolve_company_query
 from backend.core.memory import memory_manager
+from backend.core.telemetry import Trace, start_trace, traced
 
 logger = logging.getLogger(__name__)
 
@@ -60,8 +62,27 @@ class MasterOutput(BaseModel):
     risk: Dict[str, Any] = {} # New field
     
     agent_confidence: float = 0.0
-    logs: List[str] = []
+    # Timing spans (node and external calls) and per-node milliseconds for this run
+    trace: List[Dict[str, Any]] = []
+    timings: Dict[str, float] = {}
+    total_ms: float = 0.0
     peers: List[str] = []
+
+class BatchSummary(BaseModel):
+    """Portfolio-level roll-up of a batch analysis"""
+    requested: int
+    completed: int
+    failed: int
+    decisions: Dict[str, int] = {} # decision -> count
+    buy_symbols: List[str] = []
+    sell_symbols: List[str] = []
+    committed_capital: float = 0.0 # Entry value of approved buy signals
+    elapsed_seconds: float = 0.0
+
+class BatchOutput(BaseModel):
+    results: List[MasterOutput]
+    errors: Dict[str, str] = {} # symbol -> error message
+    summary: BatchSummary
 class AgentState(TypedDict):
     symbol: str
     account_size: float
@@ -84,6 +105,18 @@ class AgentState(TypedDict):
 
 # --- Master Agent ---
 class MasterAgent:
+    # Nodes that only depend on the resolved symbol and run in parallel
+    PARALLEL_BRANCHES = ("company_info", "analyst", "quant")
+    # Node -> stage name reported by astream
+    STREAM_STAGES = {
+        "resolve_query": "resolved",
+        "company_info": "company_info",
+        "quant": "quant",
+        "analyst": "analyst",
+        "risk_assessment": "risk",
+        "decision_maker": "decision",
+    }
+
     def __init__(self):
         self.analyst = AnalystAgent()
         self.quant = QuantAgent()
@@ -101,20 +134,22 @@ class MasterAgent:
         workflow.add_node("risk_assessment", self.risk_node)
         workflow.add_node("decision_maker", self.decision_node)
         
-        # Define Edges (Sequential Flow to ensure all data is ready)
+        # Define Edges
         workflow.set_entry_point("resolve_query")
         
         workflow.add_edge("resolve_query", "start_analysis")
-        workflow.add_edge("start_analysis", "company_info")
-        workflow.add_edge("company_info", "analyst")
-        workflow.add_edge("analyst", "quant")
-        workflow.add_edge("quant", "risk_assessment")
+        # company_info, analyst and quant are independent: fan out so they run
+        # concurrently, then join so risk_assessment waits for all three
+        for branch in self.PARALLEL_BRANCHES:
+            workflow.add_edge("start_analysis", branch)
+        workflow.add_edge(list(self.PARALLEL_BRANCHES), "risk_assessment")
         workflow.add_edge("risk_assessment", "decision_maker")
         workflow.add_edge("decision_maker", END)
         
         self.graph = workflow.compile()
 
     # --- Nodes ---
+    @traced()
     async def resolve_node(self, state: AgentState):
         query = state['symbol']
         logger.info(f"Resolving query: {query}")
@@ -128,6 +163,7 @@ class MasterAgent:
             "messages": [HumanMessage(content=f"Resolved '{query}' to {resolved_data['symbol']}")]
         }
 
+    @traced()
     async def start_node(self, state: AgentState):
         logger.info(f"Starting analysis for {state['symbol']}")
         # formatted_memories = [] # Could format this for the prompt later
@@ -140,15 +176,18 @@ class MasterAgent:
             "past_memories": memories
         }
 
+    @traced()
     async def analyst_node(self, state: AgentState):
         result = await self.analyst.analyze(state) # Modified to accept state
         return {"analyst_output": result, "messages": [HumanMessage(content="Analyst finished")]}
 
+    @traced()
     async def quant_node(self, state: AgentState):
         result = await self.quant.analyze(state) # Modified to accept state
         candle_count = len(result.get('price_candles', []))
         return {"quant_output": result, "messages": [HumanMessage(content=f"Quant finished. Processed {candle_count} price candles.")]}
 
+    @traced()
     async def company_info_node(self, state: AgentState):
         logger.info("Fetching company info...")
         # Keeping internal logic here or could move to an agent
@@ -161,11 +200,13 @@ class MasterAgent:
             logger.warning(f"Failed to fetch company info: {e}")
             return {"company_info": None}
 
+    @traced()
     async def risk_node(self, state: AgentState):
         # Risk Agent now orchestrates Sentiment Check + Risk Check
         result = await self.risk.evaluate(state)
         return {"risk_output": result}
 
+    @traced()
     async def decision_node(self, state: AgentState):
         # Final packaging
         risk_out = state.get("risk_output")
@@ -183,7 +224,7 @@ class MasterAgent:
         
         if decision != SignalType.HOLD:
              final_prompt = f"Review trade: {state['symbol']} {decision}. Reason: {reasoning}. Analyst: {analyst_out.get('summary')}. One sentence comment."
-             llm_comment = await llm_service.get_completion(final_prompt)
+             llm_comment = await llm_service.get_completion(final_prompt, cache_ttl=900)
              reasoning += f" | LLM: {llm_comment}"
 
         tech_data = TechnicalAnalysis(
@@ -209,8 +250,8 @@ class MasterAgent:
             "messages": [HumanMessage(content="Decision Made")]
         }
 
-    async def run(self, symbol: str, account_size: float = 100000.0, current_exposure: float = 0.0) -> MasterOutput:
-        inputs = {
+    def _initial_state(self, symbol: str, account_size: float, current_exposure: float) -> Dict[str, Any]:
+        return {
             "symbol": symbol,
             "account_size": account_size,
             "current_exposure": current_exposure,
@@ -224,39 +265,186 @@ class MasterAgent:
             "messages": [HumanMessage(content=f"Input: {symbol}")],
             "past_memories": []
         }
-        
-        # Run graph
-        result = await self.graph.ainvoke(inputs)
-        
-        # Parse result back to MasterOutput
-        quant_out = result['quant_output']
-        analyst_out = result['analyst_output']
-        
+
+    @staticmethod
+    def _quant_fields(quant_out: Dict[str, Any]) -> Dict[str, Any]:
+        """MasterOutput fields taken from the quant node's output"""
+        return {
+            "quant_signals_count": len(quant_out['signals']),
+            "technical_analysis": TechnicalAnalysis(
+                trend=quant_out['trend'],
+                nearest_support=quant_out['nearest_support'],
+                nearest_resistance=quant_out['nearest_resistance']
+            ),
+            "all_signals": quant_out['signals'],
+            "price_data": quant_out['price_candles'],
+            "indicators": quant_out.get('indicators', {}),
+            "market_data": quant_out.get('market_data', {}),
+        }
+
+    @staticmethod
+    def _analyst_fields(analyst_out: Dict[str, Any]) -> Dict[str, Any]:
+        """MasterOutput fields taken from the analyst node's output"""
+        return {
+            "analyst_summary": analyst_out['summary'],
+            "sentiment_score": analyst_out['sentiment_score'],
+            "impact_score": analyst_out['impact_score'],
+            "sentiment": analyst_out.get('sentiment_analysis', {}),
+            "news_articles": analyst_out['news_articles'],
+            "events": analyst_out['events'],
+        }
+
+    def _stage_fields(self, node: str, update: Dict[str, Any]) -> Dict[str, Any]:
+        """The MasterOutput fields a node's state update fills in"""
+        if node == "resolve_query":
+            return {"symbol": update['symbol'], "peers": update.get('peers', [])}
+        if node == "company_info":
+            return {"company_info": update.get('company_info')}
+        if node == "quant":
+            fields = self._quant_fields(update['quant_output'])
+            fields["technical_analysis"] = fields["technical_analysis"].model_dump()
+            return fields
+        if node == "analyst":
+            return self._analyst_fields(update['analyst_output'])
+        if node == "risk_assessment":
+            return {"risk": (update.get('risk_output') or {}).get('risk_analysis', {})}
+        return {
+            "decision": update.get('decision') or SignalType.HOLD,
+            "reasoning": update.get('reasoning', ""),
+            "final_signal": update.get('final_signal')
+        }
+
+    def _build_output(self, result: Dict[str, Any], trace: Trace) -> MasterOutput:
         return MasterOutput(
             symbol=result['symbol'], # Use resolved symbol
             decision=result['decision'] or SignalType.HOLD,
             final_signal=result['final_signal'],
             reasoning=result['reasoning'],
-            analyst_summary=analyst_out['summary'],
-            quant_signals_count=len(quant_out['signals']),
             company_info=result.get('company_info'),
-            sentiment_score=analyst_out['sentiment_score'],
-            impact_score=analyst_out['impact_score'],
-            sentiment=analyst_out.get('sentiment_analysis', {}),
-            news_articles=analyst_out['news_articles'],
-            events=analyst_out['events'],
-            technical_analysis=TechnicalAnalysis(
-                trend=quant_out['trend'],
-                nearest_support=quant_out['nearest_support'],
-                nearest_resistance=quant_out['nearest_resistance']
-            ),
-            all_signals=quant_out['signals'],
-            price_data=quant_out['price_candles'],
-            indicators=quant_out.get('indicators', {}),
-            market_data=quant_out.get('market_data', {}),
+            **self._analyst_fields(result['analyst_output']),
+            **self._quant_fields(result['quant_output']),
             risk=result.get('risk_output', {}).get('risk_analysis', {}),
             agent_confidence=0.8,
-            logs=[m.content for m in result['messages']],
+            trace=trace.to_list(),
+            timings=trace.timings(),
+            total_ms=trace.elapsed_ms,
             peers=result.get('peers', [])
         )
 
+    async def run(self, symbol: str, account_size: float = 100000.0, current_exposure: float = 0.0) -> MasterOutput:
+        inputs = self._initial_state(symbol, account_size, current_exposure)
+        
+        # Run graph, collecting node and external-call timings
+        with start_trace(f"analyze:{symbol}") as trace:
+            result = await self.graph.ainvoke(inputs)
+        logger.info(f"Analysis of {symbol} took {trace.elapsed_ms:.0f}ms: {trace.timings()}")
+        
+        # Parse result back to MasterOutput
+        return self._build_output(result, trace)
+
+    async def astream(
+        self, symbol: str, account_size: float = 100000.0, current_exposure: float = 0.0
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Runs the pipeline like `run`, yielding (stage, fields) as each node
+        completes, so callers can show the chart from the quant stage while the
+        analyst's LLM calls are still running. `fields` are the MasterOutput
+        fields that node fills in, plus `elapsed_ms` since the run started.
+        The last item is ("result", MasterOutput).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def produce():
+            # Runs as its own task so the trace context stays out of the consumer's
+            try:
+                with start_trace(f"analyze:{symbol}") as trace:
+                    state = None
+                    inputs = self._initial_state(symbol, account_size, current_exposure)
+                    async for mode, chunk in self.graph.astream(inputs, stream_mode=["updates", "values"]):
+                        if mode == "values":
+                            state = chunk
+                            continue
+                        for node, update in chunk.items():
+                            stage = self.STREAM_STAGES.get(node)
+                            if stage and update:
+                                queue.put_nowait((stage, {**self._stage_fields(node, update), "elapsed_ms": trace.elapsed_ms}))
+                logger.info(f"Streamed analysis of {symbol} took {trace.elapsed_ms:.0f}ms: {trace.timings()}")
+                queue.put_nowait(("result", self._build_output(state, trace)))
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                queue.put_nowait(finished)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Consumer went away: stop the pipeline instead of finishing it unseen
+            producer.cancel()
+
+    async def run_batch(
+        self,
+        symbols: List[str],
+        account_size: float = 100000.0,
+        current_exposure: float = 0.0,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> BatchOutput:
+        """
+        Runs the full pipeline for many symbols at once, at most `concurrency`
+        in flight, each bounded by `timeout` seconds. Pipelines share the
+        process-wide fetch and indicator caches. Failures and timeouts are
+        reported per symbol instead of failing the batch.
+        """
+        concurrency = concurrency or settings.BATCH_ANALYSIS_CONCURRENCY
+        timeout = timeout or settings.BATCH_ANALYSIS_TIMEOUT_SECONDS
+        # De-duplicate, keeping the caller's order
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+
+        async def run_one(symbol: str):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self.run(symbol, account_size, current_exposure), timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Batch analysis of {symbol} timed out after {timeout}s")
+                    return TimeoutError(f"Timed out after {timeout}s")
+                except Exception as e:
+                    logger.error(f"Batch analysis of {symbol} failed: {e}")
+                    return e
+
+        logger.info(f"Starting batch analysis of {len(symbols)} symbols (concurrency {concurrency})")
+        outcomes = await asyncio.gather(*(run_one(symbol) for symbol in symbols))
+
+        results = [o for o in outcomes if isinstance(o, MasterOutput)]
+        errors = {symbol: str(o) or type(o).__name__ for symbol, o in zip(symbols, outcomes) if not isinstance(o, MasterOutput)}
+
+        decisions: Dict[str, int] = {}
+        for output in results:
+            decisions[output.decision] = decisions.get(output.decision, 0) + 1
+        buys = [o for o in results if o.decision == SignalType.BUY]
+        committed = sum(
+            (o.final_signal.entry_price or 0.0) * (o.final_signal.position_size or 0.0)
+            for o in buys if o.final_signal
+        )
+
+        summary = BatchSummary(
+            requested=len(symbols),
+            completed=len(results),
+            failed=len(errors),
+            decisions=decisions,
+            buy_symbols=[o.symbol for o in buys],
+            sell_symbols=[o.symbol for o in results if o.decision == SignalType.SELL],
+            committed_capital=committed,
+            elapsed_seconds=round(time.perf_counter() - started, 3)
+        )
+        logger.info(f"Batch analysis complete: {summary.completed}/{summary.requested} in {summary.elapsed_seconds}s")
+        return BatchOutput(results=results, errors=errors, summary=summary)
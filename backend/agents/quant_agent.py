@@ -4,6 +4,8 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, ConfigDict
 from backend.models import TradeSignal, SignalType, PriceCandle, Trend
 from backend.core.strategies import TechnicalBreakout, MeanReversion, VolumeSurge, MACDCrossover
+from backend.core.indicators import Indicators
+from backend.core.indicator_cache import indicator_cache
 from backend.configs.settings import settings
 import logging
 
@@ -58,8 +60,8 @@ class QuantAgent:
         # S/R
         sr_response = detect_support_resistance_logic(candles)
         
-        # Calculate Indicators
-        df = pd.DataFrame([c.model_dump() for c in candles])
+        # Calculate Indicators (shared frame, already built by the trend/S-R detectors)
+        df = indicator_cache.get_frame(candles, interval="1d")
         indicators = self._calculate_indicators(df)
         
         # Calculate Basic Stats (High/Low/Avg)
@@ -111,10 +113,11 @@ class QuantAgent:
             high = df['high']
             low = df['low']
             
-            # Simple Moving Averages
-            sma_20 = close.rolling(window=20).mean().iloc[-1]
-            sma_50 = close.rolling(window=50).mean().iloc[-1]
-            sma_200 = close.rolling(window=200).mean().iloc[-1]
+            # Simple Moving Averages (reuse calculate_all columns when the frame has them)
+            sma_20_series = close.rolling(window=20).mean()
+            sma_20 = sma_20_series.iloc[-1]
+            sma_50 = (df['sma_50'] if 'sma_50' in df.columns else Indicators.sma(close, 50)).iloc[-1]
+            sma_200 = (df['sma_200'] if 'sma_200' in df.columns else Indicators.sma(close, 200)).iloc[-1]
             
             # EMA
             ema_20 = close.ewm(span=20, adjust=False).mean().iloc[-1]
@@ -133,26 +136,21 @@ class QuantAgent:
             current_rsi = rsi.iloc[-1]
             
             # MACD (12, 26, 9)
-            exp1 = close.ewm(span=12, adjust=False).mean()
-            exp2 = close.ewm(span=26, adjust=False).mean()
-            macd_line = exp1 - exp2
-            signal_line = macd_line.ewm(span=9, adjust=False).mean()
-            histogram = macd_line - signal_line
+            if 'macd_hist' in df.columns:
+                macd_line, signal_line, histogram = df['macd_line'], df['macd_signal'], df['macd_hist']
+            else:
+                macd_line, signal_line, histogram = Indicators.macd(close)
             
             # Bollinger Bands (20, 2)
-            bb_sma = close.rolling(window=20).mean()
-            bb_std = close.rolling(window=20).std()
-            bb_upper = bb_sma + (bb_std * 2)
-            bb_lower = bb_sma - (bb_std * 2)
+            bb_sma = sma_20_series
+            if 'bb_upper' in df.columns:
+                bb_upper, bb_lower = df['bb_upper'], df['bb_lower']
+            else:
+                bb_upper, bb_lower = Indicators.bollinger_bands(close)
             
             # ATR (14)
             # TR = max(H-L, |H-Cp|, |L-Cp|)
-            prev_close = close.shift(1)
-            tr1 = high - low
-            tr2 = (high - prev_close).abs()
-            tr3 = (low - prev_close).abs()
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr = tr.rolling(window=14).mean().iloc[-1]
+            atr = (df['atr_14'] if 'atr_14' in df.columns else Indicators.atr(high, low, close)).iloc[-1]
             
             return {
                 "rsi": float(current_rsi) if pd.notna(current_rsi) else None,
@@ -5,8 +5,7 @@ from backend.models import TradeSignal
 from backend.configs.settings import settings
 import logging
 from backend.mcp_tools.risk_rules_tool import check_risk_logic
-import pandas as pd
-from backend.core.indicators import Indicators
+from backend.core.indicator_cache import indicator_cache
 
 logger = logging.getLogger(__name__)
 
@@ -48,10 +47,17 @@ class RiskAgent:
         volatility_score = 0.0
         risk_level = "Medium"
         
+        # Shared indicator frame for the quant candles (built once by QuantAgent)
+        df = None
         try:
             raw_candles = quant_out.get('price_candles', [])
             if raw_candles:
-                df = pd.DataFrame(raw_candles)
+                df = indicator_cache.get_frame(raw_candles)
+        except Exception as e:
+            logger.warning(f"RiskAgent: Failed to load indicator frame: {e}")
+
+        try:
+            if df is not None:
                 if 'close' in df.columns:
                     returns = df['close'].pct_change().dropna()
                     # Annualized Volatility
@@ -115,14 +121,10 @@ class RiskAgent:
 
         # Volatility Adjustment (ATR)
         try:
-            raw_candles = quant_out.get('price_candles', [])
-            if raw_candles:
-                df = pd.DataFrame(raw_candles)
-                # Ensure columns match what Indicators expects (lowercase)
-                # PriceCandle model has lowercase.
-                if 'high' in df.columns and 'low' in df.columns and 'close' in df.columns:
-                    atr_series = Indicators.atr(df['high'], df['low'], df['close'])
-                    current_atr = atr_series.iloc[-1]
+            if df is not None:
+                # atr_14 is precomputed by Indicators.calculate_all
+                if 'atr_14' in df.columns:
+                    current_atr = df['atr_14'].iloc[-1]
                     
                     if current_atr > 0:
                         # Check if SL is too tight (< 1 ATR)
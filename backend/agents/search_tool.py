@@ -55,7 +55,8 @@ async def resolve_company_query(query: str) -> Dict:
     """
     
     try:
-        response_text = await llm_service.get_completion(prompt, system_prompt="You are a strict JSON output generator.")
+        # Company -> ticker mappings rarely change
+        response_text = await llm_service.get_completion(prompt, system_prompt="You are a strict JSON output generator.", cache_ttl=86400)
         
         # Clean response if it contains markdown code blocks
         clean_text = response_text.replace("```json", "").replace("```", "").strip()
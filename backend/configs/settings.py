@@ -38,6 +38,52 @@ class Settings(BaseSettings):
     # System Settings
     LOG_LEVEL: str = "INFO"
 
+    # Caches
+    INDICATOR_CACHE_MAX_ENTRIES: int = 128
+    INDICATOR_CACHE_MAX_MB: int = 64
+
+    # Local OHLCV store (one memory-mapped file per symbol and interval)
+    OHLCV_STORE_DIR: str = "data/ohlcv"
+    OHLCV_STORE_REFRESH_SECONDS: int = 60
+
+    # How long a completed fetch is shared with callers arriving just after it
+    SINGLE_FLIGHT_TTL_SECONDS: float = 2.0
+
+    # Remembered exchange suffix per symbol, forgotten after MAX_FAILURES empty replies in a row;
+    # suffixes that never worked are retried after the TTL
+    SYMBOL_RESOLVER_PATH: str = "data/symbol_suffixes.json"
+    SYMBOL_RESOLVER_NEGATIVE_TTL_SECONDS: int = 900
+    SYMBOL_RESOLVER_MAX_FAILURES: int = 3
+
+    # Max symbols analyzed at once by the streaming scanner
+    SCANNER_CONCURRENCY: int = 8
+
+    # Batch analysis (/agents/analyze/batch)
+    BATCH_ANALYSIS_CONCURRENCY: int = 8
+    BATCH_ANALYSIS_TIMEOUT_SECONDS: float = 120.0
+
+    # Background analysis jobs (/agents/jobs); workers caps concurrent pipelines
+    ANALYSIS_JOB_WORKERS: int = 2
+    ANALYSIS_JOB_TIMEOUT_SECONDS: float = 300.0
+
+    # News articles scored per sentiment LLM call (1 = one call per article)
+    SENTIMENT_BATCH_SIZE: int = 10
+    # How long article sentiment verdicts are reused (Redis TTL / Mongo expiry)
+    SENTIMENT_CACHE_TTL_SECONDS: int = 86400
+
+    # LLM response cache (in-process LRU + Redis); callers may pass their own TTL
+    LLM_CACHE_TTL_SECONDS: int = 600
+    LLM_CACHE_MAX_ENTRIES: int = 512
+
+    # Per-key scheduling across GEMINI_API_KEYS: token bucket (quota per key),
+    # cooldown after a 429, and a circuit breaker for keys that keep failing
+    LLM_KEY_REQUESTS_PER_MINUTE: float = 10.0
+    LLM_KEY_BURST: int = 5
+    LLM_KEY_COOLDOWN_SECONDS: float = 60.0
+    LLM_KEY_FAILURE_THRESHOLD: int = 3
+    LLM_KEY_CIRCUIT_OPEN_SECONDS: float = 120.0
+    LLM_KEY_MAX_WAIT_SECONDS: float = 30.0
+
     class Config:
         env_file = ".env"
         case_sensitive = True
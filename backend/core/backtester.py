@@ -1,112 +1,231 @@
 import pandas as pd
 import numpy as np
-from typing import List, Type
+from typing import List, Type, Dict, Any, Optional
 from datetime import datetime
 import logging
 
 from backend.models import BacktestResult, SignalType
-from core.strategies import Strategy
-from core.indicators import Indicators
+from backend.core.strategies import Strategy, SIGNAL_NONE, SIGNAL_BUY
+from backend.core.indicators import Indicators
 
 logger = logging.getLogger(__name__)
 
 class Backtester:
-    def __init__(self, initial_capital: float = 100000.0):
+    def __init__(self, initial_capital: float = 100000.0, warmup: int = 50):
         self.initial_capital = initial_capital
+        # Warmup period for indicators
+        self.warmup = warmup
 
     def run(self, df: pd.DataFrame, strategy: Strategy) -> BacktestResult:
         """
         Runs a backtest for a given strategy on the provided DataFrame.
+        Strategies see the full history up to each bar (O(N^2)); prefer
+        run_event_driven for long histories.
         """
         if df.empty:
             raise ValueError("Empty DataFrame provided for backtest")
-            
+
         # Ensure indicators
         df = Indicators.calculate_all(df)
-        
+
         capital = self.initial_capital
         position = 0 # Shares
         trades = []
         equity_curve = [capital]
-        
-        # Simple loop (Vectorized is faster but logic is complex for strategies)
-        # We'll iterate to simulate real-time signals
-        
-        # Warmup period for indicators
-        warmup = 50
-        
-        for i in range(warmup, len(df)):
-            # Slice data up to current point to simulate real-time
-            # Note: This is slow for large datasets. For production, use vectorization or event-driven engine.
-            # For this MVP, we'll pass the full DF but the strategy checks index -1.
-            # To do this correctly without lookahead bias, we should pass df.iloc[:i+1]
-            # But that's O(N^2).
-            # Optimization: Strategy logic usually only needs last N rows.
-            # We'll assume strategy looks at .iloc[-1] of the passed slice.
-            
+
+        for i in range(self.warmup, len(df)):
+            # Slice data up to current point to simulate real-time (no lookahead bias)
             current_slice = df.iloc[:i+1]
             current_bar = df.iloc[i]
             current_price = current_bar['close']
             timestamp = current_bar.name if isinstance(current_bar.name, datetime) else datetime.now() # simplistic
-            
+
             signal = strategy.analyze(current_slice)
-            
-            # Execution Logic
+
             if signal:
-                if signal.signal == SignalType.BUY and position == 0:
-                    # Buy
-                    shares = (capital * 0.99) / current_price # All in for simplicity or use risk sizing
-                    cost = shares * current_price
-                    capital -= cost
-                    position = shares
-                    trades.append({
-                        "type": "BUY",
-                        "price": current_price,
-                        "timestamp": timestamp,
-                        "shares": shares
-                    })
-                    
-                elif signal.signal == SignalType.SELL and position > 0:
-                    # Sell
-                    revenue = position * current_price
-                    capital += revenue
-                    trades.append({
-                        "type": "SELL",
-                        "price": current_price,
-                        "timestamp": timestamp,
-                        "shares": position,
-                        "pnl": revenue - (trades[-1]['price'] * position)
-                    })
-                    position = 0
-            
+                capital, position = self._execute(signal.signal, current_price, timestamp, capital, position, trades)
+
             # Update Equity
             current_equity = capital + (position * current_price)
             equity_curve.append(current_equity)
-            
-        # Metrics
+
+        return self._build_result(df, strategy, trades, equity_curve)
+
+    def run_event_driven(self, df: pd.DataFrame, strategy: Strategy, lookback: int = 250) -> BacktestResult:
+        """
+        Event-driven backtest. Indicators are computed once up front and each bar
+        hands the strategy a fixed-size rolling window (a view, not a copy) of the
+        last `lookback` rows, so the cost per bar is independent of history length.
+
+        Strategies that only read the latest indicator rows (MeanReversion,
+        MACDCrossover, VolumeSurge) or keep their own incremental state
+        (TechnicalBreakout's S/R tracker) produce the same trades as run().
+        """
+        if df.empty:
+            raise ValueError("Empty DataFrame provided for backtest")
+        if lookback < self.warmup:
+            raise ValueError(f"lookback ({lookback}) must be at least the warmup period ({self.warmup})")
+
+        df = Indicators.calculate_all(df)
+
+        closes = df['close'].to_numpy(dtype=float)
+        index = df.index
+
+        capital = self.initial_capital
+        position = 0 # Shares
+        trades = []
+        equity_curve = [capital]
+
+        for i in range(self.warmup, len(df)):
+            start = max(0, i + 1 - lookback)
+            window = df.iloc[start:i+1]
+            current_price = closes[i]
+            timestamp = index[i] if isinstance(index[i], datetime) else datetime.now()
+
+            signal = strategy.analyze(window)
+
+            if signal:
+                capital, position = self._execute(signal.signal, current_price, timestamp, capital, position, trades)
+
+            equity_curve.append(capital + (position * current_price))
+
+        return self._build_result(df, strategy, trades, equity_curve)
+
+    def run_vectorized(self, df: pd.DataFrame, strategy: Strategy) -> BacktestResult:
+        """
+        Fully vectorized backtest built on Strategy.generate_signals. Positions,
+        fills and the equity curve are derived with array ops; only the trade
+        log is assembled in Python. Falls back to run_event_driven for strategies
+        without a bulk signal implementation.
+        """
+        if df.empty:
+            raise ValueError("Empty DataFrame provided for backtest")
+
+        df = Indicators.calculate_all(df)
+
+        try:
+            signals = np.asarray(strategy.generate_signals(df)).copy()
+        except NotImplementedError:
+            logger.info(f"{strategy.__class__.__name__} has no bulk signals, using event-driven engine")
+            return self.run_event_driven(df, strategy)
+
+        n = len(df)
+        signals[:self.warmup] = SIGNAL_NONE
+        closes = df['close'].to_numpy(dtype=float)
+        bars = np.arange(n)
+
+        # Long after bar i iff the last non-NONE signal up to i was a BUY:
+        # BUYs while long and SELLs while flat are no-ops, exactly as in run().
+        last_signal_bar = np.maximum.accumulate(np.where(signals != SIGNAL_NONE, bars, -1))
+        state = np.where(last_signal_bar >= 0, signals[np.maximum(last_signal_bar, 0)], SIGNAL_NONE)
+        long = state == SIGNAL_BUY
+        was_long = np.concatenate(([False], long[:-1]))
+        entries = np.flatnonzero(long & ~was_long)
+        exits = np.flatnonzero(~long & was_long)
+
+        # All-in with 99% of capital: each round trip scales capital by 0.01 + 0.99 * exit / entry
+        entry_prices = closes[entries]
+        exit_prices = closes[exits]
+        growth = 0.01 + 0.99 * exit_prices / entry_prices[:len(exits)]
+        capital_after = self.initial_capital * np.concatenate(([1.0], np.cumprod(growth)))
+        capital_at_entry = capital_after[:len(entries)]
+        shares = capital_at_entry * 0.99 / entry_prices
+        cash_in_trade = capital_at_entry - shares * entry_prices
+
+        if len(entries):
+            open_trade = np.maximum(np.searchsorted(entries, bars, side='right') - 1, 0)
+            holding_value = cash_in_trade[open_trade] + shares[open_trade] * closes
+        else:
+            holding_value = np.zeros(n)
+        closed_count = np.searchsorted(exits, bars, side='right')
+        equity = np.where(long, holding_value, capital_after[closed_count])
+        equity_curve = np.concatenate(([self.initial_capital], equity[self.warmup:]))
+
+        index = df.index
+        trades = []
+        for k, entry in enumerate(entries):
+            trades.append({
+                "type": "BUY",
+                "price": float(entry_prices[k]),
+                "timestamp": index[entry] if isinstance(index[entry], datetime) else datetime.now(),
+                "shares": float(shares[k])
+            })
+            if k < len(exits):
+                exit_bar = exits[k]
+                trades.append({
+                    "type": "SELL",
+                    "price": float(exit_prices[k]),
+                    "timestamp": index[exit_bar] if isinstance(index[exit_bar], datetime) else datetime.now(),
+                    "shares": float(shares[k]),
+                    "pnl": float(shares[k] * (exit_prices[k] - entry_prices[k]))
+                })
+
+        return self._build_result(df, strategy, trades, equity_curve)
+
+    def _execute(self, signal_type: SignalType, price: float, timestamp: datetime,
+                 capital: float, position: float, trades: List[Dict[str, Any]]) -> tuple[float, float]:
+        """Fills a signal against the current state. Long-only, fully in or out."""
+        if signal_type == SignalType.BUY and position == 0:
+            shares = (capital * 0.99) / price # All in for simplicity or use risk sizing
+            capital -= shares * price
+            position = shares
+            trades.append({
+                "type": "BUY",
+                "price": price,
+                "timestamp": timestamp,
+                "shares": shares
+            })
+
+        elif signal_type == SignalType.SELL and position > 0:
+            revenue = position * price
+            capital += revenue
+            trades.append({
+                "type": "SELL",
+                "price": price,
+                "timestamp": timestamp,
+                "shares": position,
+                "pnl": revenue - (trades[-1]['price'] * position)
+            })
+            position = 0
+
+        return capital, position
+
+    def _build_result(self, df: pd.DataFrame, strategy: Strategy,
+                      trades: List[Dict[str, Any]], equity_curve: List[float]) -> BacktestResult:
         equity_curve = np.array(equity_curve)
-        total_return = (equity_curve[-1] - self.initial_capital) / self.initial_capital
-        
+
         # Max Drawdown
         peak = np.maximum.accumulate(equity_curve)
         drawdown = (equity_curve - peak) / peak
         max_drawdown = drawdown.min()
-        
+
         # Win Rate
-        winning_trades = [t for t in trades if t.get('pnl', 0) > 0]
-        closed_trades = [t for t in trades if t['type'] == 'SELL']
-        win_rate = len(winning_trades) / len(closed_trades) if closed_trades else 0.0
-        
+        pnls = np.array([t['pnl'] for t in trades if t['type'] == 'SELL'], dtype=float)
+        win_rate = float((pnls > 0).mean()) if len(pnls) else 0.0
+
+        # Profit Factor: gross profit / gross loss
+        gross_profit = pnls[pnls > 0].sum()
+        gross_loss = -pnls[pnls < 0].sum()
+        if gross_loss > 0:
+            profit_factor = gross_profit / gross_loss
+        else:
+            profit_factor = float('inf') if gross_profit > 0 else 0.0
+
+        # Annualized Sharpe on per-bar equity returns (risk-free rate assumed 0)
+        returns = np.diff(equity_curve) / equity_curve[:-1]
+        std = returns.std() if len(returns) > 1 else 0.0
+        sharpe_ratio = returns.mean() / std * np.sqrt(252) if std > 0 else 0.0
+
         return BacktestResult(
             strategy_name=strategy.__class__.__name__,
             symbol=df['symbol'].iloc[0] if 'symbol' in df.columns else "UNKNOWN",
             start_date=df.index[0] if isinstance(df.index[0], datetime) else datetime.now(),
             end_date=df.index[-1] if isinstance(df.index[-1], datetime) else datetime.now(),
-            total_trades=len(closed_trades),
+            total_trades=len(pnls),
             win_rate=win_rate,
-            profit_factor=0.0, # TODO
-            total_pnl=equity_curve[-1] - self.initial_capital,
-            max_drawdown=max_drawdown,
-            sharpe_ratio=0.0, # TODO
+            profit_factor=float(profit_factor),
+            total_pnl=float(equity_curve[-1] - self.initial_capital),
+            max_drawdown=float(max_drawdown),
+            sharpe_ratio=float(sharpe_ratio),
             trades=trades
         )
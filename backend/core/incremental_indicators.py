@@ -0,0 +1,227 @@
+"""
+Incremental (streaming) versions of the Indicators.calculate_all columns.
+
+An IncrementalIndicators object holds rolling sums, EMA state and running
+VWAP totals for one symbol and updates them in O(1) per new candle, producing
+the same values as the batch implementation on the full history. A candle with
+the same timestamp as the last one (a still-forming bar delivered again)
+replaces that bar instead of being counted twice.
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+NAN = float('nan')
+
+
+class _RollingMean:
+    """Fixed-window mean with a compensated running sum (matches pandas rolling().mean())."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self._compensation = 0.0
+        self._undo = None
+
+    def _add(self, value: float):
+        # Kahan summation keeps the running sum from drifting over long streams
+        y = value - self._compensation
+        t = self.total + y
+        self._compensation = (t - self.total) - y
+        self.total = t
+
+    def update(self, value: float) -> float:
+        self._undo = (self.total, self._compensation, None)
+        self.window.append(value)
+        self._add(value)
+        if len(self.window) > self.period:
+            dropped = self.window.popleft()
+            self._undo = self._undo[:2] + (dropped,)
+            self._add(-dropped)
+        return self.total / self.period if len(self.window) == self.period else NAN
+
+    def revert(self):
+        """Undoes the last update."""
+        self.total, self._compensation, dropped = self._undo
+        self.window.pop()
+        if dropped is not None:
+            self.window.appendleft(dropped)
+
+
+class _RollingStd:
+    """Fixed-window sample standard deviation (ddof=1) via rolling Welford updates."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._undo = None
+
+    def update(self, value: float) -> float:
+        self._undo = (self.mean, self.m2, None)
+        self.window.append(value)
+        if len(self.window) <= self.period:
+            delta = value - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (value - self.mean)
+        else:
+            old = self.window.popleft()
+            self._undo = self._undo[:2] + (old,)
+            old_mean = self.mean
+            self.mean += (value - old) / self.period
+            self.m2 += (value - old) * (value - self.mean + old - old_mean)
+        if len(self.window) < self.period:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.period - 1))
+
+    def revert(self):
+        """Undoes the last update."""
+        self.mean, self.m2, dropped = self._undo
+        self.window.pop()
+        if dropped is not None:
+            self.window.appendleft(dropped)
+
+
+class _EMA:
+    """Exponential moving average with adjust=False semantics, seeded by the first value."""
+
+    def __init__(self, span: int):
+        self.alpha = 2 / (span + 1)
+        self.value: Optional[float] = None
+        self._previous: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        self._previous = self.value
+        if self.value is None:
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+    def revert(self):
+        """Undoes the last update."""
+        self.value = self._previous
+
+
+class IncrementalIndicators:
+    """Streaming counterpart of Indicators.calculate_all for a single symbol."""
+
+    COLUMNS = [
+        'rsi_14', 'sma_50', 'sma_200', 'ema_9', 'atr_14', 'vwap', 'avg_volume_20',
+        'bb_upper', 'bb_lower', 'macd_line', 'macd_signal', 'macd_hist'
+    ]
+
+    def __init__(self, symbol: Optional[str] = None):
+        self.symbol = symbol
+        self.bars = 0
+        self.prev_close: Optional[float] = None
+        self.last_timestamp = None
+
+        self._avg_gain = _RollingMean(14)
+        self._avg_loss = _RollingMean(14)
+        self._sma_50 = _RollingMean(50)
+        self._sma_200 = _RollingMean(200)
+        self._ema_9 = _EMA(9)
+        self._atr = _RollingMean(14)
+        self._vwap_pv = 0.0
+        self._vwap_volume = 0.0
+        self._avg_volume = _RollingMean(20)
+        self._bb_mean = _RollingMean(20)
+        self._bb_std = _RollingStd(20)
+        self._ema_fast = _EMA(12)
+        self._ema_slow = _EMA(26)
+        self._macd_signal = _EMA(9)
+
+        self.values: Dict[str, float] = {column: NAN for column in self.COLUMNS}
+        # State before the last bar, for replacing it when it is delivered again
+        self._undo = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, symbol: Optional[str] = None) -> "IncrementalIndicators":
+        """Warms up the state from an OHLCV history (one O(N) pass)."""
+        state = cls(symbol)
+        for timestamp, high, low, close, volume in zip(
+            df.index, df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float), df['volume'].to_numpy(dtype=float)
+        ):
+            state.update(high, low, close, volume, timestamp=timestamp)
+        return state
+
+    def update_candle(self, candle: Any) -> Dict[str, float]:
+        """Feeds a PriceCandle (or candle dict) into the state."""
+        data = candle if isinstance(candle, dict) else candle.model_dump()
+        return self.update(data['high'], data['low'], data['close'], data['volume'], timestamp=data.get('timestamp'))
+
+    def update(self, high: float, low: float, close: float, volume: float, timestamp: Any = None) -> Dict[str, float]:
+        """
+        Consumes one new bar in constant time and returns the latest indicator
+        values. A bar with the same timestamp as the last one replaces it.
+        """
+        if self._undo is not None and timestamp is not None and self._same_time(timestamp, self.last_timestamp):
+            self._revert()
+        self._undo = (self.prev_close, self.last_timestamp, self._vwap_pv, self._vwap_volume, dict(self.values))
+        values = self.values
+
+        # RSI (simple rolling averages of gains/losses, as Indicators.rsi)
+        delta = close - self.prev_close if self.prev_close is not None else NAN
+        gain = self._avg_gain.update(delta if delta > 0 else 0.0)
+        loss = self._avg_loss.update(-delta if delta < 0 else 0.0)
+        if math.isnan(gain) or math.isnan(loss) or (gain == 0 and loss == 0):
+            values['rsi_14'] = NAN
+        elif loss == 0:
+            values['rsi_14'] = 100.0
+        else:
+            values['rsi_14'] = 100 - (100 / (1 + gain / loss))
+
+        values['sma_50'] = self._sma_50.update(close)
+        values['sma_200'] = self._sma_200.update(close)
+        values['ema_9'] = self._ema_9.update(close)
+
+        # ATR: the first bar has no previous close, so its true range is high - low
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        values['atr_14'] = self._atr.update(true_range)
+
+        self._vwap_pv += (high + low + close) / 3 * volume
+        self._vwap_volume += volume
+        values['vwap'] = self._vwap_pv / self._vwap_volume if self._vwap_volume else NAN
+        values['avg_volume_20'] = self._avg_volume.update(volume)
+
+        bb_mid = self._bb_mean.update(close)
+        bb_std = self._bb_std.update(close)
+        values['bb_upper'] = bb_mid + bb_std * 2
+        values['bb_lower'] = bb_mid - bb_std * 2
+
+        macd_line = self._ema_fast.update(close) - self._ema_slow.update(close)
+        macd_signal = self._macd_signal.update(macd_line)
+        values['macd_line'] = macd_line
+        values['macd_signal'] = macd_signal
+        values['macd_hist'] = macd_line - macd_signal
+
+        self.prev_close = close
+        self.last_timestamp = timestamp
+        self.bars += 1
+        return dict(values)
+
+    @staticmethod
+    def _same_time(a: Any, b: Any) -> bool:
+        # Candle dicts may carry the timestamp as a JSON string
+        return b is not None and (a == b or pd.Timestamp(a) == pd.Timestamp(b))
+
+    def _revert(self):
+        """Rolls every window and EMA back to before the last bar."""
+        self.prev_close, self.last_timestamp, self._vwap_pv, self._vwap_volume, values = self._undo
+        self.values.update(values)
+        for component in (
+            self._avg_gain, self._avg_loss, self._sma_50, self._sma_200, self._ema_9, self._atr,
+            self._avg_volume, self._bb_mean, self._bb_std, self._ema_fast, self._ema_slow, self._macd_signal
+        ):
+            component.revert()
+        self.bars -= 1
+        self._undo = None
@@ -1,8 +1,23 @@
 """
-List of Indian Small Cap and Mid Cap stocks for scanning.
-These stocks tend to show more movement than large caps.
+Lists of Indian stocks: NIFTY 50 constituents plus the Small Cap and Mid Cap
+stocks used for scanning. The mid/small caps tend to show more movement than
+large caps.
 """
 
+# NIFTY 50 constituents (yfinance NSE format)
+NIFTY_50_SYMBOLS = [
+    "ADANIENT.NS", "ADANIPORTS.NS", "APOLLOHOSP.NS", "ASIANPAINT.NS", "AXISBANK.NS",
+    "BAJAJ-AUTO.NS", "BAJFINANCE.NS", "BAJAJFINSV.NS", "BPCL.NS", "BHARTIARTL.NS",
+    "BRITANNIA.NS", "CIPLA.NS", "COALINDIA.NS", "DIVISLAB.NS", "DRREDDY.NS",
+    "EICHERMOT.NS", "GRASIM.NS", "HCLTECH.NS", "HDFCBANK.NS", "HDFCLIFE.NS",
+    "HEROMOTOCO.NS", "HINDALCO.NS", "HINDUNILVR.NS", "ICICIBANK.NS", "ITC.NS",
+    "INDUSINDBK.NS", "INFY.NS", "JSWSTEEL.NS", "KOTAKBANK.NS", "LT.NS",
+    "M&M.NS", "MARUTI.NS", "NTPC.NS", "NESTLEIND.NS", "ONGC.NS",
+    "POWERGRID.NS", "RELIANCE.NS", "SBILIFE.NS", "SBIN.NS", "SUNPHARMA.NS",
+    "TCS.NS", "TATACONSUM.NS", "TATAMOTORS.NS", "TATASTEEL.NS", "TECHM.NS",
+    "TITAN.NS", "ULTRACEMCO.NS", "UPL.NS", "WIPRO.NS"
+]
+
 # Nifty Midcap 50 sample stocks
 MIDCAP_STOCKS = [
     "ASTRAL", "BALKRISIND", "BATAINDIA", "BHEL", "BIOCON",
@@ -0,0 +1,101 @@
+"""
+Indicator Frame Cache - shares one indicator DataFrame per candle series.
+
+Within one analysis the same candles are turned into a DataFrame and run
+through Indicators.calculate_all by the trend detector, the S/R detector,
+QuantAgent and RiskAgent. The cache builds that frame once, keyed by
+(symbol, interval, last candle timestamp, bar count, last candle OHLCV), with
+LRU eviction bounded by entry count and memory. The last candle's prices are
+part of the key because a still-forming bar is refreshed in place, keeping its
+timestamp and the bar count.
+
+Cached frames are shared between callers and must be treated as read-only.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from backend.configs.settings import settings
+from backend.core.indicators import Indicators
+
+logger = logging.getLogger(__name__)
+
+
+class IndicatorFrameCache:
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._frames: "OrderedDict[Tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(candles: List[Any], interval: str) -> Tuple:
+        """
+        (symbol, interval, last timestamp, bar count, last bar's OHLCV) for
+        PriceCandle objects or candle dicts.
+        """
+        last = candles[-1] if isinstance(candles[-1], dict) else candles[-1].model_dump()
+        bar = tuple(None if last.get(f) is None else float(last[f]) for f in ('open', 'high', 'low', 'close', 'volume'))
+        # Normalise so datetimes and their JSON strings map to the same key
+        return (str(last.get('symbol', '')).upper(), interval, pd.Timestamp(last['timestamp']), len(candles), bar)
+
+    def get_frame(self, candles: List[Any], interval: str = "1d") -> pd.DataFrame:
+        """Returns the calculate_all frame for `candles`, building it on a miss."""
+        if not candles:
+            raise ValueError("No candles provided")
+
+        key = self.make_key(candles, interval)
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        rows = [c if isinstance(c, dict) else c.model_dump() for c in candles]
+        df = Indicators.calculate_all(pd.DataFrame(rows))
+        self._put(key, df)
+        return df
+
+    def _put(self, key: Tuple, df: pd.DataFrame):
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            logger.debug(f"Indicator frame for {key[0]} ({size} bytes) exceeds cache cap, not cached")
+            return
+
+        with self._lock:
+            if key in self._frames:
+                self._bytes -= self._frames.pop(key)[1]
+            self._frames[key] = (df, size)
+            self._bytes += size
+            while len(self._frames) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._frames.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._frames),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+indicator_cache = IndicatorFrameCache(
+    max_entries=settings.INDICATOR_CACHE_MAX_ENTRIES,
+    max_bytes=settings.INDICATOR_CACHE_MAX_MB * 1024 * 1024
+)
@@ -74,6 +74,7 @@ class Indicators:
         df['ema_9'] = Indicators.ema(df['close'], 9)
         df['atr_14'] = Indicators.atr(df['high'], df['low'], df['close'])
         df['vwap'] = Indicators.vwap(df['high'], df['low'], df['close'], df['volume'])
+        df['avg_volume_20'] = Indicators.sma(df['volume'], 20)
         
         upper, lower = Indicators.bollinger_bands(df['close'])
         df['bb_upper'] = upper
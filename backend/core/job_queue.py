@@ -0,0 +1,258 @@
+"""
+Job Queue - background analysis jobs.
+
+Analyses are submitted as jobs and run by a fixed pool of asyncio workers, so
+they outlive the HTTP request that started them and at most `workers` LLM-heavy
+pipelines run at once. Jobs are taken in priority order (lower value first,
+FIFO within a priority). Submitting a job identical to one still pending or
+running returns the existing job. Job state and results are written to Mongo
+when it is available (and kept in memory either way), and jobs left pending or
+running by a previous process are re-queued on start.
+
+`analysis_jobs` is the app-wide queue behind /agents/jobs; the agents router
+sets its runner and server.py starts and stops it with the app.
+"""
+
+import asyncio
+import itertools
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from backend.configs.settings import settings
+from backend.database import get_database
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class AnalysisJob(BaseModel):
+    model_config = ConfigDict(use_enum_values=True, validate_assignment=True)
+
+    job_id: str
+    symbol: str
+    account_size: float = 100000.0
+    current_exposure: float = 0.0
+    priority: int = 5
+    status: JobStatus = JobStatus.PENDING
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None # MasterOutput, once completed
+
+    @property
+    def dedup_key(self) -> Hashable:
+        return (self.symbol, self.account_size, self.current_exposure)
+
+
+Runner = Callable[[str, float, float], Awaitable[BaseModel]]
+
+
+class JobQueue:
+    def __init__(
+        self,
+        runner: Optional[Runner],
+        workers: int = 2,
+        timeout: Optional[float] = None,
+        collection_name: str = "analysis_jobs",
+        max_finished: int = 500
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.timeout = timeout
+        self.collection_name = collection_name
+        self.max_finished = max_finished
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: list = []
+        self._recovery: Optional[asyncio.Task] = None
+        self._sequence = itertools.count()
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._active: Dict[Hashable, str] = {} # dedup key -> pending/running job id
+        self.completed = 0
+        self.failed = 0
+        self.deduplicated = 0
+
+    # --- Lifecycle ---
+    async def start(self):
+        if self._tasks:
+            return
+        if self.runner is None:
+            raise RuntimeError("Job queue has no runner")
+        self._queue = asyncio.PriorityQueue()
+        # In the background so startup doesn't wait on Mongo
+        self._recovery = asyncio.create_task(self._recover())
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self):
+        tasks = self._tasks + ([self._recovery] if self._recovery else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._recovery = None
+        logger.info("Job queue stopped")
+
+    async def _recover(self):
+        """Re-queues jobs a previous process accepted but never finished."""
+        collection = await self._collection()
+        if collection is None:
+            return
+        try:
+            cursor = collection.find({"status": {"$in": [JobStatus.PENDING.value, JobStatus.RUNNING.value]}})
+            recovered = 0
+            for doc in await cursor.to_list(length=None):
+                doc.pop("_id", None)
+                job = AnalysisJob.model_validate(doc)
+                if job.job_id in self._jobs or job.dedup_key in self._active:
+                    continue
+                job.status = JobStatus.PENDING
+                job.started_at = None
+                self._enqueue(job)
+                recovered += 1
+            if recovered:
+                logger.info(f"Re-queued {recovered} unfinished analysis jobs")
+        except Exception as e:
+            logger.warning(f"Could not recover unfinished jobs: {e}")
+
+    # --- Public API ---
+    async def submit(self, symbol: str, account_size: float = 100000.0, current_exposure: float = 0.0, priority: int = 5) -> AnalysisJob:
+        """Queues an analysis, or returns the identical job already pending or running."""
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        job = AnalysisJob(
+            job_id=uuid.uuid4().hex,
+            symbol=symbol.strip().upper(),
+            account_size=account_size,
+            current_exposure=current_exposure,
+            priority=priority,
+            submitted_at=datetime.utcnow()
+        )
+        existing_id = self._active.get(job.dedup_key)
+        if existing_id is not None:
+            self.deduplicated += 1
+            logger.info(f"Analysis of {job.symbol} already queued as job {existing_id}")
+            return self._jobs[existing_id]
+
+        self._enqueue(job)
+        await self._persist(job)
+        logger.info(f"Queued analysis job {job.job_id} for {job.symbol} (priority {priority})")
+        return job
+
+    async def get(self, job_id: str) -> Optional[AnalysisJob]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        collection = await self._collection()
+        if collection is None:
+            return None
+        try:
+            doc = await collection.find_one({"job_id": job_id})
+            if doc is None:
+                return None
+            doc.pop("_id", None)
+            return AnalysisJob.model_validate(doc)
+        except Exception as e:
+            logger.error(f"Failed to load job {job_id}: {e}")
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "pending": statuses.count(JobStatus.PENDING.value),
+            "running": statuses.count(JobStatus.RUNNING.value),
+            "completed": self.completed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated
+        }
+
+    # --- Internals ---
+    def _enqueue(self, job: AnalysisJob):
+        self._jobs[job.job_id] = job
+        self._active[job.dedup_key] = job.job_id
+        self._queue.put_nowait((job.priority, next(self._sequence), job.job_id))
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(self._jobs[job_id])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} crashed on {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AnalysisJob):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        await self._persist(job)
+        logger.info(f"Running analysis job {job.job_id} for {job.symbol}")
+        try:
+            output = await asyncio.wait_for(
+                self.runner(job.symbol, job.account_size, job.current_exposure), self.timeout
+            )
+            job.result = output.model_dump(mode='json')
+            job.status = JobStatus.COMPLETED
+            self.completed += 1
+        except asyncio.CancelledError:
+            # Shutting down: left as running in Mongo so the next start re-queues it
+            raise
+        except asyncio.TimeoutError:
+            job.error = f"Timed out after {self.timeout}s"
+            job.status = JobStatus.FAILED
+            self.failed += 1
+        except Exception as e:
+            logger.error(f"Analysis job {job.job_id} for {job.symbol} failed: {e}")
+            job.error = str(e) or type(e).__name__
+            job.status = JobStatus.FAILED
+            self.failed += 1
+
+        job.finished_at = datetime.utcnow()
+        self._active.pop(job.dedup_key, None)
+        await self._persist(job)
+        self._trim()
+        logger.info(f"Analysis job {job.job_id} for {job.symbol} {job.status}")
+
+    def _trim(self):
+        """Forgets the oldest finished jobs beyond max_finished (Mongo keeps them)."""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job.status in (JobStatus.COMPLETED.value, JobStatus.FAILED.value)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    async def _collection(self):
+        db = await get_database()
+        return None if db is None else db[self.collection_name]
+
+    async def _persist(self, job: AnalysisJob):
+        collection = await self._collection()
+        if collection is None:
+            return
+        try:
+            await collection.replace_one({"job_id": job.job_id}, job.model_dump(mode='json'), upsert=True)
+        except Exception as e:
+            logger.error(f"Failed to persist job {job.job_id}: {e}")
+
+
+# Workers cap concurrent pipelines; the runner (MasterAgent.run) is set by the agents router
+analysis_jobs = JobQueue(
+    None,
+    workers=settings.ANALYSIS_JOB_WORKERS,
+    timeout=settings.ANALYSIS_JOB_TIMEOUT_SECONDS
+)
@@ -0,0 +1,182 @@
+"""
+Key Scheduler - spreads LLM calls across API keys.
+
+Each key has a token bucket sized to its request quota. Calls go to the
+least-loaded key that has a token (fewest requests in flight, then most tokens
+left, then least recently used), so parallel calls fan out across all keys
+instead of draining the first one. A key that answers with a rate-limit error
+cools down for a while; a key that keeps failing for other reasons has its
+circuit opened and is skipped until the circuit's timeout has passed, after
+which one failure re-opens it and one success closes it.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "resourceexhausted", "quota", "rate limit")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _RATE_LIMIT_MARKERS)
+
+
+class KeyState:
+    def __init__(self, tokens: float, updated_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+        self.in_flight = 0
+        self.last_used = 0.0
+        self.cooldown_until = 0.0
+        self.circuit_open_until = 0.0
+        self.consecutive_failures = 0
+        # Usage metrics
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.total_latency = 0.0
+
+
+class KeyScheduler:
+    def __init__(
+        self,
+        n_keys: int,
+        requests_per_minute: float = 10.0,
+        burst: int = 5,
+        cooldown_seconds: float = 60.0,
+        failure_threshold: int = 3,
+        circuit_open_seconds: float = 120.0,
+        max_wait_seconds: float = 30.0
+    ):
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.cooldown_seconds = cooldown_seconds
+        self.failure_threshold = failure_threshold
+        self.circuit_open_seconds = circuit_open_seconds
+        self.max_wait_seconds = max_wait_seconds
+        now = time.monotonic()
+        self.keys = [KeyState(tokens=float(burst), updated_at=now) for _ in range(n_keys)]
+
+    def _refill(self, state: KeyState, now: float):
+        state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * self.rate)
+        state.updated_at = now
+
+    def _healthy(self, state: KeyState, now: float) -> bool:
+        return state.cooldown_until <= now and state.circuit_open_until <= now
+
+    def pick(self, exclude: Set[int] = frozenset(), require_token: bool = True) -> Optional[int]:
+        """
+        Reserves the best healthy key not in `exclude` and returns its index,
+        or None if there is none (with a token, when `require_token`).
+        """
+        now = time.monotonic()
+        candidates = []
+        for index, state in enumerate(self.keys):
+            if index in exclude or not self._healthy(state, now):
+                continue
+            self._refill(state, now)
+            if require_token and state.tokens < 1:
+                continue
+            candidates.append(index)
+        if not candidates:
+            return None
+
+        index = min(candidates, key=lambda i: (self.keys[i].in_flight, -int(self.keys[i].tokens), self.keys[i].last_used))
+        state = self.keys[index]
+        state.tokens = max(0.0, state.tokens - 1)
+        state.in_flight += 1
+        state.requests += 1
+        state.last_used = now
+        return index
+
+    def _next_ready_in(self, exclude: Set[int]) -> Optional[float]:
+        """Seconds until some key not in `exclude` can be picked, or None if none will."""
+        now = time.monotonic()
+        waits = []
+        for index, state in enumerate(self.keys):
+            if index in exclude:
+                continue
+            self._refill(state, now)
+            if state.tokens < 1 and self.rate <= 0:
+                continue
+            blocked = max(state.cooldown_until, state.circuit_open_until) - now
+            # Tokens keep refilling while a key is blocked
+            token_wait = (1 - state.tokens) / self.rate if state.tokens < 1 else 0.0
+            waits.append(max(blocked, token_wait, 0.0))
+        return min(waits) if waits else None
+
+    async def acquire(self, exclude: Set[int] = frozenset()) -> Optional[int]:
+        """
+        Like `pick`, but waits (up to max_wait_seconds in total) for a token or
+        a cooldown to run out. Returns None if no key becomes available in time.
+        """
+        deadline = time.monotonic() + self.max_wait_seconds
+        while True:
+            index = self.pick(exclude)
+            if index is not None:
+                return index
+            wait = self._next_ready_in(exclude)
+            if wait is None or time.monotonic() + wait > deadline:
+                return None
+            logger.info(f"All API keys busy, waiting {wait:.1f}s for the next one")
+            await asyncio.sleep(max(wait, 0.01))
+
+    def release(self, index: int, latency: float = 0.0, error: Optional[BaseException] = None, cancelled: bool = False):
+        """Records the outcome of a call made with key `index` (a cancelled call only frees its slot)."""
+        now = time.monotonic()
+        state = self.keys[index]
+        state.in_flight = max(0, state.in_flight - 1)
+        if cancelled:
+            return
+        state.total_latency += latency
+        if error is None:
+            state.successes += 1
+            state.consecutive_failures = 0
+            state.circuit_open_until = 0.0
+            return
+
+        state.failures += 1
+        if is_rate_limit_error(error):
+            state.rate_limited += 1
+            state.tokens = 0.0
+            state.cooldown_until = now + self.cooldown_seconds
+            logger.warning(f"API Key #{index + 1} rate limited, cooling down for {self.cooldown_seconds:.0f}s")
+            return
+
+        state.consecutive_failures += 1
+        if state.consecutive_failures >= self.failure_threshold:
+            state.circuit_open_until = now + self.circuit_open_seconds
+            logger.warning(
+                f"API Key #{index + 1} failed {state.consecutive_failures} times in a row, "
+                f"skipping it for {self.circuit_open_seconds:.0f}s"
+            )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        result = []
+        for index, state in enumerate(self.keys):
+            self._refill(state, now)
+            if state.circuit_open_until > now:
+                status = "circuit_open"
+            elif state.cooldown_until > now:
+                status = "cooling_down"
+            else:
+                status = "ok"
+            completed = state.successes + state.failures
+            result.append({
+                "key": f"#{index + 1}",
+                "status": status,
+                "tokens": round(state.tokens, 2),
+                "in_flight": state.in_flight,
+                "requests": state.requests,
+                "successes": state.successes,
+                "failures": state.failures,
+                "rate_limited": state.rate_limited,
+                "avg_latency_ms": round(state.total_latency / completed * 1000, 1) if completed else None
+            })
+        return result
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 import logging
 from backend.database import get_database
+from backend.core.telemetry import span
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,8 @@ class MemoryManager:
         }
         
         try:
-            result = await db[self.collection_name].insert_one(memory_entry)
+            with span(f"{self.collection_name}.insert_one", kind="mongo"):
+                result = await db[self.collection_name].insert_one(memory_entry)
             logger.info(f"Memory added for {symbol}: {result.inserted_id}")
         except Exception as e:
             logger.error(f"Failed to add memory for {symbol}: {e}")
@@ -47,7 +49,8 @@ class MemoryManager:
                 {"symbol": symbol.upper()}
             ).sort("timestamp", -1).limit(limit)
             
-            memories = await cursor.to_list(length=limit)
+            with span(f"{self.collection_name}.find", kind="mongo"):
+                memories = await cursor.to_list(length=limit)
             return memories
         except Exception as e:
             logger.error(f"Failed to retrieve memories for {symbol}: {e}")
@@ -0,0 +1,271 @@
+"""
+OHLCV Store - local columnar cache of price history.
+
+Each (symbol, interval) series lives in one append-only binary file of fixed
+size records (BAR_DTYPE) that is memory-mapped for reads, plus a small JSON
+sidecar with the series timezone and refresh bookkeeping. A request only asks
+the network for bars newer than the last stored one; period slices are served
+straight from the map. Each series has its own lock, held only while its files
+are read or written, so fetches for different symbols run in parallel.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.configs.settings import settings
+from backend.models import PriceCandle
+
+logger = logging.getLogger(__name__)
+
+BAR_DTYPE = np.dtype([
+    ('timestamp', '<i8'),  # UTC, ns since epoch
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('adj_close', '<f8'),
+    ('volume', '<f8'),
+])
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+# yfinance counts these in trading sessions, not calendar days
+SESSION_PERIODS = {"1d": 1, "5d": 5}
+
+# (period=..., start=...) -> yfinance-style history DataFrame
+HistoryFetcher = Callable[..., pd.DataFrame]
+
+
+class OHLCVStore:
+    def __init__(self, root: str, min_refresh_seconds: float = 60.0):
+        self.root = root
+        # Don't ask the network again for a series refreshed this recently
+        self.min_refresh_seconds = min_refresh_seconds
+        # Guards _locks only; each (symbol, interval) series has its own lock
+        self._lock = threading.Lock()
+        self._locks: Dict[tuple, threading.Lock] = {}
+
+    def _series_lock(self, symbol: str, interval: str) -> threading.Lock:
+        key = (symbol.upper(), interval)
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _path(self, symbol: str, interval: str, ext: str) -> str:
+        return os.path.join(self.root, interval, f"{symbol.upper()}.{ext}")
+
+    def meta(self, symbol: str, interval: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(symbol, interval, "json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, symbol: str, interval: str, meta: Dict[str, Any]):
+        path = self._path(symbol, interval, "json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def read(self, symbol: str, interval: str) -> np.ndarray:
+        """
+        Memory-mapped view of every stored bar (empty array if none). A partial
+        record left by an interrupted append is truncated away first.
+        """
+        path = self._path(symbol, interval, "bin")
+        if not os.path.exists(path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        size = os.path.getsize(path)
+        whole = size - size % BAR_DTYPE.itemsize
+        if whole != size:
+            logger.warning(f"Dropping {size - whole} trailing bytes of a partial bar from {path}")
+            with open(path, "r+b") as f:
+                f.truncate(whole)
+        if not whole:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(path, dtype=BAR_DTYPE, mode='r')
+
+    def write(self, symbol: str, interval: str, bars: np.ndarray, replace: bool = False):
+        """
+        Appends `bars` (sorted by timestamp). Stored bars at or after the first new
+        timestamp are dropped first, so a re-fetched, still-forming last bar is
+        overwritten rather than duplicated. replace=True rewrites the whole file.
+        """
+        path = self._path(symbol, interval, "bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if replace or not os.path.exists(path):
+            with open(path + ".tmp", "wb") as f:
+                f.write(bars.tobytes())
+            os.replace(path + ".tmp", path)
+            return
+        if not len(bars):
+            return
+
+        stored = self.read(symbol, interval)
+        keep = int(np.searchsorted(stored['timestamp'], bars['timestamp'][0], side='left')) if len(stored) else 0
+        del stored
+        with open(path, "r+b") as f:
+            f.truncate(keep * BAR_DTYPE.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(bars.tobytes())
+
+    @staticmethod
+    def bars_from_history(df: pd.DataFrame) -> np.ndarray:
+        """Converts a yfinance history frame (Open/High/Low/Close/... columns) into BAR_DTYPE records."""
+        bars = np.empty(len(df), dtype=BAR_DTYPE)
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        bars['timestamp'] = index.as_unit("ns").asi8
+        for field, column in (('open', 'Open'), ('high', 'High'), ('low', 'Low'), ('close', 'Close')):
+            bars[field] = df[column].to_numpy(dtype=float)
+        bars['adj_close'] = df['Adj Close'].to_numpy(dtype=float) if 'Adj Close' in df.columns else bars['close']
+        bars['volume'] = df['Volume'].to_numpy(dtype=float) if 'Volume' in df.columns else 0.0
+        return bars
+
+    @staticmethod
+    def to_candles(symbol: str, bars: np.ndarray, tz: Optional[str] = None) -> List[PriceCandle]:
+        """Builds PriceCandle objects column-wise; stored values are already validated floats."""
+        index = pd.DatetimeIndex(bars['timestamp'].astype("datetime64[ns]"))
+        if tz:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        symbol = symbol.upper()
+        return [
+            PriceCandle.model_construct(
+                symbol=symbol, timestamp=ts, open=o, high=h, low=l, close=c, adj_close=a, volume=v
+            )
+            for ts, o, h, l, c, a, v in zip(
+                index.to_pydatetime(), bars['open'].tolist(), bars['high'].tolist(), bars['low'].tolist(),
+                bars['close'].tolist(), bars['adj_close'].tolist(), np.floor(bars['volume']).tolist()
+            )
+        ]
+
+    @staticmethod
+    def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+        """Earliest UTC timestamp a calendar `period` covers; None for 'max' and session periods."""
+        if now is None:
+            now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        if period == "ytd":
+            return pd.Timestamp(year=now.year, month=1, day=1)
+        if period in PERIOD_OFFSETS:
+            return now - PERIOD_OFFSETS[period]
+        return None
+
+    @staticmethod
+    def _days(bars: np.ndarray) -> np.ndarray:
+        return bars['timestamp'] // (24 * 3600 * 10**9)
+
+    @classmethod
+    def slice_period(cls, bars: np.ndarray, period: str) -> np.ndarray:
+        if not len(bars):
+            return bars
+        if period in SESSION_PERIODS:
+            days = cls._days(bars)
+            first_day = np.unique(days)[-SESSION_PERIODS[period]:][0]
+            return bars[np.searchsorted(days, first_day, side='left'):]
+        start = cls.period_start(period)
+        if start is None:
+            return bars
+        return bars[np.searchsorted(bars['timestamp'], start.value, side='left'):]
+
+    def _covers(self, meta: Dict[str, Any], period: str, stored: np.ndarray) -> bool:
+        """Whether the stored series reaches back far enough for `period`."""
+        covered_from = meta.get("covered_from")
+        if covered_from is None:  # fetched with period="max"
+            return True
+        if period == "max":
+            return False
+        if period in SESSION_PERIODS:
+            # Enough sessions stored, or the source was already asked for at least this many
+            wanted = SESSION_PERIODS[period]
+            return meta.get("sessions", 0) >= wanted or len(np.unique(self._days(stored))) >= wanted
+        start = self.period_start(period)
+        if start is None:
+            return True
+        return covered_from <= start.value
+
+    def _store_full(self, symbol: str, period: str, interval: str, df: pd.DataFrame) -> Dict[str, Any]:
+        start = self.period_start(period)
+        if period == "max":
+            covered_from = None
+        elif start is not None:
+            covered_from = int(start.value)
+        else:
+            covered_from = int(self.bars_from_history(df.iloc[:1])['timestamp'][0])
+
+        self.write(symbol, interval, self.bars_from_history(df), replace=True)
+        meta = {
+            "tz": str(df.index.tz) if getattr(df.index, 'tz', None) is not None else None,
+            "covered_from": covered_from,
+            "fetched_at": time.time()
+        }
+        if period in SESSION_PERIODS:
+            # The source has no more than this, even if it returned fewer sessions
+            meta["sessions"] = SESSION_PERIODS[period]
+        self._write_meta(symbol, interval, meta)
+        logger.info(f"Stored {len(df)} {interval} bars for {symbol}")
+        return meta
+
+    def get_history(self, symbol: str, period: str, interval: str, fetch: HistoryFetcher) -> List[PriceCandle]:
+        """
+        Serves `period` of `symbol` history from the store, fetching only what is
+        missing: bars after the last stored one, or the full period when the
+        stored series doesn't reach back far enough. Returns [] when the source
+        has no data for the symbol.
+        """
+        lock = self._series_lock(symbol, interval)
+        with lock:
+            meta = self.meta(symbol, interval)
+            stored = self.read(symbol, interval)
+            full = meta is None or not len(stored) or not self._covers(meta, period, stored)
+            stale = full or time.time() - meta.get("fetched_at", 0) >= self.min_refresh_seconds
+            # Re-fetch from the last stored bar, which may still have been forming
+            last = None if full else pd.Timestamp(int(stored['timestamp'][-1]), tz="UTC")
+            del stored
+
+        # The network is asked without holding the lock
+        df = full_df = None
+        if full:
+            full_df = fetch(period=period)
+            if full_df is None or full_df.empty:
+                return []
+        elif stale:
+            try:
+                df = fetch(start=last.to_pydatetime())
+            except Exception as e:
+                # e.g. intraday intervals only allow a limited lookback for start=
+                logger.info(f"Incremental fetch failed for {symbol} ({e}), refetching {period}")
+                full_df = fetch(period=period)
+
+        with lock:
+            if full_df is not None and not full_df.empty:
+                meta = self._store_full(symbol, period, interval, full_df)
+            elif stale:
+                if df is not None and not df.empty:
+                    self.write(symbol, interval, self.bars_from_history(df))
+                    logger.debug(f"Appended {len(df)} {interval} bars for {symbol}")
+                meta = self.meta(symbol, interval) or meta
+                meta["fetched_at"] = time.time()
+                self._write_meta(symbol, interval, meta)
+
+            bars = self.slice_period(self.read(symbol, interval), period)
+            return self.to_candles(symbol, bars, meta.get("tz"))
+
+ohlcv_store = OHLCVStore(settings.OHLCV_STORE_DIR, settings.OHLCV_STORE_REFRESH_SECONDS)
@@ -0,0 +1,137 @@
+"""
+Parameter Sweep - grid-searches strategy parameters across a process pool.
+
+The OHLCV arrays are written once into shared memory; each worker process
+attaches to the block at startup and rebuilds its DataFrame from it, so tasks
+only carry the strategy parameters instead of a pickled DataFrame.
+"""
+
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+
+from backend.core.backtester import Backtester
+from backend.core.strategies import Strategy
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+RESULT_METRICS = ['total_trades', 'win_rate', 'profit_factor', 'total_pnl', 'max_drawdown', 'sharpe_ratio']
+
+# Per-worker state, populated by _init_worker. The segment handle is kept for the
+# worker's lifetime because the DataFrame columns are views into it.
+_worker_df: Optional[pd.DataFrame] = None
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _init_worker(shm_name: str, n_rows: int, tz: Optional[str], symbol: Optional[str]):
+    """Attaches to the shared OHLCV block and builds this worker's DataFrame once, without copying."""
+    global _worker_df, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+
+    timestamps = np.ndarray((n_rows,), dtype=np.int64, buffer=_worker_shm.buf)
+    values = np.ndarray((len(OHLCV_COLUMNS), n_rows), dtype=np.float64, buffer=_worker_shm.buf, offset=n_rows * 8)
+
+    if tz is None:
+        index = pd.RangeIndex(n_rows)
+    else:
+        index = pd.DatetimeIndex(timestamps.astype("datetime64[ns]"))
+        if tz != "naive":
+            index = index.tz_localize("UTC").tz_convert(tz)
+
+    df = pd.DataFrame(values.T, columns=OHLCV_COLUMNS, index=index, copy=False)
+    if symbol:
+        df['symbol'] = symbol
+    _worker_df = df
+
+
+def _run_backtest(strategy_cls: Type[Strategy], params: Dict[str, Any], initial_capital: float) -> Dict[str, Any]:
+    result = Backtester(initial_capital).run_vectorized(_worker_df, strategy_cls(**params))
+    row = dict(params)
+    row.update({metric: getattr(result, metric) for metric in RESULT_METRICS})
+    return row
+
+
+class ParameterSweep:
+    def __init__(
+        self,
+        strategy_cls: Type[Strategy],
+        param_grid: Dict[str, List[Any]],
+        initial_capital: float = 100000.0,
+        max_workers: Optional[int] = None,
+        rank_by: str = "sharpe_ratio"
+    ):
+        if not param_grid:
+            raise ValueError("param_grid must contain at least one parameter")
+        empty = [name for name, values in param_grid.items() if not len(values)]
+        if empty:
+            raise ValueError(f"param_grid has no values for {empty}")
+        if rank_by not in RESULT_METRICS:
+            raise ValueError(f"rank_by must be one of {RESULT_METRICS}")
+
+        self.strategy_cls = strategy_cls
+        self.param_grid = param_grid
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count()
+        self.rank_by = rank_by
+
+    def combinations(self) -> List[Dict[str, Any]]:
+        """Expands the grid into one parameter dict per backtest."""
+        keys = list(self.param_grid)
+        return [dict(zip(keys, values)) for values in itertools.product(*(self.param_grid[k] for k in keys))]
+
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Backtests every grid combination on `df` and returns one row per
+        combination (parameters + BacktestResult metrics), best first.
+        """
+        if df.empty:
+            raise ValueError("Empty DataFrame provided for parameter sweep")
+        missing = [c for c in OHLCV_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"DataFrame is missing columns {missing}")
+
+        combos = self.combinations()
+        n_rows = len(df)
+        symbol = str(df['symbol'].iloc[0]) if 'symbol' in df.columns else None
+
+        if isinstance(df.index, pd.DatetimeIndex):
+            tz = str(df.index.tz) if df.index.tz is not None else "naive"
+            timestamps = df.index.tz_convert("UTC").tz_localize(None) if df.index.tz is not None else df.index
+            timestamps = timestamps.as_unit("ns").asi8
+        else:
+            tz = None
+            timestamps = np.zeros(n_rows, dtype=np.int64)
+
+        shm = shared_memory.SharedMemory(create=True, size=n_rows * 8 * (1 + len(OHLCV_COLUMNS)))
+        try:
+            np.ndarray((n_rows,), dtype=np.int64, buffer=shm.buf)[:] = timestamps
+            values = np.ndarray((len(OHLCV_COLUMNS), n_rows), dtype=np.float64, buffer=shm.buf, offset=n_rows * 8)
+            for row, column in enumerate(OHLCV_COLUMNS):
+                values[row] = df[column].to_numpy(dtype=np.float64)
+            del values
+
+            logger.info(f"Sweeping {len(combos)} {self.strategy_cls.__name__} combinations over {self.max_workers} workers")
+            with ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(combos)),
+                initializer=_init_worker,
+                initargs=(shm.name, n_rows, tz, symbol)
+            ) as pool:
+                rows = list(pool.map(
+                    _run_backtest,
+                    itertools.repeat(self.strategy_cls),
+                    combos,
+                    itertools.repeat(self.initial_capital)
+                ))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        table = pd.DataFrame(rows, columns=list(self.param_grid) + RESULT_METRICS)
+        return table.sort_values(self.rank_by, ascending=False, kind="stable").reset_index(drop=True)
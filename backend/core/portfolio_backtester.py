@@ -0,0 +1,175 @@
+"""
+Portfolio Backtester - trades many symbols against one shared pool of capital.
+
+Signals for every symbol are generated up front, then the bar loop advances
+all symbols at once over (bars x symbols) arrays: exits, risk-based sizing and
+the exposure check are NumPy operations across the cross-section. A position
+closes on a SELL signal or when its bar trades at or below the stop loss
+(entry * (1 - stop_loss_pct)), the same stop the position was sized with.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from backend.core.indicators import Indicators
+from backend.core.risk import RiskRules
+from backend.core.strategies import Strategy, SIGNAL_NONE, SIGNAL_BUY, SIGNAL_SELL
+from backend.models import PortfolioBacktestResult, SignalType
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioBacktester:
+    def __init__(
+        self,
+        initial_capital: float = 100000.0,
+        risk_per_trade_percent: float = 1.0,
+        stop_loss_pct: float = 0.05,
+        max_exposure_pct: float = 1.0,
+        warmup: int = 50
+    ):
+        self.initial_capital = initial_capital
+        self.risk_per_trade_percent = risk_per_trade_percent
+        # Stop distance for RiskRules sizing and the stop exit (bulk signals carry no stop loss)
+        self.stop_loss_pct = stop_loss_pct
+        # Max gross exposure as a fraction of current equity
+        self.max_exposure_pct = max_exposure_pct
+        self.warmup = warmup
+
+    def run(self, panel: Dict[str, pd.DataFrame], strategy: Strategy) -> PortfolioBacktestResult:
+        """
+        Runs `strategy` cross-sectionally over `panel` ({symbol: OHLCV DataFrame}).
+        Frames are aligned on their common index before the simulation.
+        """
+        if not panel:
+            raise ValueError("Empty panel provided for portfolio backtest")
+
+        symbols = list(panel)
+        common_index = panel[symbols[0]].index
+        for symbol in symbols[1:]:
+            common_index = common_index.intersection(panel[symbol].index)
+        if len(common_index) <= self.warmup:
+            raise ValueError(f"Need more than {self.warmup} aligned bars, got {len(common_index)}")
+
+        frames = [Indicators.calculate_all(panel[s].loc[common_index]) for s in symbols]
+        opens = np.column_stack([f['open' if 'open' in f.columns else 'close'].to_numpy(dtype=float) for f in frames])
+        lows = np.column_stack([f['low'].to_numpy(dtype=float) for f in frames])
+        closes = np.column_stack([f['close'].to_numpy(dtype=float) for f in frames])
+        signals = np.column_stack([self._signals(f, strategy) for f in frames])
+
+        n_bars, n_symbols = closes.shape
+        cash = self.initial_capital
+        shares = np.zeros(n_symbols)
+        entry_prices = np.zeros(n_symbols)
+        equity_curve = [self.initial_capital]
+        traded_value = 0.0
+        trades = []
+
+        for t in range(self.warmup, n_bars):
+            price = closes[t]
+            valid = ~np.isnan(price)
+            timestamp = common_index[t] if isinstance(common_index[t], datetime) else datetime.now()
+
+            # Exits first so freed capital is available to new entries on the same bar.
+            # Stops fill at the stop price, or at the open when the bar gaps below it.
+            stop_prices = entry_prices * (1 - self.stop_loss_pct)
+            stop_mask = (shares > 0) & valid & ((lows[t] <= stop_prices) | (price <= stop_prices))
+            exit_mask = stop_mask | ((shares > 0) & (signals[t] == SIGNAL_SELL) & valid)
+            if exit_mask.any():
+                exit_prices = np.where(stop_mask, np.fmin(stop_prices, opens[t]), price)
+                proceeds = shares[exit_mask] * exit_prices[exit_mask]
+                cash += proceeds.sum()
+                traded_value += proceeds.sum()
+                for j, value in zip(np.flatnonzero(exit_mask), proceeds):
+                    trades.append({
+                        "symbol": symbols[j],
+                        "type": "SELL",
+                        "price": float(exit_prices[j]),
+                        "timestamp": timestamp,
+                        "shares": float(shares[j]),
+                        "pnl": float(value - shares[j] * entry_prices[j]),
+                        "reason": "stop_loss" if stop_mask[j] else "signal"
+                    })
+                shares[exit_mask] = 0.0
+
+            # Entries: size each candidate with RiskRules, then admit them in symbol
+            # order while the cumulative exposure and cash allow
+            entry_candidates = np.flatnonzero((shares == 0) & (signals[t] == SIGNAL_BUY) & valid)
+            if len(entry_candidates):
+                held_value = np.nansum(shares * price)
+                equity = cash + held_value
+                entry = price[entry_candidates]
+                sizes = RiskRules.calculate_position_sizes(
+                    equity, self.risk_per_trade_percent, entry, entry * (1 - self.stop_loss_pct)
+                )
+                cumulative_value = np.cumsum(sizes * entry)
+                allowed = RiskRules.check_exposure_limit(held_value, equity * self.max_exposure_pct, cumulative_value)
+                allowed &= (cumulative_value <= cash) & (sizes > 0)
+                # Keep only the admissible prefix so earlier symbols aren't skipped for later ones
+                accepted = entry_candidates[:np.argmin(allowed)] if not allowed.all() else entry_candidates
+                if len(accepted):
+                    accepted_sizes = sizes[:len(accepted)]
+                    cost = accepted_sizes * price[accepted]
+                    cash -= cost.sum()
+                    traded_value += cost.sum()
+                    shares[accepted] = accepted_sizes
+                    entry_prices[accepted] = price[accepted]
+                    for j, size in zip(accepted, accepted_sizes):
+                        trades.append({
+                            "symbol": symbols[j],
+                            "type": "BUY",
+                            "price": float(price[j]),
+                            "timestamp": timestamp,
+                            "shares": float(size)
+                        })
+
+            equity_curve.append(cash + np.nansum(shares * price))
+
+        return self._build_result(symbols, common_index, trades, equity_curve, traded_value)
+
+    def _signals(self, df: pd.DataFrame, strategy: Strategy) -> np.ndarray:
+        """Bulk signals, falling back to per-bar analyze() on a rolling window."""
+        try:
+            return np.asarray(strategy.generate_signals(df))
+        except NotImplementedError:
+            codes = {SignalType.BUY: SIGNAL_BUY, SignalType.SELL: SIGNAL_SELL}
+            signals = np.full(len(df), SIGNAL_NONE, dtype=np.int8)
+            for i in range(self.warmup, len(df)):
+                signal = strategy.analyze(df.iloc[max(0, i + 1 - 250):i+1])
+                if signal:
+                    signals[i] = codes.get(signal.signal, SIGNAL_NONE)
+            return signals
+
+    def _build_result(self, symbols: List[str], index: pd.Index, trades: List[Dict],
+                      equity_curve: List[float], traded_value: float) -> PortfolioBacktestResult:
+        equity_curve = np.array(equity_curve)
+
+        peak = np.maximum.accumulate(equity_curve)
+        max_drawdown = ((equity_curve - peak) / peak).min()
+
+        returns = np.diff(equity_curve) / equity_curve[:-1]
+        std = returns.std() if len(returns) > 1 else 0.0
+        sharpe_ratio = returns.mean() / std * np.sqrt(252) if std > 0 else 0.0
+
+        pnls = np.array([t['pnl'] for t in trades if t['type'] == 'SELL'], dtype=float)
+
+        return PortfolioBacktestResult(
+            symbols=symbols,
+            start_date=index[0] if isinstance(index[0], datetime) else datetime.now(),
+            end_date=index[-1] if isinstance(index[-1], datetime) else datetime.now(),
+            initial_capital=self.initial_capital,
+            final_equity=float(equity_curve[-1]),
+            total_pnl=float(equity_curve[-1] - self.initial_capital),
+            total_return=float(equity_curve[-1] / self.initial_capital - 1),
+            max_drawdown=float(max_drawdown),
+            sharpe_ratio=float(sharpe_ratio),
+            turnover=float(traded_value / equity_curve.mean()),
+            total_trades=len(pnls),
+            win_rate=float((pnls > 0).mean()) if len(pnls) else 0.0,
+            equity_curve=equity_curve.tolist(),
+            trades=trades
+        )
@@ -0,0 +1,90 @@
+"""
+Response Cache - two-tier cache for LLM completions.
+
+A size-bounded in-process LRU sits in front of a shared Redis tier, so
+identical prompts are answered locally when possible and across processes
+otherwise. Each entry carries its own expiry (callers choose the TTL per kind
+of prompt); Redis hits are copied into the LRU for the rest of their lifetime.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from backend.database import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512, prefix: str = "llm"):
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    def _remember(self, key: str, expires_at: float, text: str):
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                value = await redis.get(f"{self.prefix}:{key}")
+                if value:
+                    data = json.loads(value)
+                    if data["expires_at"] > now:
+                        self._remember(key, data["expires_at"], data["text"])
+                        self.redis_hits += 1
+                        return data["text"]
+            except Exception as e:
+                logger.warning(f"LLM cache Redis lookup failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, text: str, ttl: float):
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, text)
+        redis = await get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(f"{self.prefix}:{key}", json.dumps({"text": text, "expires_at": expires_at}), ex=max(1, int(ttl)))
+        except Exception as e:
+            logger.warning(f"LLM cache Redis write failed: {e}")
+
+    def clear(self):
+        """Drops the in-process tier (Redis entries expire on their own)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses
+        }
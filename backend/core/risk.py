@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,6 +34,23 @@ class RiskRules:
         risk_amount = account_size * (risk_per_trade_percent / 100)
         return risk_amount / risk_per_share
 
+    @staticmethod
+    def calculate_position_sizes(
+        account_size: float,
+        risk_per_trade_percent: float,
+        entry_prices: np.ndarray,
+        stop_losses: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_position_size for many candidates at once.
+        Risk per share is |entry - stop| (long or short); zero risk sizes to 0.
+        """
+        risk_per_share = np.abs(np.asarray(entry_prices, dtype=float) - np.asarray(stop_losses, dtype=float))
+        risk_amount = account_size * (risk_per_trade_percent / 100)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sizes = np.where(risk_per_share > 0, risk_amount / risk_per_share, 0.0)
+        return sizes
+
     @staticmethod
     def check_exposure_limit(
         current_exposure: float,
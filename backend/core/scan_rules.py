@@ -0,0 +1,166 @@
+"""
+Scan Rules - a small expression language for user-defined scans.
+
+A rule such as "rsi_14 < 35 and close > sma_50 and volume > 2 * avg_volume_20"
+is parsed once with Python's `ast` module, checked against a whitelist of node
+types and compiled into a tree of NumPy operations. The compiled rule takes
+{column: array} and returns a boolean mask, so one call evaluates the rule for
+a whole universe (or a whole history). Rows where any column the rule uses is
+NaN (e.g. indicator warmup) never match. Compiled rules are cached by text.
+"""
+
+import ast
+import logging
+import operator
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Mapping
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_RULE_LENGTH = 500
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_COMPARE_OPS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+_FUNCTIONS = {
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+Columns = Mapping[str, np.ndarray]
+
+
+def _condition(value) -> np.ndarray:
+    value = np.asarray(value)
+    if value.dtype != bool:
+        raise ValueError("Rules and the operands of and/or/not must be comparisons")
+    return value
+
+
+class CompiledRule:
+    """A parsed scan rule; call it with {column: array} to get a boolean mask."""
+
+    def __init__(self, expression: str, fn: Callable[[Columns], np.ndarray], columns: FrozenSet[str]):
+        self.expression = expression
+        self.columns = columns
+        self._fn = fn
+
+    def __call__(self, columns: Columns) -> np.ndarray:
+        missing = self.columns - set(columns)
+        if missing:
+            raise ValueError(f"Unknown column(s) in rule: {sorted(missing)}")
+        shape = np.shape(next(iter(columns.values()))) if columns else ()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = np.broadcast_to(_condition(self._fn(columns)), shape).copy()
+        # `!=` and `not` are True on NaN, so rows missing a referenced value are masked out explicitly
+        for column in self.columns:
+            result &= ~np.isnan(np.asarray(columns[column], dtype=float))
+        return result
+
+    def __repr__(self):
+        return f"CompiledRule({self.expression!r})"
+
+
+def _compile_node(node: ast.AST, columns: set) -> Callable[[Columns], np.ndarray]:
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, columns) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def bool_op(data):
+            result = _condition(parts[0](data))
+            for part in parts[1:]:
+                result = combine(result, _condition(part(data)))
+            return result
+        return bool_op
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, columns)
+        if isinstance(node.op, ast.Not):
+            return lambda data: np.logical_not(_condition(operand(data)))
+        if isinstance(node.op, ast.USub):
+            return lambda data: -operand(data)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        left, right = _compile_node(node.left, columns), _compile_node(node.right, columns)
+        return lambda data: op(left(data), right(data))
+
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPS for op in node.ops):
+        # Chained comparisons (a < b < c) expand to (a < b) and (b < c)
+        operands = [_compile_node(n, columns) for n in [node.left] + node.comparators]
+        ops = [_COMPARE_OPS[type(op)] for op in node.ops]
+
+        def compare(data):
+            values = [operand(data) for operand in operands]
+            result = ops[0](values[0], values[1])
+            for i, op in enumerate(ops[1:], start=1):
+                result = np.logical_and(result, op(values[i], values[i + 1]))
+            return result
+        return compare
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS and not node.keywords:
+        fn = _FUNCTIONS[node.func.id]
+        args = [_compile_node(a, columns) for a in node.args]
+        if node.func.id == "abs" and len(args) != 1 or node.func.id != "abs" and len(args) != 2:
+            raise ValueError(f"Wrong number of arguments to {node.func.id}()")
+        return lambda data: fn(*(arg(data) for arg in args))
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        columns.add(name)
+        return lambda data: np.asarray(data[name], dtype=float)
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+        value = np.bool_(node.value)
+        return lambda data: value
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        value = float(node.value)
+        return lambda data: value
+
+    raise ValueError(f"Unsupported syntax in rule: {ast.dump(node)[:80]}")
+
+
+@lru_cache(maxsize=256)
+def _compile(expression: str) -> CompiledRule:
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid rule syntax: {e.msg}") from None
+    columns: set = set()
+    fn = _compile_node(tree.body, columns)
+    logger.debug(f"Compiled scan rule {expression!r} over {sorted(columns)}")
+    return CompiledRule(expression, fn, frozenset(columns))
+
+
+def compile_rule(expression: str) -> CompiledRule:
+    """
+    Parses and compiles `expression`, reusing the cached result for rules seen
+    before. Raises ValueError for empty, oversized or unsupported rules.
+    """
+    expression = " ".join(expression.split())
+    if not expression:
+        raise ValueError("Rule is empty")
+    if len(expression) > MAX_RULE_LENGTH:
+        raise ValueError(f"Rule is longer than {MAX_RULE_LENGTH} characters")
+    return _compile(expression)
+
+
+def evaluate_rule(expression: str, columns: Dict[str, np.ndarray]) -> np.ndarray:
+    return compile_rule(expression)(columns)
@@ -0,0 +1,118 @@
+"""
+Cross-sectional scanner scoring.
+
+Scores a whole universe at once from (symbols x bars) close/volume matrices:
+every bullish criterion of the stock scanner is a 2-D NumPy expression, so a
+scan of hundreds of symbols costs a handful of array operations once the data
+is loaded. Rows are right-aligned (the last column is each symbol's latest
+bar) and NaN-padded on the left where a symbol has less history.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MIN_BARS = 14
+MIN_SIGNALS = 2
+
+# Scanner criteria in reporting order: (name, reason template)
+CRITERIA = [
+    ("rsi_oversold", "RSI oversold at {rsi:.1f}"),
+    ("above_sma_20", "Price above 20-day SMA"),
+    ("momentum", "Short-term momentum positive"),
+    ("volume_surge", "Volume surge: {volume_surge:.1f}x average"),
+    ("weekly_gain", "Up {week_change:.1f}% this week"),
+]
+
+
+def build_matrix(panel: Dict[str, pd.DataFrame], column: str) -> Tuple[List[str], np.ndarray]:
+    """Packs one column of each frame into a right-aligned, NaN-padded (symbols x bars) matrix."""
+    symbols = list(panel)
+    columns = [panel[s][column].to_numpy(dtype=float) for s in symbols]
+    width = max((len(c) for c in columns), default=0)
+    matrix = np.full((len(symbols), width), np.nan)
+    for row, values in enumerate(columns):
+        if len(values):
+            matrix[row, width - len(values):] = values
+    return symbols, matrix
+
+
+def _trailing_mean(matrix: np.ndarray, window: np.ndarray) -> np.ndarray:
+    """Mean of the last `window[i]` columns of each row i."""
+    n_bars = matrix.shape[1]
+    mask = np.arange(n_bars) >= (n_bars - window)[:, None]
+    return np.where(mask, matrix, 0.0).sum(axis=1) / window
+
+
+def score_matrix(close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Computes the scanner indicators and criteria for every row of `close` /
+    `volume` (symbols x bars). Returns 1-D arrays per symbol plus the boolean
+    (symbols x criteria) matrix, 'signal_strength', 'confidence' and 'bullish'.
+    """
+    n_symbols, n_bars = close.shape
+    bars = (~np.isnan(close)).sum(axis=1)
+    eligible = bars >= MIN_BARS
+    # Keep the column lookups below in bounds for rows that are too short anyway
+    safe_bars = np.maximum(bars, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current = close[:, -1] if n_bars else np.full(n_symbols, np.nan)
+        prev = close[:, -2] if n_bars > 1 else current
+        change_percent = (current - prev) / prev * 100
+
+        # RSI: simple 14-bar averages of gains and losses (NaN deltas count as 0)
+        delta = np.diff(close, axis=1, prepend=np.nan)
+        gains = np.where(delta > 0, delta, 0.0)[:, -14:]
+        losses = np.where(delta < 0, -delta, 0.0)[:, -14:]
+        avg_gain = gains.mean(axis=1)
+        avg_loss = losses.mean(axis=1)
+        rsi = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+
+        # SMA-20 falls back to the whole history for shorter series
+        sma_20 = _trailing_mean(np.nan_to_num(close), np.minimum(safe_bars, 20))
+        sma_5 = _trailing_mean(np.nan_to_num(close), np.minimum(safe_bars, 5))
+
+        avg_volume = np.nanmean(np.where(np.isnan(close), np.nan, volume), axis=1) if n_bars else np.full(n_symbols, np.nan)
+        today_volume = volume[:, -1] if n_bars else np.full(n_symbols, np.nan)
+        volume_surge = np.where(avg_volume > 0, today_volume / avg_volume, 1.0)
+
+        week_ago = close[:, -5] if n_bars >= 5 else np.full(n_symbols, np.nan)
+        week_change = (current - week_ago) / week_ago * 100
+
+    criteria = np.column_stack([
+        rsi < 40,
+        current > sma_20,
+        sma_5 > sma_20 * 0.98,  # 5-day close to or above 20-day
+        volume_surge > 1.5,
+        week_change > 3,
+    ]) & eligible[:, None]
+
+    strength = criteria.sum(axis=1)
+    return {
+        "current_price": current,
+        "change_percent": change_percent,
+        "rsi": rsi,
+        "sma_5": sma_5,
+        "sma_20": sma_20,
+        "volume_surge": volume_surge,
+        "week_change": week_change,
+        "criteria": criteria,
+        "signal_strength": np.minimum(strength, 5),
+        "confidence": np.minimum(strength * 20, 100).astype(float),
+        "bullish": eligible & (strength >= MIN_SIGNALS),
+    }
+
+
+def reasons_for(scores: Dict[str, np.ndarray], row: int) -> List[str]:
+    """Human-readable reasons for the criteria row `row` met."""
+    values = {name: scores[name][row] for name in ("rsi", "volume_surge", "week_change")}
+    return [
+        template.format(**values)
+        for (name, template), met in zip(CRITERIA, scores["criteria"][row])
+        if met
+    ]
@@ -0,0 +1,172 @@
+"""
+Sentiment Cache - remembers LLM sentiment verdicts per article.
+
+yfinance returns the same headlines for a symbol many times a day, and each
+verdict costs an LLM call. Verdicts are keyed by a SHA-256 of (article URL, or
+title when there is none; target symbol; prompt version), so a changed prompt
+never reuses old verdicts. Entries live in Redis with a TTL and in Mongo (with
+a TTL index) as the fallback when Redis misses or is unavailable; Mongo hits
+are copied back into Redis.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.configs.settings import settings
+from backend.database import get_database, get_redis
+from backend.models import NewsArticle
+
+logger = logging.getLogger(__name__)
+
+# A cached verdict: {"is_relevant": bool, "sentiment": str, "score": float, "impact": int}
+Record = Dict[str, Any]
+
+
+class SentimentCache:
+    def __init__(self, ttl: int = 86400, prefix: str = "sentiment", collection_name: str = "sentiment_cache"):
+        self.ttl = ttl
+        self.prefix = prefix
+        self.collection_name = collection_name
+        self._index_ready = False
+        self.redis_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(article: NewsArticle, symbol: Optional[str], version: str) -> str:
+        identity = article.url or article.title
+        return hashlib.sha256(f"{identity}\x1f{(symbol or '').upper()}\x1f{version}".encode()).hexdigest()
+
+    def _redis_key(self, digest: str, symbol: Optional[str], version: str) -> str:
+        # Version and symbol are in the key (not just the hash) so they can be invalidated by pattern
+        return f"{self.prefix}:{version}:{(symbol or '_').upper()}:{digest}"
+
+    async def _collection(self):
+        db = await get_database()
+        if db is None:
+            return None
+        collection = db[self.collection_name]
+        if not self._index_ready:
+            # Mongo removes documents once expires_at has passed
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    async def get_many(self, articles: List[NewsArticle], symbol: Optional[str], version: str) -> Dict[int, Record]:
+        """Cached verdicts by position in `articles`."""
+        digests = [self.digest(a, symbol, version) for a in articles]
+        keys = [self._redis_key(d, symbol, version) for d in digests]
+        found: Dict[int, Record] = {}
+
+        redis = await get_redis()
+        if redis is not None and keys:
+            try:
+                for i, value in enumerate(await redis.mget(keys)):
+                    if value:
+                        found[i] = json.loads(value)
+            except Exception as e:
+                logger.warning(f"Sentiment cache Redis lookup failed: {e}")
+        self.redis_hits += len(found)
+
+        missing = [i for i in range(len(articles)) if i not in found]
+        if missing:
+            try:
+                collection = await self._collection()
+                if collection is not None:
+                    cursor = collection.find({
+                        "_id": {"$in": [digests[i] for i in missing]},
+                        "expires_at": {"$gt": datetime.utcnow()}
+                    })
+                    by_digest = {doc["_id"]: doc["record"] for doc in await cursor.to_list(length=len(missing))}
+                    backfill = []
+                    for i in missing:
+                        if digests[i] in by_digest:
+                            found[i] = by_digest[digests[i]]
+                            backfill.append((keys[i], found[i]))
+                    self.mongo_hits += len(backfill)
+                    await self._set_redis(backfill)
+            except Exception as e:
+                logger.warning(f"Sentiment cache Mongo lookup failed: {e}")
+
+        self.misses += len(articles) - len(found)
+        if found:
+            logger.info(f"Sentiment cache: {len(found)}/{len(articles)} articles already scored for {symbol}")
+        return found
+
+    async def set_many(self, entries: List[Tuple[NewsArticle, Record]], symbol: Optional[str], version: str):
+        if not entries:
+            return
+        digests = [self.digest(article, symbol, version) for article, _ in entries]
+        await self._set_redis([
+            (self._redis_key(d, symbol, version), record) for d, (_, record) in zip(digests, entries)
+        ])
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return
+            expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+            for d, (_, record) in zip(digests, entries):
+                await collection.replace_one(
+                    {"_id": d},
+                    {"symbol": (symbol or "").upper(), "version": version, "record": record, "expires_at": expires_at},
+                    upsert=True
+                )
+        except Exception as e:
+            logger.warning(f"Sentiment cache Mongo write failed: {e}")
+
+    async def _set_redis(self, items: List[Tuple[str, Record]]):
+        redis = await get_redis()
+        if redis is None or not items:
+            return
+        try:
+            for key, record in items:
+                await redis.set(key, json.dumps(record), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Sentiment cache Redis write failed: {e}")
+
+    async def invalidate(self, symbol: Optional[str] = None, version: Optional[str] = None) -> int:
+        """
+        Deletes cached verdicts for `symbol` and/or prompt `version` (everything
+        when both are None). Returns the number of entries removed.
+        """
+        deleted = 0
+        redis = await get_redis()
+        if redis is not None:
+            pattern = f"{self.prefix}:{version or '*'}:{symbol.upper() if symbol else '*'}:*"
+            try:
+                keys = [key async for key in redis.scan_iter(match=pattern)]
+                if keys:
+                    deleted = await redis.delete(*keys)
+            except Exception as e:
+                logger.warning(f"Sentiment cache Redis invalidation failed: {e}")
+
+        try:
+            collection = await self._collection()
+            if collection is not None:
+                query: Dict[str, Any] = {}
+                if symbol:
+                    query["symbol"] = symbol.upper()
+                if version:
+                    query["version"] = version
+                result = await collection.delete_many(query)
+                deleted = max(deleted, result.deleted_count)
+        except Exception as e:
+            logger.warning(f"Sentiment cache Mongo invalidation failed: {e}")
+
+        logger.info(f"Invalidated {deleted} sentiment cache entries (symbol={symbol}, version={version})")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.redis_hits + self.mongo_hits + self.misses
+        return {
+            "redis_hits": self.redis_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.redis_hits + self.mongo_hits) / lookups, 3) if lookups else None
+        }
+
+
+sentiment_cache = SentimentCache(ttl=settings.SENTIMENT_CACHE_TTL_SECONDS)
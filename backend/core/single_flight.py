@@ -0,0 +1,125 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one in-flight task instead of each
+making their own round trip, and a finished result is reused for a short TTL
+so a burst of requests for the same symbol costs a single upstream fetch.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from backend.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable form of call arguments (lists/dicts/sets become tuples)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+class SingleFlight:
+    def __init__(self, ttl: float = 2.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._recent: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.coalesced = 0
+        self.executed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """
+        Returns fn()'s result, sharing it with every concurrent caller of `key`
+        and with callers arriving within `ttl` seconds after it completed.
+        Exceptions are shared with the concurrent callers but never cached.
+        """
+        ttl = self.ttl if ttl is None else ttl
+
+        recent = self._recent.get(key)
+        if recent is not None:
+            if recent[0] > time.monotonic():
+                self.coalesced += 1
+                return recent[1]
+            del self._recent[key]
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            task = None  # left over from another event loop (e.g. test clients)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finish, key, ttl))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Joining in-flight call {key}")
+
+        # Shielded so one caller being cancelled doesn't cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, ttl: float, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None or ttl <= 0:
+            return
+        self._recent[key] = (time.monotonic() + ttl, task.result())
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+    def forget(self, key: Hashable):
+        self._recent.pop(key, None)
+
+    def clear(self):
+        self._recent.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "recent": len(self._recent),
+            "executed": self.executed,
+            "coalesced": self.coalesced
+        }
+
+
+request_flights = SingleFlight(ttl=settings.SINGLE_FLIGHT_TTL_SECONDS)
+
+
+def single_flight(
+    ttl: Optional[float] = None,
+    clone: Optional[Callable[[Any], Any]] = None,
+    flight: Optional[SingleFlight] = None
+):
+    """
+    Decorator for async fetchers: calls with the same (function, arguments) are
+    coalesced through `flight` (request_flights by default). Arguments are
+    bound to the signature first, so positional and keyword forms share a key.
+    `clone` is applied to the shared result for each caller when callers may
+    mutate what they get back.
+    """
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, _freeze(bound.arguments))
+            result = await (flight or request_flights).do(key, lambda: fn(*args, **kwargs), ttl)
+            return clone(result) if clone else result
+
+        return wrapper
+    return decorator
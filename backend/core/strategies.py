@@ -1,20 +1,44 @@
 import pandas as pd
+import numpy as np
 from typing import List, Optional
 from datetime import datetime
+from collections import OrderedDict
 import logging
 
 from backend.models import TradeSignal, SignalType
 from .indicators import Indicators
-from .support_resistance import SupportResistance
+from .support_resistance import SupportResistance, SupportResistanceTracker
 from .trend import TrendDetector, Trend
 
 logger = logging.getLogger(__name__)
 
+# Bulk signal codes returned by Strategy.generate_signals
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
 class Strategy:
     def analyze(self, df: pd.DataFrame) -> Optional[TradeSignal]:
         raise NotImplementedError
 
+    def generate_signals(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Optional bulk API: returns one SIGNAL_* code per bar, where bar i is what
+        analyze(df.iloc[:i+1]) would have emitted. Computed in a single pass.
+        """
+        raise NotImplementedError
+
 class TechnicalBreakout(Strategy):
+    # Symbols whose S/R state is kept; the least recently analyzed are dropped
+    MAX_TRACKERS = 256
+
+    def __init__(self, volume_multiplier: float = 1.5, sr_window: int = 5, sr_threshold: float = 0.02):
+        self.volume_multiplier = volume_multiplier
+        self.sr_window = sr_window
+        self.sr_threshold = sr_threshold
+        # Per-symbol S/R state so repeated calls on a growing series only scan new bars
+        self._trackers: "OrderedDict[str, SupportResistanceTracker]" = OrderedDict()
+
     def analyze(self, df: pd.DataFrame) -> Optional[TradeSignal]:
         if len(df) < 50:
             return None
@@ -27,17 +51,21 @@ class TechnicalBreakout(Strategy):
         symbol = df['symbol'].iloc[-1] if 'symbol' in df.columns else "UNKNOWN"
         
         # Detect S/R levels
-        levels = SupportResistance.identify_levels(df)
-        support, resistance = SupportResistance.get_nearest_levels(current_price, levels)
-        
+        tracker = self._trackers.pop(symbol, None) or SupportResistanceTracker(self.sr_window, self.sr_threshold)
+        self._trackers[symbol] = tracker
+        while len(self._trackers) > self.MAX_TRACKERS:
+            self._trackers.popitem(last=False)
+        tracker.sync(df)
+
         # Breakout Logic: Close above resistance with volume confirmation
-        # Simple check: if previous close was below resistance and current is above
+        # The resistance is the nearest level above the previous close; a breakout closes through it
         prev_close = df['close'].iloc[-2]
-        
+        support, resistance = tracker.get_nearest_levels(prev_close)
+
         if resistance and prev_close < resistance and current_price > resistance:
-            # Volume check: Current volume > 1.5 * Avg Volume
+            # Volume check: Current volume > volume_multiplier (1.5) * Avg Volume
             avg_vol = df['volume'].rolling(20).mean().iloc[-1]
-            if df['volume'].iloc[-1] > 1.5 * avg_vol:
+            if df['volume'].iloc[-1] > self.volume_multiplier * avg_vol:
                 return TradeSignal(
                     symbol=symbol,
                     signal=SignalType.BUY,
@@ -51,7 +79,50 @@ class TechnicalBreakout(Strategy):
                 )
         return None
 
+    def generate_signals(self, df: pd.DataFrame) -> np.ndarray:
+        signals = np.full(len(df), SIGNAL_NONE, dtype=np.int8)
+        if len(df) < 50:
+            return signals
+
+        window, threshold = self.sr_window, self.sr_threshold
+
+        close = df['close'].to_numpy(dtype=float)
+        prev_close = np.roll(close, 1)
+        prev_close[0] = np.nan
+        avg_vol = df['volume'].rolling(20).mean().to_numpy(dtype=float)
+        candidates = df['volume'].to_numpy(dtype=float) > self.volume_multiplier * avg_vol
+        candidates[:49] = False
+
+        # A pivot at bar p is only known once `window` bars have closed after it,
+        # so the level set is piecewise constant between confirmation bars.
+        pivot_idx, pivot_prices = SupportResistance.find_pivots(df, window)
+        confirmed_at = pivot_idx + window
+        boundaries = np.flatnonzero(np.diff(confirmed_at)) + 1
+        segment_starts = np.concatenate(([0], boundaries)) if len(confirmed_at) else np.array([], dtype=int)
+
+        for k, start in enumerate(segment_starts):
+            end = segment_starts[k + 1] if k + 1 < len(segment_starts) else len(confirmed_at)
+            first_bar = confirmed_at[start]
+            last_bar = confirmed_at[end] if end < len(confirmed_at) else len(df)
+            bars = np.flatnonzero(candidates[first_bar:last_bar]) + first_bar
+            if not len(bars):
+                continue
+
+            levels = np.asarray(SupportResistance.consolidate_levels(list(pivot_prices[:end]), threshold))
+            # Nearest resistance strictly above the previous close
+            res_pos = np.searchsorted(levels, prev_close[bars], side='right')
+            has_res = res_pos < len(levels)
+            bars, res_pos = bars[has_res], res_pos[has_res]
+            resistance = levels[res_pos]
+            breakout = (resistance != 0) & (close[bars] > resistance)
+            signals[bars[breakout]] = SIGNAL_BUY
+
+        return signals
+
 class MeanReversion(Strategy):
+    def __init__(self, rsi_threshold: float = 30):
+        self.rsi_threshold = rsi_threshold
+
     def analyze(self, df: pd.DataFrame) -> Optional[TradeSignal]:
         if len(df) < 50:
             return None
@@ -64,8 +135,8 @@ class MeanReversion(Strategy):
         lower_band = df['bb_lower'].iloc[-1]
         symbol = df['symbol'].iloc[-1] if 'symbol' in df.columns else "UNKNOWN"
         
-        # Buy Condition: RSI < 30 AND Price < Lower Bollinger Band
-        if rsi < 30 and current_price < lower_band:
+        # Buy Condition: RSI < rsi_threshold (30) AND Price < Lower Bollinger Band
+        if rsi < self.rsi_threshold and current_price < lower_band:
              return TradeSignal(
                 symbol=symbol,
                 signal=SignalType.BUY,
@@ -79,7 +150,26 @@ class MeanReversion(Strategy):
             )
         return None
 
+    def generate_signals(self, df: pd.DataFrame) -> np.ndarray:
+        signals = np.full(len(df), SIGNAL_NONE, dtype=np.int8)
+        if len(df) < 50:
+            return signals
+
+        if 'rsi_14' not in df.columns:
+            df = Indicators.calculate_all(df)
+
+        rsi = df['rsi_14'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        lower_band = df['bb_lower'].to_numpy(dtype=float)
+
+        signals[(rsi < self.rsi_threshold) & (close < lower_band)] = SIGNAL_BUY
+        signals[:49] = SIGNAL_NONE
+        return signals
+
 class VolumeSurge(Strategy):
+    def __init__(self, volume_multiplier: float = 3.0):
+        self.volume_multiplier = volume_multiplier
+
     def analyze(self, df: pd.DataFrame) -> Optional[TradeSignal]:
         if len(df) < 50:
             return None
@@ -89,7 +179,7 @@ class VolumeSurge(Strategy):
         current_price = df['close'].iloc[-1]
         symbol = df['symbol'].iloc[-1] if 'symbol' in df.columns else "UNKNOWN"
         
-        if current_vol > 3 * avg_vol: # Massive volume spike
+        if current_vol > self.volume_multiplier * avg_vol: # Massive volume spike
              # Direction?
             if df['close'].iloc[-1] > df['open'].iloc[-1]:
                 signal = SignalType.BUY
@@ -111,20 +201,47 @@ class VolumeSurge(Strategy):
             )
         return None
 
+    def generate_signals(self, df: pd.DataFrame) -> np.ndarray:
+        signals = np.full(len(df), SIGNAL_NONE, dtype=np.int8)
+        if len(df) < 50:
+            return signals
+
+        avg_vol = df['volume'].rolling(20).mean().to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        surge = volume > self.volume_multiplier * avg_vol
+        bullish = df['close'].to_numpy(dtype=float) > df['open'].to_numpy(dtype=float)
+
+        signals[surge & bullish] = SIGNAL_BUY
+        signals[surge & ~bullish] = SIGNAL_SELL
+        signals[:49] = SIGNAL_NONE
+        return signals
+
 class MACDCrossover(Strategy):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+
+    def _histogram(self, df: pd.DataFrame) -> pd.Series:
+        """MACD histogram for this instance's spans, reusing precomputed columns for the defaults"""
+        if (self.fast, self.slow, self.signal) == (12, 26, 9):
+            if 'macd_hist' not in df.columns:
+                df = Indicators.calculate_all(df)
+            return df['macd_hist']
+        _, _, hist = Indicators.macd(df['close'], self.fast, self.slow, self.signal)
+        return hist
+
     def analyze(self, df: pd.DataFrame) -> Optional[TradeSignal]:
         if len(df) < 30:
             return None
-            
-        if 'macd_line' not in df.columns:
-            df = Indicators.calculate_all(df)
-            
+
         current_price = df['close'].iloc[-1]
         symbol = df['symbol'].iloc[-1] if 'symbol' in df.columns else "UNKNOWN"
         
         # MACD Logic
-        curr_hist = df['macd_hist'].iloc[-1]
-        prev_hist = df['macd_hist'].iloc[-2]
+        hist = self._histogram(df)
+        curr_hist = hist.iloc[-1]
+        prev_hist = hist.iloc[-2]
         
         # Bullish Crossover (Histogram flips from negative to positive)
         if prev_hist < 0 and curr_hist > 0:
@@ -155,3 +272,17 @@ class MACDCrossover(Strategy):
             )
             
         return None
+
+    def generate_signals(self, df: pd.DataFrame) -> np.ndarray:
+        signals = np.full(len(df), SIGNAL_NONE, dtype=np.int8)
+        if len(df) < 30:
+            return signals
+
+        hist = self._histogram(df).to_numpy(dtype=float)
+        prev_hist = np.roll(hist, 1)
+        prev_hist[0] = np.nan
+
+        signals[(prev_hist < 0) & (hist > 0)] = SIGNAL_BUY
+        signals[(prev_hist > 0) & (hist < 0)] = SIGNAL_SELL
+        signals[:29] = SIGNAL_NONE
+        return signals
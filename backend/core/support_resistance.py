@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,49 +14,85 @@ class SupportResistance:
         Identifies support and resistance levels based on local swing highs and lows.
         Returns a consolidated list of price levels.
         """
-        highs = df['high']
-        lows = df['low']
-        
-        levels = []
-        
-        # Find local maxima and minima
-        for i in range(window, len(df) - window):
-            is_high = all(highs[i] > highs[i-j] for j in range(1, window+1)) and \
-                      all(highs[i] > highs[i+j] for j in range(1, window+1))
-            
-            is_low = all(lows[i] < lows[i-j] for j in range(1, window+1)) and \
-                     all(lows[i] < lows[i+j] for j in range(1, window+1))
-            
-            if is_high:
-                levels.append(highs[i])
-            if is_low:
-                levels.append(lows[i])
-                
-        return SupportResistance.consolidate_levels(levels, threshold)
+        _, prices = SupportResistance.find_pivots(df, window)
+        return SupportResistance.consolidate_levels(prices, threshold)
+
+    @staticmethod
+    def identify_levels_multi(df: pd.DataFrame, windows: Sequence[int] = (3, 5, 10), threshold: float = 0.02) -> Dict[int, List[float]]:
+        """
+        identify_levels for several pivot window sizes, sharing one sweep over the
+        neighbour extremes. Returns {window: consolidated levels}.
+        """
+        pivots = SupportResistance._find_pivots_multi(df, windows)
+        return {w: SupportResistance.consolidate_levels(prices, threshold) for w, (_, prices) in pivots.items()}
 
     @staticmethod
-    def consolidate_levels(levels: List[float], threshold: float = 0.02) -> List[float]:
+    def find_pivots(df: pd.DataFrame, window: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized swing high/low detection: a bar is a pivot when its high (low) is
+        strictly above (below) the `window` bars on either side.
+        Returns (bar indices, pivot prices) ordered by bar, highs before lows.
+        """
+        return SupportResistance._find_pivots_multi(df, [window])[window]
+
+    @staticmethod
+    def _find_pivots_multi(df: pd.DataFrame, windows: Sequence[int]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        n = len(highs)
+        wanted = set(windows)
+        if not wanted or min(wanted) < 1:
+            raise ValueError("Pivot windows must be positive integers")
+
+        # Running max/min of the neighbours at distance 1..w on each side. Widening the
+        # window by one only folds in one shifted array, so all windows share one sweep.
+        # np.maximum/np.minimum propagate NaN, which then fails the strict comparison
+        # exactly like the scalar loop did.
+        left_high = np.full(n, -np.inf)
+        right_high = np.full(n, -np.inf)
+        left_low = np.full(n, np.inf)
+        right_low = np.full(n, np.inf)
+
+        result = {}
+        for w in range(1, max(wanted) + 1):
+            if w < n:
+                left_high[w:] = np.maximum(left_high[w:], highs[:-w])
+                right_high[:-w] = np.maximum(right_high[:-w], highs[w:])
+                left_low[w:] = np.minimum(left_low[w:], lows[:-w])
+                right_low[:-w] = np.minimum(right_low[:-w], lows[w:])
+            if w not in wanted:
+                continue
+
+            in_range = np.zeros(n, dtype=bool)
+            in_range[w:max(w, n - w)] = True
+            is_high = in_range & (highs > left_high) & (highs > right_high)
+            is_low = in_range & (lows < left_low) & (lows < right_low)
+
+            # A bar that is both a swing high and low yields its high first
+            idx = np.concatenate([np.flatnonzero(is_high), np.flatnonzero(is_low)])
+            prices = np.concatenate([highs[is_high], lows[is_low]])
+            kind = np.concatenate([np.zeros(is_high.sum(), dtype=int), np.ones(is_low.sum(), dtype=int)])
+            order = np.lexsort((kind, idx))
+            result[w] = (idx[order], prices[order])
+
+        return result
+
+    @staticmethod
+    def consolidate_levels(levels: Sequence[float], threshold: float = 0.02) -> List[float]:
         """
         Clusters nearby levels to avoid duplicates.
         Threshold is a percentage (e.g., 0.02 = 2%).
+        A sorted level joins the current cluster when it is within `threshold` of
+        the previous level; each cluster is replaced by its mean.
         """
-        if not levels:
+        values = np.sort(np.asarray(levels, dtype=float))
+        if not len(values):
             return []
-            
-        levels.sort()
-        consolidated = []
-        
-        current_group = [levels[0]]
-        
-        for i in range(1, len(levels)):
-            if levels[i] <= current_group[-1] * (1 + threshold):
-                current_group.append(levels[i])
-            else:
-                consolidated.append(sum(current_group) / len(current_group))
-                current_group = [levels[i]]
-                
-        consolidated.append(sum(current_group) / len(current_group))
-        return consolidated
+
+        breaks = np.flatnonzero(values[1:] > values[:-1] * (1 + threshold)) + 1
+        starts = np.concatenate(([0], breaks))
+        counts = np.diff(np.concatenate((starts, [len(values)])))
+        return (np.add.reduceat(values, starts) / counts).tolist()
 
     @staticmethod
     def get_nearest_levels(price: float, levels: List[float]) -> Tuple[float, float]:
@@ -66,3 +104,151 @@ class SupportResistance:
         nearest_resistance = min(resistances) if resistances else None
         
         return nearest_support, nearest_resistance
+
+
+class SupportResistanceTracker:
+    """
+    Incremental counterpart of SupportResistance.identify_levels.
+
+    Keeps the last 2 * window + 1 bars; when a new bar arrives the bar `window`
+    places back has both neighbourhoods complete and is finalized as a swing
+    high/low or discarded. Confirmed pivot prices live in a sorted list and the
+    consolidated levels are rebuilt only after the pivots change, so
+    nearest-level lookups are a bisect.
+
+    `sync` keeps the result equal to identify_levels on the frame it was given:
+    pivots the frame no longer reaches back to are dropped, and a frame that
+    starts earlier or doesn't line up with the tracked bars rebuilds the tracker.
+    """
+
+    def __init__(self, window: int = 5, threshold: float = 0.02):
+        if window < 1:
+            raise ValueError("Pivot window must be a positive integer")
+        self.window = window
+        self.threshold = threshold
+        self.bars = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self._times = deque(maxlen=2 * window + 1)
+        self._highs = deque(maxlen=2 * window + 1)
+        self._lows = deque(maxlen=2 * window + 1)
+        self._pivots: List[float] = []
+        # (bar timestamp, price) of each pivot in the order confirmed, for pruning
+        self._pivot_times = deque()
+        self._levels: List[float] = []
+        self._dirty = False
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, window: int = 5, threshold: float = 0.02) -> "SupportResistanceTracker":
+        tracker = cls(window, threshold)
+        tracker.sync(df)
+        return tracker
+
+    def reset(self):
+        self.__init__(self.window, self.threshold)
+
+    def update(self, high: float, low: float, timestamp: Any = None) -> bool:
+        """Consumes one bar; returns True when it confirmed a new pivot."""
+        self._times.append(timestamp)
+        self._highs.append(float(high))
+        self._lows.append(float(low))
+        self.bars += 1
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+
+        if len(self._highs) < self._highs.maxlen:
+            return False
+
+        w = self.window
+        highs, lows = list(self._highs), list(self._lows)
+        mid_high, mid_low, mid_time = highs[w], lows[w], self._times[w]
+        new_pivot = False
+        # Same strict comparisons as the batch scan, so NaN bars never qualify
+        if all(mid_high > h for h in highs[:w] + highs[w + 1:]):
+            insort(self._pivots, mid_high)
+            self._pivot_times.append((mid_time, mid_high))
+            new_pivot = True
+        if all(mid_low < l for l in lows[:w] + lows[w + 1:]):
+            insort(self._pivots, mid_low)
+            self._pivot_times.append((mid_time, mid_low))
+            new_pivot = True
+        self._dirty = self._dirty or new_pivot
+        return new_pivot
+
+    def sync(self, df: pd.DataFrame) -> int:
+        """
+        Feeds the rows of `df` that come after the last tracked bar and returns how
+        many were consumed. Bars are matched on the 'timestamp' column (or the
+        index); if `df` does not continue the tracked series, or starts before
+        the previous frame did, the tracker is rebuilt from `df`. Pivots that
+        `df` no longer covers are dropped.
+        """
+        timestamps = df['timestamp'] if 'timestamp' in df.columns else df.index
+        timestamps = pd.Index(timestamps)
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+
+        start = 0
+        if self.bars:
+            start = self._continuation(timestamps, highs, lows)
+            if start is None:
+                logger.debug(f"S/R tracker lost continuity at {self.last_timestamp}, rebuilding")
+                self.reset()
+                start = 0
+            elif len(df):
+                self.first_timestamp = timestamps[0]
+
+        for i in range(start, len(df)):
+            self.update(highs[i], lows[i], timestamps[i])
+
+        # A pivot needs `window` bars on its left inside the frame, as in the batch scan
+        self._prune(timestamps[self.window] if len(df) > self.window else None)
+        return len(df) - start
+
+    def _continuation(self, timestamps: pd.Index, highs: np.ndarray, lows: np.ndarray) -> Optional[int]:
+        """Row of `timestamps` after the last tracked bar, or None if the frame doesn't continue the series."""
+        if not len(timestamps) or timestamps[0] < self.first_timestamp:
+            return None
+        matches = np.flatnonzero(timestamps == self.last_timestamp)
+        if not len(matches):
+            return None
+        last = int(matches[-1])
+        # The tracked bars must also be the ones we saw, otherwise the data was
+        # replaced (different series or revised history)
+        n = min(len(self._highs), last + 1)
+        rows = slice(last + 1 - n, last + 1)
+        if (
+            list(timestamps[rows]) != list(self._times)[-n:]
+            or not np.array_equal(highs[rows], list(self._highs)[-n:], equal_nan=True)
+            or not np.array_equal(lows[rows], list(self._lows)[-n:], equal_nan=True)
+        ):
+            return None
+        return last + 1
+
+    def _prune(self, cutoff: Any):
+        """Drops pivots on bars before `cutoff` (all of them when cutoff is None)."""
+        while self._pivot_times and (cutoff is None or self._pivot_times[0][0] < cutoff):
+            _, price = self._pivot_times.popleft()
+            del self._pivots[bisect_left(self._pivots, price)]
+            self._dirty = True
+
+    @property
+    def pivots(self) -> List[float]:
+        return list(self._pivots)
+
+    @property
+    def levels(self) -> List[float]:
+        if self._dirty:
+            self._levels = SupportResistance.consolidate_levels(self._pivots, self.threshold)
+            self._dirty = False
+        return self._levels
+
+    def get_nearest_levels(self, price: float) -> Tuple[Optional[float], Optional[float]]:
+        """Nearest support (below) and resistance (above) `price`, like SupportResistance.get_nearest_levels."""
+        levels = self.levels
+        below = bisect_left(levels, price)
+        above = bisect_right(levels, price)
+        support = levels[below - 1] if below > 0 else None
+        resistance = levels[above] if above < len(levels) else None
+        return support, resistance
@@ -0,0 +1,165 @@
+"""
+Symbol Resolver - remembers which exchange suffix a bare symbol trades under.
+
+The fetchers try "", ".NS" and ".BO" in turn; without memory an NSE ticker
+always pays for a failed US lookup first. The resolver keeps the suffix that
+worked until it comes back empty several times in a row (yfinance also returns
+empty data on rate limits and transient errors), and briefly skips suffixes that
+never worked and returned no data. Both are persisted to a JSON file by a
+debounced background write and pre-warmed with the Indian stock lists.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from backend.configs.settings import settings
+from backend.core.indian_stocks import ALL_SCAN_STOCKS, HIGH_VOLATILITY_PICKS, NIFTY_50_SYMBOLS
+
+logger = logging.getLogger(__name__)
+
+SUFFIXES = ["", ".NS", ".BO"]
+
+
+class SymbolResolver:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        negative_ttl: float = 900.0,
+        max_failures: int = 3,
+        save_delay: float = 1.0,
+        suffixes: List[str] = SUFFIXES
+    ):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.max_failures = max_failures
+        self.save_delay = save_delay
+        self.suffixes = list(suffixes)
+        self._resolved: Dict[str, str] = {}
+        # symbol -> consecutive empty replies for its resolved suffix
+        self._failures: Dict[str, int] = {}
+        # symbol -> {suffix: expiry (epoch seconds)}
+        self._missing: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._load()
+
+    @staticmethod
+    def _normalize(symbol: str) -> str:
+        return symbol.strip().upper()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._resolved = data.get("resolved", {})
+            now = time.time()
+            self._missing = {
+                symbol: {suffix: expiry for suffix, expiry in entries.items() if expiry > now}
+                for symbol, entries in data.get("missing", {}).items()
+            }
+            logger.info(f"Loaded {len(self._resolved)} symbol resolutions from {self.path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load symbol resolutions from {self.path}: {e}")
+
+    def _save(self):
+        """Schedules a write in `save_delay` seconds (call with the lock held)."""
+        if not self.path or self._save_timer is not None:
+            return
+        # Written from a timer thread so request handlers never block on disk,
+        # and a burst of lookups costs a single write
+        self._save_timer = threading.Timer(self.save_delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def flush(self):
+        """Writes the current state to disk now."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self.path:
+                return
+            payload = json.dumps({"resolved": self._resolved, "missing": self._missing})
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path + ".tmp", "w") as f:
+                f.write(payload)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist symbol resolutions to {self.path}: {e}")
+
+    def prewarm(self):
+        """Seeds the NSE suffix for the known Indian stock lists (existing entries win)."""
+        known = {s.rsplit(".", 1)[0] for s in NIFTY_50_SYMBOLS} | set(ALL_SCAN_STOCKS) | set(HIGH_VOLATILITY_PICKS)
+        with self._lock:
+            for symbol in known:
+                self._resolved.setdefault(self._normalize(symbol), ".NS")
+
+    def candidates(self, symbol: str) -> List[str]:
+        """
+        Symbols to try, in order: the remembered suffix first, then the remaining
+        suffixes minus those that recently returned no data. Never empty: if
+        every suffix is being skipped, all of them are tried again.
+        """
+        key = self._normalize(symbol)
+        now = time.time()
+        with self._lock:
+            resolved = self._resolved.get(key)
+            missing = self._missing.get(key, {})
+            order = ([resolved] if resolved is not None else []) + [s for s in self.suffixes if s != resolved]
+            tried = [suffix for suffix in order if suffix == resolved or missing.get(suffix, 0) <= now]
+            return [f"{symbol}{suffix}" for suffix in (tried or order)]
+
+    @staticmethod
+    def _suffix(symbol: str, resolved_symbol: str) -> str:
+        return resolved_symbol[len(symbol):]
+
+    def record_success(self, symbol: str, resolved_symbol: str):
+        key, suffix = self._normalize(symbol), self._suffix(symbol, resolved_symbol)
+        with self._lock:
+            changed = self._resolved.get(key) != suffix
+            self._resolved[key] = suffix
+            self._failures.pop(key, None)
+            changed = self._missing.pop(key, None) is not None or changed
+            if changed:
+                self._save()
+
+    def record_failure(self, symbol: str, resolved_symbol: str):
+        """
+        Records an empty reply. The resolved suffix is forgotten only after
+        `max_failures` in a row; any other suffix is skipped for `negative_ttl` seconds.
+        """
+        key, suffix = self._normalize(symbol), self._suffix(symbol, resolved_symbol)
+        with self._lock:
+            if self._resolved.get(key) == suffix:
+                failures = self._failures.get(key, 0) + 1
+                if failures < self.max_failures:
+                    self._failures[key] = failures
+                    return
+                logger.info(f"{resolved_symbol} returned no data {failures} times in a row, forgetting its suffix")
+                del self._resolved[key]
+                self._failures.pop(key, None)
+            else:
+                self._missing.setdefault(key, {})[suffix] = time.time() + self.negative_ttl
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._resolved.clear()
+            self._failures.clear()
+            self._missing.clear()
+            self._save()
+
+
+symbol_resolver = SymbolResolver(
+    settings.SYMBOL_RESOLVER_PATH,
+    negative_ttl=settings.SYMBOL_RESOLVER_NEGATIVE_TTL_SECONDS,
+    max_failures=settings.SYMBOL_RESOLVER_MAX_FAILURES
+)
+symbol_resolver.prewarm()
@@ -0,0 +1,207 @@
+"""
+Telemetry - timing spans for the agent pipeline.
+
+`span(name, kind)` times a block. Spans opened while a `Trace` is active (see
+`start_trace`) are recorded on it with their parent span and attributes, so
+one analysis can report where its time went. Every span, traced or not, also
+feeds a process-wide latency histogram per (kind, name), and numeric span
+attributes such as LLM prompt/response sizes feed histograms of their own.
+
+The active trace and span live in context variables, so they follow the
+pipeline into LangGraph's parallel branches, asyncio tasks and to_thread calls.
+"""
+
+import bisect
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency buckets; anything slower lands in "+Inf"
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+# Upper bounds of the size buckets (characters)
+SIZE_BUCKETS = [100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000]
+
+
+class Histogram:
+    """Fixed-bucket histogram with count/sum/min/max and bucket-interpolated quantiles."""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / n
+                return round(min(max(value, self.min), self.max), 3)
+            seen += n
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """Process-wide histograms keyed by (metric, kind, name)."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, kind: str, name: str, value: float, buckets: List[float] = LATENCY_BUCKETS_MS):
+        key = (metric, kind, name)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{metric: {"kind:name": histogram snapshot}}"""
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with self._lock:
+            for (metric, kind, name), histogram in sorted(self._histograms.items()):
+                result.setdefault(metric, {})[f"{kind}:{name}"] = histogram.snapshot()
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
+
+
+class Trace:
+    """The spans recorded for one pipeline run, in completion order."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any]):
+        with self._lock:
+            self.spans.append(record)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 3)
+
+    def timings(self, kind: str = "node") -> Dict[str, float]:
+        """Total milliseconds per span name of `kind`."""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for record in self.spans:
+                if record["kind"] == kind:
+                    totals[record["name"]] = round(totals.get(record["name"], 0.0) + record["duration_ms"], 3)
+        return totals
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Spans ordered by start offset."""
+        with self._lock:
+            return sorted(self.spans, key=lambda r: r["start_ms"])
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    """Makes a new Trace current for the enclosed block (and the tasks it starts)."""
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "node", **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Times the enclosed block. Yields the span's attribute dict so the block can
+    add details it learns along the way (e.g. response size); numeric attributes
+    ending in "_chars" are also recorded as size histograms.
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        metrics.observe("latency_ms", kind, name, duration_ms)
+        for key, value in attrs.items():
+            if key.endswith("_chars") and isinstance(value, (int, float)):
+                metrics.observe(key, kind, name, value, SIZE_BUCKETS)
+        if trace is not None:
+            record = {
+                "name": name,
+                "kind": kind,
+                "parent": parent,
+                "start_ms": round((started - trace.started) * 1000, 3),
+                "duration_ms": duration_ms,
+                "attrs": dict(attrs),
+            }
+            if error:
+                record["error"] = error
+            trace.add(record)
+
+
+def traced(name: Optional[str] = None, kind: str = "node"):
+    """Decorator form of `span` for async functions."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,124 +1,257 @@
-
 from backend.configs.settings import settings
 from typing import Optional, List, Any, AsyncIterator, Dict, Union
 import logging
 import asyncio
+import time
+from backend.core.key_scheduler import KeyScheduler
+from backend.core.response_cache import ResponseCache
+from backend.core.single_flight import SingleFlight
+from backend.core.telemetry import span
 from langchain_core.messages import BaseMessage
 from langchain_core.runnables import Runnable, RunnableConfig
 
 logger = logging.getLogger(__name__)
 
 class MultiKeyChain(Runnable):
-    def __init__(self, llms: List[Any]):
+    def __init__(self, llms: List[Any], scheduler: Optional[KeyScheduler] = None):
         self.llms = llms
         # Basic validation
         if not self.llms:
             raise ValueError("MultiKeyChain cannot be initialized with empty LLM list")
+        # Picks the key for each call; shared with tool-bound copies of this chain
+        self.scheduler = scheduler or KeyScheduler(
+            len(llms),
+            requests_per_minute=settings.LLM_KEY_REQUESTS_PER_MINUTE,
+            burst=settings.LLM_KEY_BURST,
+            cooldown_seconds=settings.LLM_KEY_COOLDOWN_SECONDS,
+            failure_threshold=settings.LLM_KEY_FAILURE_THRESHOLD,
+            circuit_open_seconds=settings.LLM_KEY_CIRCUIT_OPEN_SECONDS,
+            max_wait_seconds=settings.LLM_KEY_MAX_WAIT_SECONDS
+        )
 
     def bind_tools(self, tools: Any, **kwargs) -> "MultiKeyChain":
         """Bind tools to all underlying LLMs"""
         bound_llms = [llm.bind_tools(tools, **kwargs) for llm in self.llms]
-        return MultiKeyChain(bound_llms)
+        return MultiKeyChain(bound_llms, scheduler=self.scheduler)
+
+    def _fail(self, errors: List[Exception]):
+        if errors:
+            raise Exception(f"All API keys failed. Last error: {errors[-1]}")
+        raise Exception("All API keys are rate limited or failing; try again shortly")
 
     async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
         errors = []
-        for i, llm in enumerate(self.llms):
+        tried = set()
+        while len(tried) < len(self.llms):
+            i = await self.scheduler.acquire(exclude=tried)
+            if i is None:
+                break
+            tried.add(i)
+            if errors:
+                logger.info(f"Fallback: Switching to API Key #{i+1}")
+            started = time.perf_counter()
             try:
-                if i > 0:
-                    logger.info(f"Fallback: Switching to API Key #{i+1}")
-                return await llm.ainvoke(input, config, **kwargs)
+                result = await self.llms[i].ainvoke(input, config, **kwargs)
+                self.scheduler.release(i, time.perf_counter() - started)
+                return result
             except Exception as e:
+                self.scheduler.release(i, time.perf_counter() - started, error=e)
                 logger.warning(f"Error with API Key #{i+1}: {e}")
                 errors.append(e)
+            except BaseException:
+                # Cancelled (or the stream was closed early): not the key's fault
+                self.scheduler.release(i, cancelled=True)
+                raise
         
-        raise Exception(f"All API keys failed. Last error: {errors[-1]}")
-
-
+        self._fail(errors)
 
     async def astream_events(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> AsyncIterator[Any]:
         errors = []
-        for i, llm in enumerate(self.llms):
+        tried = set()
+        while len(tried) < len(self.llms):
+            i = await self.scheduler.acquire(exclude=tried)
+            if i is None:
+                break
+            tried.add(i)
+            if errors:
+                logger.info(f"Fallback: Switching to API Key #{i+1}")
+            started = time.perf_counter()
             try:
-                if i > 0:
-                    logger.info(f"Fallback: Switching to API Key #{i+1}")
-                async for event in llm.astream_events(input, config, **kwargs):
+                async for event in self.llms[i].astream_events(input, config, **kwargs):
                     yield event
+                self.scheduler.release(i, time.perf_counter() - started)
                 return
             except Exception as e:
+                self.scheduler.release(i, time.perf_counter() - started, error=e)
                 logger.warning(f"Error with API Key #{i+1}: {e}")
                 errors.append(e)
+            except BaseException:
+                # Cancelled (or the stream was closed early): not the key's fault
+                self.scheduler.release(i, cancelled=True)
+                raise
         
-        raise Exception(f"All API keys failed. Last error: {errors[-1]}")
+        self._fail(errors)
     
     def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
         errors = []
-        for i, llm in enumerate(self.llms):
+        tried = set()
+        while len(tried) < len(self.llms):
+            # Synchronous callers can't wait for a token: take the best healthy key
+            i = self.scheduler.pick(exclude=tried, require_token=False)
+            if i is None:
+                break
+            tried.add(i)
+            if errors:
+                logger.info(f"Fallback: Switching to API Key #{i+1}")
+            started = time.perf_counter()
             try:
-                if i > 0:
-                    logger.info(f"Fallback: Switching to API Key #{i+1}")
-                return llm.invoke(input, config, **kwargs)
+                result = self.llms[i].invoke(input, config, **kwargs)
+                self.scheduler.release(i, time.perf_counter() - started)
+                return result
             except Exception as e:
+                self.scheduler.release(i, time.perf_counter() - started, error=e)
                 logger.warning(f"Error with API Key #{i+1}: {e}")
                 errors.append(e)
-        raise Exception(f"All API keys failed. Last error: {errors[-1]}")
+        self._fail(errors)
 
 
+class LLMClientPool:
+    """
+    One chat client per API key, created once and reused for the life of the
+    process (so every call shares the clients' connections). The pool is only
+    rebuilt by `rebuild`, which keeps the clients of keys that are still
+    configured; `generation` increases on every rebuild so holders of a chain
+    (e.g. ChatAgent) can tell theirs is stale.
+    """
 
-class LLMService:
+    def __init__(self, model: str, keys: List[str]):
+        self.model = model
+        self._keys: List[str] = list(keys)
+        self._clients: Dict[str, Any] = {}
+        self._chain: Any = None
+        self.generation = 0
+        self.clients_created = 0
+        self.requests = 0
+
+    def _create_client(self, key: str):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self.clients_created += 1
+        return ChatGoogleGenerativeAI(
+            model=self.model,
+            google_api_key=key,
+            temperature=0.0,
+            max_retries=0 # We handle retries via rotation
+        )
+
+    def _build(self):
+        clients = {key: self._clients.get(key) or self._create_client(key) for key in self._keys}
+        self._clients = clients
+        llms = [clients[key] for key in self._keys]
+        if not llms:
+            self._chain = None
+        elif len(llms) == 1:
+            self._chain = llms[0]
+        else:
+            self._chain = MultiKeyChain(llms)
+
+    def get(self):
+        """The pooled chain (a single client for one key), or None without keys."""
+        self.requests += 1
+        if self._chain is None and self._keys:
+            self._build()
+        return self._chain
+
+    def rebuild(self, keys: List[str]):
+        self._keys = list(keys)
+        self._chain = None
+        self.generation += 1
+        if self._keys:
+            self._build()
+        logger.info(f"LLM client pool rebuilt (generation {self.generation}, {len(self._keys)} keys)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "keys": len(self._keys),
+            "clients": len(self._clients),
+            "clients_created": self.clients_created,
+            "generation": self.generation,
+            "requests": self.requests,
+            # Per-key usage, when requests are scheduled across several keys
+            "key_usage": self._chain.scheduler.stats() if isinstance(self._chain, MultiKeyChain) else []
+        }
 
 
+class LLMService:
+    MODEL = "gemini-2.5-flash"
+
     def __init__(self):
         # We prefer using LangChain for agents, but this client is for direct single usage if needed
         self.keys = settings.GEMINI_API_KEYS
         if not self.keys:
             logger.warning("GEMINI_API_KEY(S) not set. LLM features will be disabled.")
+        # Temperature is 0, so identical prompts can share answers
+        self.response_cache = ResponseCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES)
+        self._flights = SingleFlight(ttl=0)
+        self.pool = LLMClientPool(self.MODEL, self.keys or [])
 
-    async def get_completion(self, prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
+    async def get_completion(
+        self,
+        prompt: str,
+        system_prompt: str = "You are a helpful assistant.",
+        cache_ttl: Optional[float] = None
+    ) -> str:
+        """
+        Completes `prompt`. Answers are cached by (model, system prompt, prompt)
+        for `cache_ttl` seconds (settings.LLM_CACHE_TTL_SECONDS by default, 0 to
+        skip the cache), and concurrent identical calls share one request.
+        Errors are returned as text and never cached.
+        """
         llm = self.get_llm()
         if not llm:
             return "LLM_DISABLED"
         
+        ttl = settings.LLM_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl
+        key = ResponseCache.key(self.MODEL, system_prompt, prompt)
+        if ttl > 0:
+            cached = await self.response_cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
-            # MultiKeyChain or ChatGoogleGenerativeAI supports ainvoke
-            from langchain_core.messages import HumanMessage, SystemMessage
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = await llm.ainvoke(messages)
-            return response.content
+            return await self._flights.do(key, lambda: self._complete(llm, prompt, system_prompt, key, ttl))
         except Exception as e:
             logger.error(f"LLM Error: {e}")
             return f"Error generating response: {str(e)}"
 
-    def get_llm(self):
-        """Returns a MultiKeyChain wrapping ChatGoogleGenerativeAI instances"""
-        from langchain_google_genai import ChatGoogleGenerativeAI
+    async def _complete(self, llm, prompt: str, system_prompt: str, key: str, ttl: float) -> str:
+        # MultiKeyChain or ChatGoogleGenerativeAI supports ainvoke
+        from langchain_core.messages import HumanMessage, SystemMessage
         
-        keys = self.keys
-        if not keys:
-            return None
-            
-        llms = []
-        for key in keys:
-            llms.append(ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                google_api_key=key,
-                temperature=0.0,
-                max_retries=0 # We handle retries via rotation
-            ))
-            
-        if len(llms) == 1:
-            return llms[0]
-            
-        return MultiKeyChain(llms)
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=prompt)
+        ]
+        
+        with span("get_completion", kind="llm", prompt_chars=len(system_prompt) + len(prompt)) as attrs:
+            response = await llm.ainvoke(messages)
+            attrs["response_chars"] = len(str(response.content))
+        await self.response_cache.set(key, response.content, ttl)
+        return response.content
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {**self.response_cache.stats(), "coalesced": self._flights.coalesced}
+
+    def get_llm(self):
+        """Returns the pooled MultiKeyChain (or single client) over ChatGoogleGenerativeAI instances"""
+        return self.pool.get()
 
     def reload_keys(self):
-        """Reloads keys from global settings"""
+        """Reloads keys from global settings and rebuilds the client pool"""
         from backend.configs.settings import settings
         self.keys = settings.GEMINI_API_KEYS
+        self.pool.rebuild(self.keys or [])
         logger.info(f"LLMService keys reloaded. Count: {len(self.keys)}")
 
 llm_service = LLMService()
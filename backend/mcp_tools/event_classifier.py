@@ -44,7 +44,8 @@ async def classify_events_logic(text: str, date: datetime) -> List[FinancialEven
     try:
         response = await llm_service.get_completion(
             prompt,
-            system_prompt="You are a financial event detector. Return strict JSON."
+            system_prompt="You are a financial event detector. Return strict JSON.",
+            cache_ttl=3600
         )
         
         if response == "LLM_DISABLED":
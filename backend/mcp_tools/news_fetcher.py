@@ -3,8 +3,13 @@ from pydantic import BaseModel
 from typing import List
 from datetime import datetime
 import logging
+import asyncio
+import copy
 
 from backend.models import NewsArticle
+from backend.core.single_flight import single_flight
+from backend.core.symbol_resolver import symbol_resolver
+from backend.core.telemetry import span
 import random
 
 logger = logging.getLogger(__name__)
@@ -36,6 +41,8 @@ async def fetch_market_news():
     articles = await fetch_news_logic(proxies, limit=10)
     return NewsFetchResponse(articles=articles)
 
+# Deep-copied per caller: sentiment analysis fills in fields on the articles
+@single_flight(clone=copy.deepcopy)
 async def fetch_news_logic(symbols: List[str], limit: int = 10) -> List[NewsArticle]:
     """
     Core logic to fetch news from yfinance.
@@ -45,22 +52,23 @@ async def fetch_news_logic(symbols: List[str], limit: int = 10) -> List[NewsArti
     
     import yfinance as yf
     
-    suffixes = ["", ".NS", ".BO"]
-
     for symbol in symbols:
         found_news = []
         used_symbol = symbol
         
-        # Try suffixes until we find news
-        for suffix in suffixes:
-            try_symbol = f"{symbol}{suffix}"
+        # Try suffixes until we find news, the resolved exchange first. An empty
+        # news list doesn't mean the symbol is invalid, so misses aren't recorded.
+        candidates = symbol_resolver.candidates(symbol)
+        for try_symbol in candidates:
             try:
                 logger.debug(f"Fetching news from yfinance for {try_symbol}")
                 ticker = yf.Ticker(try_symbol)
-                fetched = ticker.news
+                with span("news", kind="yfinance", symbol=try_symbol):
+                    fetched = await asyncio.to_thread(lambda: ticker.news)
                 if fetched:
                     found_news = fetched
                     used_symbol = try_symbol
+                    symbol_resolver.record_success(symbol, try_symbol)
                     logger.debug(f"Retrieved {len(fetched)} news items for {try_symbol}")
                     break
             except Exception as e:
@@ -68,7 +76,7 @@ async def fetch_news_logic(symbols: List[str], limit: int = 10) -> List[NewsArti
                 continue
         
         if not found_news:
-            logger.warning(f"No news found for {symbol} (tried suffixes: {suffixes})")
+            logger.warning(f"No news found for {symbol} (tried: {candidates})")
             continue
             
         # Process found news
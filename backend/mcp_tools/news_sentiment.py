@@ -1,11 +1,14 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
+import asyncio
 import logging
 import json
 
 from backend.models import NewsArticle, Sentiment
 from backend.llm import llm_service
+from backend.configs.settings import settings
+from backend.core.sentiment_cache import sentiment_cache
 
 logger = logging.getLogger(__name__)
 
@@ -26,17 +29,29 @@ async def analyze_sentiment(request: SentimentAnalysisRequest):
     analyzed = await analyze_sentiment_logic(request.articles)
     return SentimentAnalysisResponse(analyzed_articles=analyzed)
 
-async def analyze_sentiment_logic(articles: List[NewsArticle], target_symbol: str = None) -> List[NewsArticle]:
-    logger.info(f"Analyzing sentiment for {len(articles)} articles (Target: {target_symbol})")
-    analyzed = []
+@router.delete("/news/sentiment/cache")
+async def invalidate_sentiment_cache(symbol: Optional[str] = None, prompt_version: Optional[str] = None):
+    """
+    Drops cached sentiment verdicts, optionally only for one target symbol
+    and/or prompt version. Bumping PROMPT_VERSION already bypasses old entries;
+    this frees them (or forces re-scoring) without waiting for the TTL.
+    """
+    deleted = await sentiment_cache.invalidate(symbol=symbol, version=prompt_version)
+    return {"deleted": deleted, "current_prompt_version": PROMPT_VERSION}
+
+@router.get("/news/sentiment/cache/stats")
+async def sentiment_cache_stats():
+    return {**sentiment_cache.stats(), "current_prompt_version": PROMPT_VERSION}
+
+ARTICLE_SYSTEM_PROMPT = "You are a simplified financial reasoning engine. Return strict JSON only."
+# Part of every sentiment cache key: bump it whenever the prompts change
+PROMPT_VERSION = "2"
+
+def _article_prompt(article: NewsArticle, target_symbol: str = None) -> str:
+    # Construct prompt - handle None content
+    content_preview = (article.content or "")[:500] # Increased context
     
-    for article in articles:
-        logger.debug(f"Processing article: {article.title[:50] if article.title else 'No Title'}...")
-        
-        # Construct prompt - handle None content
-        content_preview = (article.content or "")[:500] # Increased context
-        
-        prompt = f"""
+    return f"""
         You are a senior financial analyst. Analyze the following news for the stock symbol: {target_symbol if target_symbol else "GENERAL MARKET"}.
         
         News Headline: {article.title}
@@ -67,52 +82,158 @@ async def analyze_sentiment_logic(articles: List[NewsArticle], target_symbol: st
         
         If NOT relevant, return: {{ "is_relevant": false, "relevance_reason": "Not about target stock" }}
         """
+
+def _batch_prompt(articles: List[NewsArticle], target_symbol: str = None) -> str:
+    target = target_symbol if target_symbol else "GENERAL MARKET"
+    numbered = "\n\n".join(
+        f"[{i}] Headline: {article.title}\n    Content: {(article.content or '')[:500]}"
+        for i, article in enumerate(articles)
+    )
+    return f"""
+        You are a senior financial analyst. Analyze each of the following {len(articles)} news articles for the stock symbol: {target}.
         
-        try:
-            response = await llm_service.get_completion(
-                prompt, 
-                system_prompt="You are a simplified financial reasoning engine. Return strict JSON only."
-            )
-            
-            if response == "LLM_DISABLED":
-                # Mock fallback
-                article.sentiment = Sentiment.NEUTRAL
-                article.sentiment_score = 0.0
-                article.impact_score = 1
-            else:
-                # Clean response
-                if "```json" in response:
-                    response = response.split("```json")[1].split("```")[0]
-                elif "```" in response:
-                    response = response.split("```")[1].split("```")[0]
-                    
-                data = json.loads(response.strip())
-                
-                # Check relevance first
-                if not data.get("is_relevant", True) and target_symbol:
-                    logger.info(f"Article skipped due to low relevance: {article.title[:30]}...")
-                    article.sentiment = Sentiment.NEUTRAL
-                    article.sentiment_score = 0.0
-                    article.impact_score = 0
-                    # We could strictly remove it, but keeping it as NEUTRAL/0 impact is safer for now
-                else:
-                    try:
-                        article.sentiment = Sentiment(data.get("sentiment", "neutral").lower())
-                    except ValueError:
-                        article.sentiment = Sentiment.NEUTRAL
-                    
-                    article.sentiment_score = float(data.get("score", 0.0))
-                    article.impact_score = int(data.get("impact", 0))
-                    # Store reasoning? Models don't have reasoning field yet.
-                    # We could append it to content or summary later. For now, it just improves the score quality.
-                    
-                logger.debug(f"Sentiment result: {article.sentiment}, score: {article.sentiment_score}")
-                
-        except Exception as e:
-            logger.error(f"Error analyzing sentiment: {e}")
-            article.sentiment = Sentiment.NEUTRAL
-            
-        analyzed.append(article)
+        {numbered}
+        
+        For EACH article, independently:
+        Step 1: Relevance Check
+        - Is it directly relevant to {target_symbol if target_symbol else "finance"}? A mention only in passing (e.g. in a list of top gainers) is LOW relevance;
+          earnings, products, management or sector trends affecting {target_symbol if target_symbol else "the market"} are HIGH relevance.
+        Step 2: Sentiment Analysis
+        - Sentiment (POSITIVE, NEGATIVE, NEUTRAL), a score (-1.0 to 1.0) and an impact score (1-10).
+          10 = massive market mover (e.g. merger, earnings beat). 1 = noise.
+        Step 3: Reasoning
+        - One sentence on WHY you assigned this score.
         
-    logger.info(f"Sentiment analysis complete for {len(analyzed)} articles")
-    return analyzed
+        Return a strict JSON array with exactly one object per article, using the article's number as "id":
+        [
+            {{"id": 0, "is_relevant": true, "relevance_reason": "...", "sentiment": "POSITIVE", "score": 0.5, "impact": 5, "reasoning": "..."}},
+            {{"id": 1, "is_relevant": false, "relevance_reason": "Not about target stock"}}
+        ]
+        """
+
+def _parse_json(response: str):
+    # Clean response
+    if "```json" in response:
+        response = response.split("```json")[1].split("```")[0]
+    elif "```" in response:
+        response = response.split("```")[1].split("```")[0]
+    return json.loads(response.strip())
+
+def _set_neutral(article: NewsArticle, impact: int = 1):
+    article.sentiment = Sentiment.NEUTRAL
+    article.sentiment_score = 0.0
+    article.impact_score = impact
+
+def _apply_result(article: NewsArticle, data: Dict[str, Any], target_symbol: str = None) -> Dict[str, Any]:
+    """
+    Copies one parsed LLM verdict onto the article and returns it normalized
+    for the sentiment cache; raises ValueError/TypeError if malformed.
+    """
+    # Check relevance first
+    if not data.get("is_relevant", True) and target_symbol:
+        logger.info(f"Article skipped due to low relevance: {article.title[:30]}...")
+        # We could strictly remove it, but keeping it as NEUTRAL/0 impact is safer for now
+        _set_neutral(article, impact=0)
+        return {"is_relevant": False}
+
+    score = float(data.get("score", 0.0))
+    impact = int(data.get("impact", 0))
+    try:
+        article.sentiment = Sentiment(str(data.get("sentiment", "neutral")).lower())
+    except ValueError:
+        article.sentiment = Sentiment.NEUTRAL
+    article.sentiment_score = score
+    article.impact_score = impact
+    # Store reasoning? Models don't have reasoning field yet.
+    # We could append it to content or summary later. For now, it just improves the score quality.
+    logger.debug(f"Sentiment result: {article.sentiment}, score: {article.sentiment_score}")
+    return {"is_relevant": True, "sentiment": Sentiment(article.sentiment).value, "score": score, "impact": impact}
+
+async def _analyze_article(article: NewsArticle, target_symbol: str = None) -> Optional[Dict[str, Any]]:
+    """One LLM call for one article. Returns the verdict, or None if there is none worth caching."""
+    logger.debug(f"Processing article: {article.title[:50] if article.title else 'No Title'}...")
+    try:
+        response = await llm_service.get_completion(
+            _article_prompt(article, target_symbol), system_prompt=ARTICLE_SYSTEM_PROMPT,
+            cache_ttl=settings.SENTIMENT_CACHE_TTL_SECONDS
+        )
+        
+        if response == "LLM_DISABLED":
+            # Mock fallback
+            _set_neutral(article)
+        else:
+            return _apply_result(article, _parse_json(response), target_symbol)
+            
+    except Exception as e:
+        logger.error(f"Error analyzing sentiment: {e}")
+        article.sentiment = Sentiment.NEUTRAL
+    return None
+
+async def _analyze_batch(articles: List[NewsArticle], target_symbol: str = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    One LLM call for a batch of articles. Articles whose entry is missing or
+    malformed (or all of them, if the reply isn't a JSON array) fall back to
+    per-article calls, which run concurrently. Returns each article's verdict.
+    """
+    pending = set(range(len(articles)))
+    records: List[Optional[Dict[str, Any]]] = [None] * len(articles)
+    try:
+        response = await llm_service.get_completion(
+            _batch_prompt(articles, target_symbol), system_prompt=ARTICLE_SYSTEM_PROMPT,
+            cache_ttl=settings.SENTIMENT_CACHE_TTL_SECONDS
+        )
+        if response == "LLM_DISABLED":
+            for article in articles:
+                _set_neutral(article)
+            return records
+
+        results = _parse_json(response)
+        if not isinstance(results, list):
+            raise ValueError("expected a JSON array")
+        for position, data in enumerate(results):
+            try:
+                index = int(data.get("id", position))
+                if index not in pending:
+                    continue
+                records[index] = _apply_result(articles[index], data, target_symbol)
+                pending.discard(index)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.debug(f"Unusable batch sentiment entry {position}: {e}")
+    except Exception as e:
+        logger.warning(f"Batch sentiment analysis failed, falling back to per-article calls: {e}")
+
+    if pending:
+        logger.info(f"Re-analyzing {len(pending)} of {len(articles)} articles individually")
+        retried = sorted(pending)
+        for i, record in zip(retried, await asyncio.gather(*(_analyze_article(articles[i], target_symbol) for i in retried))):
+            records[i] = record
+    return records
+
+async def analyze_sentiment_logic(articles: List[NewsArticle], target_symbol: str = None, batch_size: int = None) -> List[NewsArticle]:
+    """
+    Scores each article's sentiment and impact. Verdicts already in the
+    sentiment cache are reused; the rest are sent to the LLM `batch_size` at a
+    time (settings.SENTIMENT_BATCH_SIZE by default) in one structured prompt,
+    and a batch size of 1 makes one call per article. New verdicts are cached.
+    """
+    batch_size = batch_size or settings.SENTIMENT_BATCH_SIZE
+    logger.info(f"Analyzing sentiment for {len(articles)} articles (Target: {target_symbol}, batch size: {batch_size})")
+    
+    cached = await sentiment_cache.get_many(articles, target_symbol, PROMPT_VERSION)
+    for i, record in cached.items():
+        _apply_result(articles[i], record, target_symbol)
+    to_score = [article for i, article in enumerate(articles) if i not in cached]
+    
+    if batch_size <= 1:
+        records = [await _analyze_article(article, target_symbol) for article in to_score]
+    else:
+        records = []
+        for start in range(0, len(to_score), batch_size):
+            records.extend(await _analyze_batch(to_score[start:start + batch_size], target_symbol))
+    
+    await sentiment_cache.set_many(
+        [(article, record) for article, record in zip(to_score, records) if record is not None],
+        target_symbol, PROMPT_VERSION
+    )
+    logger.info(f"Sentiment analysis complete for {len(articles)} articles ({len(cached)} from cache)")
+    return articles
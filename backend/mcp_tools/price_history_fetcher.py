@@ -1,12 +1,16 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
-from datetime import datetime
+from functools import partial
 import logging
+import asyncio
 
 import yfinance as yf
-import pandas as pd
 from backend.models import PriceCandle
+from backend.core.ohlcv_store import ohlcv_store
+from backend.core.single_flight import single_flight
+from backend.core.symbol_resolver import symbol_resolver
+from backend.core.telemetry import span
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +35,8 @@ async def fetch_price_history(request: PriceHistoryRequest):
     candles, source = await fetch_price_history_logic(request.symbol, request.period, request.interval)
     return PriceHistoryResponse(symbol=request.symbol, candles=candles, source=source)
 
+# Callers get their own list so they can't disturb the shared result
+@single_flight(clone=lambda result: (list(result[0]), result[1]))
 async def fetch_price_history_logic(symbol: str, period: str = "1mo", interval: str = "1d") -> tuple[List[PriceCandle], str]:
     """
     Core logic for fetching price history.
@@ -39,45 +45,25 @@ async def fetch_price_history_logic(symbol: str, period: str = "1mo", interval:
     
     source = "yfinance"
     
-    # Try multiple suffixes: original, NSE, BSE
-    suffixes = ["", ".NS", ".BO"]
+    # Try suffixes (original, NSE, BSE), the one that worked last time first
+    candidates = symbol_resolver.candidates(symbol)
     
-    for suffix in suffixes:
-        try_symbol = f"{symbol}{suffix}"
+    for try_symbol in candidates:
         
         try:
-            ticker = yf.Ticker(try_symbol)
-            df = ticker.history(period=period, interval=interval)
+            # Served from the local store; only bars newer than the last stored one hit the network
+            history = partial(yf.Ticker(try_symbol).history, interval=interval)
+            with span("history", kind="yfinance", symbol=try_symbol, period=period) as attrs:
+                candles = await asyncio.to_thread(ohlcv_store.get_history, try_symbol, period, interval, history)
+                attrs["candles"] = len(candles)
             
-            if not df.empty:
-                logger.info(f"Retrieved {len(df)} candles for {try_symbol}")
-                
-                 # Process and return data
-                candles = []
-                for index, row in df.iterrows():
-                    # Handle different index types
-                    if isinstance(index, datetime):
-                        ts = index
-                    elif hasattr(index, 'to_pydatetime'):
-                        ts = index.to_pydatetime()
-                    else:
-                        ts = pd.to_datetime(index)
-                    
-                    candles.append(PriceCandle(
-                        symbol=try_symbol.upper(),
-                        timestamp=ts,
-                        open=float(row['Open']),
-                        high=float(row['High']),
-                        low=float(row['Low']),
-                        close=float(row['Close']),
-                        adj_close=float(row.get('Adj Close', row['Close'])),
-                        volume=int(row.get('Volume', 0))
-                    ))
-                    
+            if candles:
+                symbol_resolver.record_success(symbol, try_symbol)
                 logger.info(f"Price history fetch complete for {try_symbol} via {source}. Returning {len(candles)} candles")
                 return candles, source
                 
             else:
+                 symbol_resolver.record_failure(symbol, try_symbol)
                  logger.info(f"No price data for {try_symbol}, trying next suffix...")
         
         except Exception as e:
@@ -85,8 +71,8 @@ async def fetch_price_history_logic(symbol: str, period: str = "1mo", interval:
             continue
 
     # If all fail
-    logger.error(f"Failed to fetch price history for {symbol} after trying suffixes {suffixes}")
-    raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol} (tried suffixes: {suffixes})")
+    logger.error(f"Failed to fetch price history for {symbol} after trying {candidates}")
+    raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol} (tried: {candidates})")
 
 @router.get("/price_history/test")
 async def test_fetcher():
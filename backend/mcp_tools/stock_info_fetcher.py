@@ -2,9 +2,13 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 import logging
+import asyncio
 
 import yfinance as yf
 from backend.models import CompanyInfo
+from backend.core.single_flight import single_flight
+from backend.core.symbol_resolver import symbol_resolver
+from backend.core.telemetry import span
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +31,7 @@ async def fetch_stock_info(request: StockInfoRequest):
     company_info = await fetch_stock_info_logic(request.symbol)
     return StockInfoResponse(company_info=company_info)
 
+@single_flight(clone=lambda info: info.model_copy())
 async def fetch_stock_info_logic(symbol: str) -> CompanyInfo:
     """
     Core logic to fetch stock info from yfinance.
@@ -34,18 +39,19 @@ async def fetch_stock_info_logic(symbol: str) -> CompanyInfo:
     logger.info(f"Fetching stock info for {symbol}")
     import yfinance as yf
     
-    # Try multiple suffixes: original, NSE, BSE
-    suffixes = ["", ".NS", ".BO"]
+    # Try suffixes (original, NSE, BSE), the one that worked last time first
+    candidates = symbol_resolver.candidates(symbol)
     last_exception = None
     
-    for suffix in suffixes:
-        try_symbol = f"{symbol}{suffix}"
+    for try_symbol in candidates:
+        suffix = try_symbol[len(symbol):]
         logger.info(f"Attempting to fetch info for {try_symbol}")
         
         try:
             ticker = yf.Ticker(try_symbol)
             # Need to force a check, .info usually does network call
-            info = ticker.info
+            with span("info", kind="yfinance", symbol=try_symbol):
+                info = await asyncio.to_thread(lambda: ticker.info)
             
             # Check if valid data came back
             # yfinance often returns empty info or {'regularMarketPrice': None} for invalid symbols
@@ -56,9 +62,11 @@ async def fetch_stock_info_logic(symbol: str) -> CompanyInfo:
             if not info or current_price_val is None:
                  # Try history as fallback check
                  # data might be missing, but let's see if we can get price from history
-                hist = ticker.history(period="5d")
+                with span("history", kind="yfinance", symbol=try_symbol, period="5d"):
+                    hist = await asyncio.to_thread(ticker.history, period="5d")
                 if hist.empty:
                     # This attempt failed, continue to next suffix
+                    symbol_resolver.record_failure(symbol, try_symbol)
                     logger.info(f"No price data or history for {try_symbol}, trying next...")
                     continue
                 
@@ -78,6 +86,7 @@ async def fetch_stock_info_logic(symbol: str) -> CompanyInfo:
                     volume=float(hist['Volume'].iloc[-1]) if 'Volume' in hist.columns else None,
                     currency="INR" if suffix in ['.NS', '.BO'] else "USD" # Fallback guess if info is empty
                 )
+                symbol_resolver.record_success(symbol, try_symbol)
                 logger.info(f"Stock info fetch complete for {try_symbol} (via history)")
                 return company_info
 
@@ -128,6 +137,7 @@ async def fetch_stock_info_logic(symbol: str) -> CompanyInfo:
 
             )
             
+            symbol_resolver.record_success(symbol, try_symbol)
             logger.info(f"Stock info fetch complete for {try_symbol}: {company_info.name}")
             return company_info
             
@@ -137,8 +147,8 @@ async def fetch_stock_info_logic(symbol: str) -> CompanyInfo:
             continue
 
     # If all fail
-    logger.error(f"Failed to fetch stock info for {symbol} after trying suffixes {suffixes}")
-    raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol} (tried suffixes: {suffixes})")
+    logger.error(f"Failed to fetch stock info for {symbol} after trying {candidates}")
+    raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol} (tried: {candidates})")
 
 
 @router.get("/stock_info/{symbol}", response_model=StockInfoResponse)
@@ -3,22 +3,41 @@ Stock Scanner - Scans Indian stocks for bullish signals.
 Finds stocks likely to go up in the next week based on technical analysis.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional
+from datetime import datetime
+from functools import lru_cache
 import logging
 import asyncio
+import json
 
 import yfinance as yf
 import pandas as pd
 import numpy as np
 
-from backend.core.indian_stocks import HIGH_VOLATILITY_PICKS, get_stock_symbol_nse
+from backend.core.indian_stocks import (
+    HIGH_VOLATILITY_PICKS, MIDCAP_STOCKS, SMALLCAP_STOCKS, ALL_SCAN_STOCKS, NIFTY_50_SYMBOLS,
+    get_stock_symbol_nse
+)
+from backend.core.scanner_engine import build_matrix, score_matrix, reasons_for
+from backend.core.indicators import Indicators
+from backend.core.scan_rules import CompiledRule, compile_rule
+from backend.configs.settings import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Scannable universes (NSE symbols without suffix)
+UNIVERSES = {
+    "high_volatility": HIGH_VOLATILITY_PICKS,
+    "midcap": MIDCAP_STOCKS,
+    "smallcap": SMALLCAP_STOCKS,
+    "nifty50": [s.replace('.NS', '') for s in NIFTY_50_SYMBOLS],
+    "all": ALL_SCAN_STOCKS,
+}
+
 
 class StockSignal(BaseModel):
     symbol: str
@@ -40,6 +59,28 @@ class ScannerResponse(BaseModel):
     message: str
 
 
+class CustomScanRequest(BaseModel):
+    rule: str  # e.g. "rsi_14 < 35 and close > sma_50 and volume > 2 * avg_volume_20"
+    universe: str = "high_volatility"
+    period: str = "1y"  # Enough history for sma_200
+
+
+class CustomScanMatch(BaseModel):
+    symbol: str
+    name: str
+    current_price: float
+    change_percent: float
+    values: Dict[str, Optional[float]]  # Latest value of every column the rule uses
+
+
+class CustomScanResponse(BaseModel):
+    scan_time: str
+    rule: str
+    stocks_scanned: int
+    matches: List[CustomScanMatch]
+    message: str
+
+
 def calculate_rsi(prices: pd.Series, period: int = 14) -> float:
     """Calculate RSI indicator"""
     delta = prices.diff()
@@ -58,14 +99,13 @@ def calculate_sma(prices: pd.Series, period: int) -> float:
     return prices.rolling(window=period).mean().iloc[-1]
 
 
-def analyze_stock(symbol: str) -> Optional[StockSignal]:
-    """Analyze a single stock for bullish signals"""
+def score_stock(symbol: str, df: pd.DataFrame) -> Optional[StockSignal]:
+    """
+    Score one stock's daily OHLCV (yfinance column names) for bullish signals.
+    Universe scans use score_universe, which applies the same criteria to all
+    symbols at once.
+    """
     try:
-        ticker = yf.Ticker(symbol)
-        
-        # Get 1 month of daily data
-        df = ticker.history(period="1mo", interval="1d")
-        
         if df.empty or len(df) < 14:
             return None
         
@@ -142,22 +182,96 @@ def analyze_stock(symbol: str) -> Optional[StockSignal]:
         return None
 
 
+def analyze_stock(symbol: str) -> Optional[StockSignal]:
+    """Analyze a single stock for bullish signals"""
+    try:
+        # Get 1 month of daily data
+        df = yf.Ticker(symbol).history(period="1mo", interval="1d")
+    except Exception as e:
+        logger.error(f"Error fetching {symbol}: {e}")
+        return None
+    return score_stock(symbol, df)
+
+
+def fetch_universe_history(symbols: List[str], period: str = "1mo") -> Dict[str, pd.DataFrame]:
+    """
+    Downloads daily history for every symbol in one batched multi-ticker request
+    and splits it into one frame per symbol (symbols without data are omitted).
+    Prices are split/dividend adjusted, like Ticker.history in analyze_stock, so
+    batch and per-symbol scans score the same data.
+    """
+    data = yf.download(
+        symbols, period=period, interval="1d", group_by="ticker",
+        auto_adjust=True, threads=True, progress=False
+    )
+    if data is None or data.empty:
+        return {}
+
+    panel = {}
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            df = data[symbol]
+        elif len(symbols) == 1:
+            # Single-ticker downloads come back with flat columns
+            df = data
+        else:
+            continue
+        df = df.dropna(subset=['Close'])
+        if not df.empty:
+            panel[symbol] = df
+    return panel
+
+
+def score_universe(panel: Dict[str, pd.DataFrame]) -> List[StockSignal]:
+    """Scores every symbol of `panel` at once with the cross-sectional engine."""
+    symbols, close = build_matrix(panel, 'Close')
+    _, volume = build_matrix(panel, 'Volume')
+    scores = score_matrix(close, volume)
+
+    picks = []
+    for row in np.flatnonzero(scores["bullish"]):
+        symbol = symbols[row]
+        current_price = float(scores["current_price"][row])
+        picks.append(StockSignal(
+            symbol=symbol,
+            name=symbol.replace('.NS', '').replace('.BO', ''),
+            current_price=round(current_price, 2),
+            change_percent=round(float(scores["change_percent"][row]), 2),
+            signal_strength=int(scores["signal_strength"][row]),
+            signal_type="bullish",
+            reasons=reasons_for(scores, row),
+            target_price=round(current_price * 1.05, 2),  # 5% target
+            stop_loss=round(current_price * 0.97, 2),  # 3% stop loss
+            confidence=float(scores["confidence"][row])
+        ))
+    return picks
+
+
+def scan_universe(symbols: List[str]) -> List[StockSignal]:
+    """Batched download of `symbols`, then scores the whole panel in one pass."""
+    panel = fetch_universe_history(symbols)
+    logger.info(f"Downloaded history for {len(panel)}/{len(symbols)} symbols")
+    return score_universe(panel)
+
+
 @router.get("/scanner/bullish", response_model=ScannerResponse)
-async def scan_for_bullish_stocks():
+async def scan_for_bullish_stocks(
+    universe: str = Query("high_volatility", description=f"One of: {', '.join(UNIVERSES)}")
+):
     """
     Scan small/mid cap Indian stocks for bullish signals.
     Returns stocks likely to go up in the next week.
     """
-    logger.info("Starting bullish stock scan...")
-    
-    symbols = [get_stock_symbol_nse(s) for s in HIGH_VOLATILITY_PICKS]
-    bullish_picks = []
+    if universe not in UNIVERSES:
+        raise HTTPException(status_code=400, detail=f"Unknown universe '{universe}'. Choose from {list(UNIVERSES)}")
+
+    logger.info(f"Starting bullish stock scan of the {universe} universe...")
     
-    for symbol in symbols:
-        logger.info(f"Scanning {symbol}...")
-        signal = analyze_stock(symbol)
-        if signal:
-            bullish_picks.append(signal)
+    symbols = [get_stock_symbol_nse(s) for s in UNIVERSES[universe]]
+    # Download and scoring are blocking; keep them off the event loop
+    bullish_picks = await asyncio.to_thread(scan_universe, symbols)
     
     # Sort by signal strength
     bullish_picks.sort(key=lambda x: x.signal_strength, reverse=True)
@@ -172,11 +286,158 @@ async def scan_for_bullish_stocks():
     )
 
 
+def latest_indicator_columns(panel: Dict[str, pd.DataFrame]) -> Dict[str, np.ndarray]:
+    """
+    Runs Indicators.calculate_all on each symbol and stacks the latest row into
+    one array per column, aligned with the panel's symbol order. Adds
+    prev_close so rules can compare against the previous session.
+    """
+    rows = []
+    for df in panel.values():
+        frame = Indicators.calculate_all(df.rename(columns=str.lower).rename(columns={'adj close': 'adj_close'}))
+        if 'adj_close' not in frame.columns:
+            # Adjusted downloads have no separate adjusted close
+            frame['adj_close'] = frame['close']
+        row = frame.iloc[-1].copy()
+        row['prev_close'] = frame['close'].iloc[-2] if len(frame) > 1 else row['close']
+        rows.append(row)
+    latest = pd.DataFrame(rows).apply(pd.to_numeric, errors='coerce')
+    return {column: latest[column].to_numpy(dtype=float) for column in latest.columns}
+
+
+@lru_cache(maxsize=1)
+def scan_columns() -> FrozenSet[str]:
+    """Every column a custom rule can reference: the OHLCV columns, prev_close and the indicators."""
+    sample = pd.DataFrame({c: [1.0, 1.0] for c in ('open', 'high', 'low', 'close', 'volume')})
+    return frozenset(Indicators.calculate_all(sample).columns) | {'adj_close', 'prev_close'}
+
+
+def compile_scan_rule(rule_text: str) -> CompiledRule:
+    """Compiles a custom scan rule and checks its column names, so typos fail before any download."""
+    rule = compile_rule(rule_text)
+    unknown = rule.columns - scan_columns()
+    if unknown:
+        raise ValueError(f"Unknown column(s) in rule: {sorted(unknown)}. Available: {sorted(scan_columns())}")
+    return rule
+
+
+def run_custom_scan(rule_text: str, symbols: List[str], period: str) -> List[CustomScanMatch]:
+    rule = compile_scan_rule(rule_text)
+    panel = fetch_universe_history(symbols, period=period)
+    if not panel:
+        return []
+
+    columns = latest_indicator_columns(panel)
+    mask = rule(columns)
+
+    close = columns['close']
+    change_percent = (close - columns['prev_close']) / columns['prev_close'] * 100
+
+    symbol_list = list(panel)
+    return [
+        CustomScanMatch(
+            symbol=symbol_list[i],
+            name=symbol_list[i].replace('.NS', '').replace('.BO', ''),
+            current_price=round(float(close[i]), 2),
+            change_percent=round(float(change_percent[i]), 2),
+            values={c: (None if np.isnan(columns[c][i]) else round(float(columns[c][i]), 4)) for c in sorted(rule.columns)}
+        )
+        for i in np.flatnonzero(mask)
+    ]
+
+
+@router.get("/scanner/bullish/stream")
+async def stream_bullish_stocks(
+    universe: str = Query("high_volatility", description=f"One of: {', '.join(UNIVERSES)}")
+):
+    """
+    Streaming variant of /scanner/bullish. Symbols are analyzed concurrently
+    (at most SCANNER_CONCURRENCY at a time) and each bullish StockSignal is sent
+    as a `signal` event as soon as it is ready; a `summary` event with the
+    sorted ScannerResponse closes the stream.
+    """
+    if universe not in UNIVERSES:
+        raise HTTPException(status_code=400, detail=f"Unknown universe '{universe}'. Choose from {list(UNIVERSES)}")
+
+    symbols = [get_stock_symbol_nse(s) for s in UNIVERSES[universe]]
+    semaphore = asyncio.Semaphore(settings.SCANNER_CONCURRENCY)
+
+    async def scan(symbol: str) -> Optional[StockSignal]:
+        async with semaphore:
+            return await asyncio.to_thread(analyze_stock, symbol)
+
+    async def event_generator():
+        logger.info(f"Starting streaming bullish scan of the {universe} universe...")
+        tasks = [asyncio.ensure_future(scan(symbol)) for symbol in symbols]
+        bullish_picks = []
+        try:
+            for completed, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+                signal = await next_result
+                if signal:
+                    bullish_picks.append(signal)
+                    yield f"event: signal\ndata: {signal.model_dump_json()}\n\n"
+                yield f"event: progress\ndata: {json.dumps({'scanned': completed, 'total': len(symbols)})}\n\n"
+
+            bullish_picks.sort(key=lambda x: x.signal_strength, reverse=True)
+            summary = ScannerResponse(
+                scan_time=datetime.now().isoformat(),
+                stocks_scanned=len(symbols),
+                bullish_picks=bullish_picks,
+                message=f"Found {len(bullish_picks)} bullish stocks out of {len(symbols)} scanned"
+            )
+            logger.info(f"Streaming scan complete. Found {len(bullish_picks)} bullish stocks.")
+            yield f"event: summary\ndata: {summary.model_dump_json()}\n\n"
+            yield "event: done\ndata: [DONE]\n\n"
+
+        except Exception as e:
+            logger.error(f"Error in scanner stream: {e}")
+            yield f"event: error\ndata: {json.dumps({'text': str(e)})}\n\n"
+        finally:
+            # Client went away or the scan failed: don't leave queued symbols running
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+@router.post("/scanner/custom", response_model=CustomScanResponse)
+async def scan_custom_rule(request: CustomScanRequest):
+    """
+    Scans a universe with a user-defined rule over the OHLCV and indicator
+    columns, e.g. "rsi_14 < 35 and close > sma_50 and volume > 2 * avg_volume_20".
+    Supports and/or/not, comparisons, + - * /, abs(), min() and max().
+    """
+    if request.universe not in UNIVERSES:
+        raise HTTPException(status_code=400, detail=f"Unknown universe '{request.universe}'. Choose from {list(UNIVERSES)}")
+    try:
+        # Parse and check column names up front so bad rules fail before any download
+        compile_scan_rule(request.rule)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Starting custom scan of the {request.universe} universe: {request.rule}")
+    symbols = [get_stock_symbol_nse(s) for s in UNIVERSES[request.universe]]
+    try:
+        matches = await asyncio.to_thread(run_custom_scan, request.rule, symbols, request.period)
+    except ValueError as e:
+        # e.g. and/or applied to something other than a comparison, only seen on evaluation
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Custom scan complete. {len(matches)} matches.")
+    return CustomScanResponse(
+        scan_time=datetime.now().isoformat(),
+        rule=request.rule,
+        stocks_scanned=len(symbols),
+        matches=matches,
+        message=f"{len(matches)} of {len(symbols)} stocks match the rule"
+    )
+
+
 @router.get("/scanner/test")
 async def test_scanner():
     """Quick test endpoint"""
     symbol = "SUZLON.NS"
-    signal = analyze_stock(symbol)
+    signal = await asyncio.to_thread(analyze_stock, symbol)
     if signal:
         return signal.model_dump()
     return {"message": f"No bullish signal for {symbol}"}
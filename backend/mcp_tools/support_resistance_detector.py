@@ -2,15 +2,22 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List
 import logging
+import threading
+from collections import OrderedDict
 
-import pandas as pd
 from backend.models import PriceCandle
-from backend.core.support_resistance import SupportResistance
+from backend.core.support_resistance import SupportResistanceTracker
+from backend.core.indicator_cache import indicator_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Incremental S/R state per (symbol, interval); repeated requests only scan new candles
+MAX_TRACKERS = 256
+_trackers: "OrderedDict[tuple, SupportResistanceTracker]" = OrderedDict()
+_trackers_lock = threading.Lock()
+
 class SRRequest(BaseModel):
     candles: List[PriceCandle]
 
@@ -26,17 +33,24 @@ async def detect_support_resistance(request: SRRequest):
     """
     return detect_support_resistance_logic(request.candles)
 
-def detect_support_resistance_logic(candles: List[PriceCandle]) -> SRResponse:
+def detect_support_resistance_logic(candles: List[PriceCandle], interval: str = "1d") -> SRResponse:
     logger.info(f"Detecting support/resistance levels for {len(candles)} candles")
     if not candles:
         logger.warning("No candles provided for S/R detection")
         return SRResponse(levels=[])
         
-    df = pd.DataFrame([c.model_dump() for c in candles])
-    levels = SupportResistance.identify_levels(df)
-    
-    current_price = df['close'].iloc[-1]
-    sup, res = SupportResistance.get_nearest_levels(current_price, levels)
+    df = indicator_cache.get_frame(candles, interval)
+    key = (str(df['symbol'].iloc[-1]).upper(), interval)
+    with _trackers_lock:
+        tracker = _trackers.pop(key, None) or SupportResistanceTracker()
+        tracker.sync(df)
+        _trackers[key] = tracker
+        while len(_trackers) > MAX_TRACKERS:
+            _trackers.popitem(last=False)
+        levels = list(tracker.levels)
+
+        current_price = df['close'].iloc[-1]
+        sup, res = tracker.get_nearest_levels(current_price)
     
     logger.info(f"S/R detection complete. Found {len(levels)} levels. Support: {sup}, Resistance: {res}")
     return SRResponse(
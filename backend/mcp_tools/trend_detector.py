@@ -6,7 +6,7 @@ import logging
 import pandas as pd
 from backend.models import PriceCandle, Trend
 from backend.core.trend import TrendDetector
-from backend.core.indicators import Indicators
+from backend.core.indicator_cache import indicator_cache
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +27,14 @@ async def detect_trend(request: TrendRequest):
     trend, details = detect_trend_logic(request.candles)
     return TrendResponse(trend=trend, details=details)
 
-def detect_trend_logic(candles: List[PriceCandle]) -> tuple[Trend, str]:
+def detect_trend_logic(candles: List[PriceCandle], interval: str = "1d") -> tuple[Trend, str]:
     logger.info(f"Detecting trend for {len(candles)} candles")
     if not candles:
         logger.warning("No candles provided for trend detection")
         return Trend.CHOPPY, "No data"
         
-    df = pd.DataFrame([c.model_dump() for c in candles])
-    
-    # Calculate indicators if needed (TrendDetector expects them)
-    df = Indicators.calculate_all(df)
+    # Shared indicator frame (TrendDetector expects the SMA columns)
+    df = indicator_cache.get_frame(candles, interval)
     
     trend = TrendDetector.detect_trend(df)
     
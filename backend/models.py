@@ -70,6 +70,24 @@ class BacktestResult(BaseModel):
     sharpe_ratio: float
     trades: List[Dict[str, Any]] # List of individual trade details
 
+class PortfolioBacktestResult(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
+    symbols: List[str]
+    start_date: datetime
+    end_date: datetime
+    initial_capital: float
+    final_equity: float
+    total_pnl: float
+    total_return: float
+    max_drawdown: float
+    sharpe_ratio: float
+    turnover: float # Traded value / average equity
+    total_trades: int
+    win_rate: float
+    equity_curve: List[float]
+    trades: List[Dict[str, Any]]
+
 
 class TradeSignal(BaseModel):
     """Represents a single actionable trade signal"""
@@ -1,19 +1,92 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import json
 import logging
 
-from backend.agents.master_agent import MasterAgent, MasterOutput
+from backend.agents.master_agent import MasterAgent, MasterOutput, BatchOutput
+from backend.core.job_queue import AnalysisJob, JobStatus, analysis_jobs
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 master_agent = MasterAgent()
+# Started/stopped with the app (server.py)
+analysis_jobs.runner = master_agent.run
 
 class AnalyzeRequest(BaseModel):
     symbol: str
     account_size: float = 100000.0
     current_exposure: float = 0.0
 
+class BatchAnalyzeRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=200)
+    account_size: float = 100000.0
+    current_exposure: float = 0.0
+    concurrency: Optional[int] = Field(None, ge=1, le=32) # Defaults to settings.BATCH_ANALYSIS_CONCURRENCY
+    timeout_seconds: Optional[float] = Field(None, gt=0) # Per symbol; defaults to settings.BATCH_ANALYSIS_TIMEOUT_SECONDS
+
+class JobSubmitRequest(BaseModel):
+    symbol: str
+    account_size: float = 100000.0
+    current_exposure: float = 0.0
+    priority: int = Field(5, ge=0, le=9) # Lower runs first
+
+def _job_status(job: AnalysisJob) -> dict:
+    """Job fields without the (large) result"""
+    return job.model_dump(mode='json', exclude={"result"})
+
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(request: JobSubmitRequest):
+    """
+    Queues a full analysis to run in the background and returns the job. The
+    analysis keeps running if the client disconnects; poll /jobs/{job_id} and
+    fetch /jobs/{job_id}/result once it has completed. Submitting the same
+    analysis while it is still pending or running returns the existing job.
+    """
+    try:
+        job = await analysis_jobs.submit(request.symbol, request.account_size, request.current_exposure, request.priority)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _job_status(job)
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    job = await analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_status(job)
+
+@router.get("/jobs/{job_id}/result", response_model=MasterOutput)
+async def get_analysis_job_result(job_id: str):
+    job = await analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error or "Analysis failed")
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    return job.result
+
+# Declared before /analyze/{symbol} so "batch" isn't taken as a symbol
+@router.post("/analyze/batch", response_model=BatchOutput)
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    Runs the multi-agent pipeline for a list of symbols concurrently and returns
+    each MasterOutput plus a portfolio summary. Symbols that fail or time out
+    are listed in `errors`.
+    """
+    logger.info(f"Received batch analyze request for {len(request.symbols)} symbols")
+    return await master_agent.run_batch(
+        request.symbols,
+        account_size=request.account_size,
+        current_exposure=request.current_exposure,
+        concurrency=request.concurrency,
+        timeout=request.timeout_seconds
+    )
+
 @router.post("/analyze/{symbol}", response_model=MasterOutput)
 async def analyze_stock(symbol: str, request: AnalyzeRequest = None):
     """
@@ -35,3 +108,28 @@ async def analyze_stock(symbol: str, request: AnalyzeRequest = None):
     except Exception as e:
         logger.error(f"Error analyzing {symbol}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/analyze/{symbol}/stream")
+async def analyze_stock_stream(symbol: str, account_size: float = 100000.0, current_exposure: float = 0.0):
+    """
+    Streaming variant of /analyze/{symbol}. Sends one SSE event per pipeline
+    stage as soon as its node finishes (`resolved`, `company_info`, `quant`,
+    `analyst`, `risk`, `decision`), each carrying the MasterOutput fields that
+    stage fills in, then a `result` event with the complete MasterOutput.
+    """
+    logger.info(f"Received streaming analyze request for {symbol}")
+
+    async def event_generator():
+        try:
+            async for stage, payload in master_agent.astream(symbol, account_size, current_exposure):
+                if stage == "result":
+                    logger.info(f"Streamed analysis complete for {symbol}, decision: {payload.decision}")
+                    yield f"event: result\ndata: {payload.model_dump_json()}\n\n"
+                else:
+                    yield f"event: {stage}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+            yield "event: done\ndata: [DONE]\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming analysis of {symbol}: {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'text': str(e)})}\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
@@ -4,6 +4,10 @@ import yfinance as yf
 import logging
 import asyncio
 
+from backend.core.indian_stocks import NIFTY_50_SYMBOLS
+from backend.core.single_flight import single_flight
+from backend.core.telemetry import span
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -16,21 +20,28 @@ INDICES = {
 }
 
 
-# NIFTY 50 Symbols
+def _fetch_quote(symbol: str):
+    """Blocking yfinance lookup of (last price, previous close)."""
+    ticker = yf.Ticker(symbol)
+    # Fast fetch using fast_info or history
+    # fast_info is better for latest price
+    price = ticker.fast_info.last_price
+    prev_close = ticker.fast_info.previous_close
+    
+    if price is None or prev_close is None:
+         # Fallback to history
+         hist = ticker.history(period="2d")
+         if len(hist) >= 1:
+             price = hist['Close'].iloc[-1]
+             prev_close = hist['Close'].iloc[-2] if len(hist) > 1 else price
+    return price, prev_close
+
+
+@single_flight(clone=lambda result: dict(result) if result else result)
 async def fetch_ticker_data(symbol: str, name: str) -> Dict[str, Any]:
     try:
-        ticker = yf.Ticker(symbol)
-        # Fast fetch using fast_info or history
-        # fast_info is better for latest price
-        price = ticker.fast_info.last_price
-        prev_close = ticker.fast_info.previous_close
-        
-        if price is None or prev_close is None:
-             # Fallback to history
-             hist = ticker.history(period="2d")
-             if len(hist) >= 1:
-                 price = hist['Close'].iloc[-1]
-                 prev_close = hist['Close'].iloc[-2] if len(hist) > 1 else price
+        with span("quote", kind="yfinance", symbol=symbol):
+            price, prev_close = await asyncio.to_thread(_fetch_quote, symbol)
         
         if price is None:
             return None
@@ -49,18 +60,6 @@ async def fetch_ticker_data(symbol: str, name: str) -> Dict[str, Any]:
         logger.error(f"Error fetching {symbol}: {e}")
         return None
 
-NIFTY_50_SYMBOLS = [
-    "ADANIENT.NS", "ADANIPORTS.NS", "APOLLOHOSP.NS", "ASIANPAINT.NS", "AXISBANK.NS",
-    "BAJAJ-AUTO.NS", "BAJFINANCE.NS", "BAJAJFINSV.NS", "BPCL.NS", "BHARTIARTL.NS",
-    "BRITANNIA.NS", "CIPLA.NS", "COALINDIA.NS", "DIVISLAB.NS", "DRREDDY.NS",
-    "EICHERMOT.NS", "GRASIM.NS", "HCLTECH.NS", "HDFCBANK.NS", "HDFCLIFE.NS",
-    "HEROMOTOCO.NS", "HINDALCO.NS", "HINDUNILVR.NS", "ICICIBANK.NS", "ITC.NS",
-    "INDUSINDBK.NS", "INFY.NS", "JSWSTEEL.NS", "KOTAKBANK.NS", "LT.NS",
-    "M&M.NS", "MARUTI.NS", "NTPC.NS", "NESTLEIND.NS", "ONGC.NS",
-    "POWERGRID.NS", "RELIANCE.NS", "SBILIFE.NS", "SBIN.NS", "SUNPHARMA.NS",
-    "TCS.NS", "TATACONSUM.NS", "TATAMOTORS.NS", "TATASTEEL.NS", "TECHM.NS",
-    "TITAN.NS", "ULTRACEMCO.NS", "UPL.NS", "WIPRO.NS"
-]
 
 # Simple in-memory cache
 class MarketCache:
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+import logging
+
+from backend.core.job_queue import analysis_jobs
+from backend.core.sentiment_cache import sentiment_cache
+from backend.llm import llm_service
+from backend.core.single_flight import request_flights
+from backend.core.telemetry import metrics
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Aggregate histograms since startup: "latency_ms" per
+    agent node and external call (yfinance, llm, mongo), plus LLM prompt and
+    response sizes in characters. Keys are "kind:name".
+    """
+    return {
+        "histograms": metrics.snapshot(),
+        "single_flight": request_flights.stats(),
+        "analysis_jobs": analysis_jobs.stats(),
+        "sentiment_cache": sentiment_cache.stats(),
+        "llm_cache": llm_service.cache_stats(),
+        "llm_pool": llm_service.pool.stats()
+    }
@@ -27,43 +27,39 @@ async def run_simulation():
     
     agent = MasterAgent()
     
-    results = []
+    # Analyze all symbols concurrently
+    # Note: We pass the full budget as account_size, assuming we want to use it all for one trade if possible,
+    # or we can treat it as the total portfolio value.
+    # For this simulation, let's say we have $5 total and want to see if we can buy anything.
+    batch = await agent.run_batch(symbols, account_size=budget)
+    results = batch.results
     
-    for symbol in symbols:
-        print(f"\nAnalyzing {symbol}...")
-        try:
-            # Run Master Agent
-            # Note: We pass the full budget as account_size, assuming we want to use it all for one trade if possible,
-            # or we can treat it as the total portfolio value.
-            # For this simulation, let's say we have $5 total and want to see if we can buy anything.
-            output = await agent.run(symbol, account_size=budget)
-            
-            # Handle decision enum or string
-            decision_val = output.decision.value if hasattr(output.decision, 'value') else str(output.decision)
-            print(f"Decision: {decision_val.upper()}")
-            print(f"Reasoning: {output.reasoning}")
-            
-            if output.final_signal:
-                print(f"Signal Details:")
-                print(f"  Action: {output.final_signal.signal}")
-                print(f"  Entry Price: ${output.final_signal.entry_price:.2f}")
-                print(f"  Stop Loss: ${output.final_signal.stop_loss:.2f}")
-                print(f"  Position Size (Shares): {output.final_signal.position_size:.4f}")
-                cost = output.final_signal.entry_price * output.final_signal.position_size
-                print(f"  Estimated Cost: ${cost:.2f}")
-            
-            results.append(output)
-            
-        except Exception as e:
-            print(f"Error analyzing {symbol}: {e}")
-            import traceback
-            traceback.print_exc()
+    for output in results:
+        print(f"\n{output.symbol}")
+        # Handle decision enum or string
+        decision_val = output.decision.value if hasattr(output.decision, 'value') else str(output.decision)
+        print(f"Decision: {decision_val.upper()}")
+        print(f"Reasoning: {output.reasoning}")
+        
+        if output.final_signal:
+            print(f"Signal Details:")
+            print(f"  Action: {output.final_signal.signal}")
+            print(f"  Entry Price: ${output.final_signal.entry_price:.2f}")
+            print(f"  Stop Loss: ${output.final_signal.stop_loss:.2f}")
+            print(f"  Position Size (Shares): {output.final_signal.position_size:.4f}")
+            cost = output.final_signal.entry_price * output.final_signal.position_size
+            print(f"  Estimated Cost: ${cost:.2f}")
+    
+    for symbol, error in batch.errors.items():
+        print(f"Error analyzing {symbol}: {error}")
             
     print("\n----------------------------------------")
     print("Simulation Complete.")
     print("Summary:")
     for res in results:
-        print(f"{res.symbol}: {res.decision.value} - {res.reasoning[:50]}...")
+        decision_val = res.decision.value if hasattr(res.decision, 'value') else str(res.decision)
+        print(f"{res.symbol}: {decision_val} - {res.reasoning[:50]}...")
+    print(f"Completed {batch.summary.completed}/{batch.summary.requested} in {batch.summary.elapsed_seconds:.1f}s")
 
 if __name__ == "__main__":
     asyncio.run(run_simulation())
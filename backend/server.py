@@ -51,10 +51,16 @@ async def startup_db_client():
     logger.info("Starting up AI Stock Investor API...")
     await db.connect_to_database()
     logger.info("Database connected.")
+    from backend.core.job_queue import analysis_jobs
+    await analysis_jobs.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     logger.info("Shutting down AI Stock Investor API...")
+    from backend.core.job_queue import analysis_jobs
+    await analysis_jobs.stop()
+    from backend.core.symbol_resolver import symbol_resolver
+    symbol_resolver.flush()
     await db.close_database_connection()
     logger.info("Database disconnected.")
 
@@ -87,6 +93,9 @@ from backend.routers import watchlist
 app.include_router(market_data.router, prefix=settings.API_PREFIX, tags=["Market Data"])
 app.include_router(watchlist.router, prefix=settings.API_PREFIX, tags=["Watchlist"])
 
+from backend.routers import metrics
+app.include_router(metrics.router, prefix=settings.API_PREFIX, tags=["Metrics"])
+
 @app.head("/")
 @app.get("/")
 async def root():
@@ -8,6 +8,12 @@ from fastapi.testclient import TestClient
 # Add project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+# Keep on-disk caches (OHLCV store, symbol resolutions) out of the working tree
+import tempfile
+_cache_dir = tempfile.mkdtemp(prefix="stock_investor_tests_")
+os.environ.setdefault("OHLCV_STORE_DIR", os.path.join(_cache_dir, "ohlcv"))
+os.environ.setdefault("SYMBOL_RESOLVER_PATH", os.path.join(_cache_dir, "symbol_suffixes.json"))
+
 from backend.server import app
 from backend.configs.settings import settings
 from backend.database import db
@@ -117,3 +117,130 @@ async def test_master_agent_run(mock_db):
                     
                     assert output.decision == SignalType.BUY
                     assert output.reasoning == "Safe | LLM: Buy it."
+
+
+@pytest.mark.asyncio
+async def test_master_agent_runs_independent_branches_in_parallel(mock_db):
+    import asyncio
+
+    agent = MasterAgent()
+    running, peak = 0, 0
+
+    async def branch(result):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return result
+
+    agent.analyst = MagicMock()
+    agent.analyst.analyze = lambda state: branch({
+        "summary": "Good", "sentiment_score": 0.0, "impact_score": 0,
+        "sentiment_analysis": {}, "news_articles": [], "events": []
+    })
+    agent.quant = MagicMock()
+    agent.quant.analyze = lambda state: branch({
+        "signals": [], "trend": "up", "nearest_support": 1, "nearest_resistance": 2,
+        "price_candles": [], "indicators": {}, "market_data": {}
+    })
+    agent.risk = AsyncMock()
+    agent.risk.evaluate.return_value = {"approved": False, "reason": "No signal", "risk_analysis": {}}
+
+    company = MagicMock()
+    company.model_dump.return_value = {"symbol": "AAPL"}
+
+    with patch("backend.agents.master_agent.resolve_company_query", new_callable=AsyncMock) as mock_resolve, \
+         patch("backend.agents.master_agent.memory_manager.get_memories", new_callable=AsyncMock, return_value=[]), \
+         patch("backend.agents.master_agent.memory_manager.add_memory", new_callable=AsyncMock), \
+         patch("backend.mcp_tools.stock_info_fetcher.fetch_stock_info_logic", new=lambda symbol: branch(company)):
+        mock_resolve.return_value = {"symbol": "AAPL", "peers": []}
+        output = await agent.run("AAPL")
+
+    assert peak == 3
+    assert output.company_info == {"symbol": "AAPL"}
+    # Every node is timed, and the parallel branches overlap in the trace
+    assert {"resolve_node", "analyst_node", "quant_node", "company_info_node", "risk_node", "decision_node"} <= set(output.timings)
+    assert output.timings["analyst_node"] >= 40
+    assert output.total_ms < sum(output.timings.values())
+    assert output.decision == SignalType.HOLD
+    agent.risk.evaluate.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_master_agent_run_batch_bounds_concurrency_and_timeouts(mock_db):
+    import asyncio
+    from backend.agents.master_agent import MasterOutput
+
+    agent = MasterAgent()
+    running, peak = 0, 0
+
+    async def fake_run(symbol, account_size=100000.0, current_exposure=0.0):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(1.0 if symbol == "SLOW" else 0.02)
+            if symbol == "BAD":
+                raise ValueError("no data")
+            decision = "buy" if symbol == "AAPL" else "hold"
+            signal = {"symbol": symbol, "signal": "buy", "entry_price": 10.0, "position_size": 5.0} if decision == "buy" else None
+            return MasterOutput(symbol=symbol, decision=decision, final_signal=signal, reasoning="",
+                                analyst_summary="", quant_signals_count=0)
+        finally:
+            running -= 1
+
+    agent.run = fake_run
+    symbols = ["AAPL", "msft", "BAD", "SLOW", "AAPL"] + [f"S{i}" for i in range(6)]
+    batch = await agent.run_batch(symbols, concurrency=3, timeout=0.2)
+
+    assert peak == 3
+    assert batch.summary.requested == 10  # duplicates collapsed
+    assert batch.summary.completed == 8
+    assert set(batch.errors) == {"BAD", "SLOW"}
+    assert batch.summary.buy_symbols == ["AAPL"]
+    assert batch.summary.committed_capital == 50.0
+    assert batch.summary.decisions == {"buy": 1, "hold": 7}
+
+
+@pytest.mark.asyncio
+async def test_master_agent_astream_emits_stages_as_nodes_finish(mock_db):
+    import asyncio
+    from backend.agents.master_agent import MasterOutput
+
+    agent = MasterAgent()
+
+    async def slow_analyst(state):
+        await asyncio.sleep(0.2)
+        return {"summary": "Good", "sentiment_score": 0.5, "impact_score": 3,
+                "sentiment_analysis": {"label": "bullish"}, "news_articles": [], "events": []}
+
+    async def fast_quant(state):
+        return {"signals": [], "trend": "up", "nearest_support": 1, "nearest_resistance": 2,
+                "price_candles": [{"close": 10.0}], "indicators": {}, "market_data": {}}
+
+    agent.analyst = MagicMock(analyze=slow_analyst)
+    agent.quant = MagicMock(analyze=fast_quant)
+    agent.risk = AsyncMock()
+    agent.risk.evaluate.return_value = {"approved": False, "reason": "No signal", "risk_analysis": {"score": 1}}
+
+    with patch("backend.agents.master_agent.resolve_company_query", new_callable=AsyncMock) as mock_resolve, \
+         patch("backend.agents.master_agent.memory_manager.get_memories", new_callable=AsyncMock, return_value=[]), \
+         patch("backend.agents.master_agent.memory_manager.add_memory", new_callable=AsyncMock), \
+         patch("backend.mcp_tools.stock_info_fetcher.fetch_stock_info_logic", new_callable=AsyncMock, side_effect=Exception("offline")):
+        mock_resolve.return_value = {"symbol": "AAPL", "peers": ["MSFT"]}
+        events = [event async for event in agent.astream("apple")]
+
+    stages = [stage for stage, _ in events]
+    assert stages[0] == "resolved" and stages[-2:] == ["decision", "result"]
+    # The chart data arrives before the slow sentiment step finishes
+    assert stages.index("quant") < stages.index("analyst")
+    payloads = dict(events)
+    assert payloads["quant"]["price_data"] == [{"close": 10.0}]
+    assert payloads["quant"]["elapsed_ms"] < payloads["analyst"]["elapsed_ms"]
+    assert payloads["risk"] == {"risk": {"score": 1}, "elapsed_ms": payloads["risk"]["elapsed_ms"]}
+
+    result = payloads["result"]
+    assert isinstance(result, MasterOutput)
+    assert result.symbol == "AAPL" and result.sentiment_score == 0.5
+    assert "analyst_node" in result.timings
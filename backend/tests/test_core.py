@@ -0,0 +1,780 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from backend.core.backtester import Backtester
+from backend.core.indicators import Indicators
+from backend.core.strategies import (
+    MeanReversion, MACDCrossover, VolumeSurge, TechnicalBreakout,
+    SIGNAL_NONE, SIGNAL_BUY, SIGNAL_SELL
+)
+
+
+@pytest.fixture
+def ohlcv_df():
+    """Synthetic daily OHLCV random walk with a DatetimeIndex."""
+    rng = np.random.default_rng(42)
+    n = 400
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    volume = rng.integers(1_000, 10_000, n).astype(float)
+    volume[::37] *= 6  # occasional volume spikes
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.DataFrame(
+        {"open": open_, "high": high, "low": low, "close": close, "volume": volume, "symbol": "TEST"},
+        index=index,
+    )
+
+
+# ----------------- Backtester Test ----------------- #
+@pytest.mark.parametrize("strategy_cls", [MeanReversion, MACDCrossover, TechnicalBreakout])
+def test_event_driven_matches_full_history(ohlcv_df, strategy_cls):
+    backtester = Backtester(initial_capital=10000.0)
+
+    full = backtester.run(ohlcv_df, strategy_cls())
+    event = backtester.run_event_driven(ohlcv_df, strategy_cls(), lookback=60)
+
+    assert event.total_trades == full.total_trades
+    assert event.total_pnl == pytest.approx(full.total_pnl)
+    assert event.max_drawdown == pytest.approx(full.max_drawdown)
+    assert [t["timestamp"] for t in event.trades] == [t["timestamp"] for t in full.trades]
+
+
+def test_event_driven_rejects_short_lookback(ohlcv_df):
+    with pytest.raises(ValueError):
+        Backtester().run_event_driven(ohlcv_df, MACDCrossover(), lookback=10)
+
+
+# ----------------- Bulk Signals / Vectorized Backtest Test ----------------- #
+@pytest.mark.parametrize("strategy_cls", [MeanReversion, MACDCrossover, VolumeSurge, TechnicalBreakout])
+def test_generate_signals_matches_analyze(ohlcv_df, strategy_cls):
+    strategy = strategy_cls()
+    df = Indicators.calculate_all(ohlcv_df)
+
+    bulk = strategy.generate_signals(df)
+
+    codes = {"buy": SIGNAL_BUY, "sell": SIGNAL_SELL}
+    expected = [SIGNAL_NONE] * len(df)
+    for i in range(len(df)):
+        signal = strategy.analyze(df.iloc[:i+1])
+        if signal:
+            expected[i] = codes[signal.signal]
+    assert bulk.tolist() == expected
+
+
+@pytest.mark.parametrize("strategy_cls", [MeanReversion, MACDCrossover, VolumeSurge])
+def test_run_vectorized_matches_event_driven(ohlcv_df, strategy_cls):
+    backtester = Backtester(initial_capital=10000.0)
+
+    event = backtester.run_event_driven(ohlcv_df, strategy_cls())
+    vectorized = backtester.run_vectorized(ohlcv_df, strategy_cls())
+
+    assert vectorized.total_trades == event.total_trades
+    assert vectorized.win_rate == pytest.approx(event.win_rate)
+    assert vectorized.total_pnl == pytest.approx(event.total_pnl)
+    assert vectorized.max_drawdown == pytest.approx(event.max_drawdown)
+    assert vectorized.sharpe_ratio == pytest.approx(event.sharpe_ratio)
+    assert vectorized.profit_factor == pytest.approx(event.profit_factor)
+
+
+# ----------------- Parameter Sweep Test ----------------- #
+def test_parameter_sweep_ranks_grid(ohlcv_df):
+    from backend.core.parameter_sweep import ParameterSweep
+
+    sweep = ParameterSweep(MACDCrossover, {"fast": [8, 12], "slow": [26, 30]}, initial_capital=10000.0, max_workers=2)
+    table = sweep.run(ohlcv_df)
+
+    assert len(table) == 4
+    assert list(table["sharpe_ratio"]) == sorted(table["sharpe_ratio"], reverse=True)
+
+    # Each row matches a direct backtest with the same parameters
+    best = table.iloc[0]
+    direct = Backtester(10000.0).run_vectorized(ohlcv_df, MACDCrossover(fast=int(best["fast"]), slow=int(best["slow"])))
+    assert best["total_pnl"] == pytest.approx(direct.total_pnl)
+    assert best["total_trades"] == direct.total_trades
+
+    # A parameter with no values would sweep nothing
+    with pytest.raises(ValueError, match="slow"):
+        ParameterSweep(MACDCrossover, {"fast": [8, 12], "slow": []})
+
+
+# ----------------- Portfolio Backtester Test ----------------- #
+def test_portfolio_backtest_respects_capital_and_exposure(ohlcv_df):
+    from backend.core.portfolio_backtester import PortfolioBacktester
+
+    rng = np.random.default_rng(7)
+    panel = {}
+    for k, symbol in enumerate(["AAA", "BBB", "CCC"]):
+        df = ohlcv_df.copy()
+        scale = np.exp(np.cumsum(rng.normal(0, 0.01, len(df))))
+        for column in ["open", "high", "low", "close"]:
+            df[column] = df[column] * scale * (k + 1)
+        df["symbol"] = symbol
+        panel[symbol] = df
+
+    backtester = PortfolioBacktester(initial_capital=10000.0, risk_per_trade_percent=2.0, max_exposure_pct=0.5)
+    result = backtester.run(panel, MACDCrossover())
+
+    assert result.symbols == ["AAA", "BBB", "CCC"]
+    assert len(result.equity_curve) == len(ohlcv_df) - backtester.warmup + 1
+    assert result.final_equity == pytest.approx(result.equity_curve[-1])
+    assert result.total_trades > 0
+    assert result.turnover > 0
+    assert result.max_drawdown <= 0
+
+    # Replay the trade log: cash never goes negative
+    cash = 10000.0
+    for trade in result.trades:
+        value = trade["shares"] * trade["price"]
+        cash += value if trade["type"] == "SELL" else -value
+        assert cash >= -1e-6
+
+
+def test_portfolio_backtest_stops_out_buy_only_positions():
+    from backend.core.portfolio_backtester import PortfolioBacktester
+    from backend.core.strategies import Strategy
+
+    class BuyOnce(Strategy):
+        def generate_signals(self, df):
+            signals = np.full(len(df), SIGNAL_NONE, dtype=np.int8)
+            signals[60] = SIGNAL_BUY
+            return signals
+
+    n = 100
+    close = np.full(n, 100.0)
+    close[70:] = 96.0  # 4% down: inside the 5% stop
+    low = close - 0.5
+    low[80] = 94.0  # trades through the stop at 95
+    df = pd.DataFrame({"open": close, "high": close + 0.5, "low": low, "close": close, "volume": 1000.0},
+                      index=pd.date_range("2024-01-01", periods=n, freq="D"))
+
+    result = PortfolioBacktester(initial_capital=10000.0, stop_loss_pct=0.05).run({"AAA": df}, BuyOnce())
+
+    buy, sell = result.trades
+    assert buy["type"] == "BUY" and sell["type"] == "SELL"
+    assert sell["reason"] == "stop_loss"
+    assert sell["timestamp"] == df.index[80]
+    assert sell["price"] == pytest.approx(95.0)
+    assert sell["pnl"] == pytest.approx(-5.0 * buy["shares"])
+    # Risk per trade (1%) is what the stop actually lost
+    assert sell["pnl"] == pytest.approx(-0.01 * 10000.0, rel=0.05)
+    assert result.total_trades == 1
+
+
+# ----------------- Incremental Indicators Test ----------------- #
+def test_incremental_indicators_match_batch(ohlcv_df):
+    from backend.core.incremental_indicators import IncrementalIndicators
+
+    batch = Indicators.calculate_all(ohlcv_df)
+    state = IncrementalIndicators("TEST")
+
+    for i, (timestamp, row) in enumerate(ohlcv_df.iterrows()):
+        values = state.update(row["high"], row["low"], row["close"], row["volume"], timestamp=timestamp)
+        if i in (0, 13, 19, 49, 199, len(ohlcv_df) - 1):
+            for column in IncrementalIndicators.COLUMNS:
+                expected = batch[column].iloc[i]
+                if pd.isna(expected):
+                    assert np.isnan(values[column]), (i, column)
+                else:
+                    assert values[column] == pytest.approx(expected, rel=1e-9), (i, column)
+
+    warmed = IncrementalIndicators.from_dataframe(ohlcv_df)
+    assert warmed.values["macd_hist"] == pytest.approx(batch["macd_hist"].iloc[-1], rel=1e-9)
+
+
+def test_incremental_indicators_replace_a_redelivered_bar(ohlcv_df):
+    from backend.core.incremental_indicators import IncrementalIndicators
+
+    batch = Indicators.calculate_all(ohlcv_df)
+    state = IncrementalIndicators.from_dataframe(ohlcv_df.iloc[:-1])
+    timestamp, row = ohlcv_df.index[-1], ohlcv_df.iloc[-1]
+
+    # The still-forming last bar arrives several times (revised) before it closes
+    for bump in (5.0, -3.0, 0.0):
+        values = state.update(row["high"] + bump, row["low"], row["close"] + bump, row["volume"] * 2, timestamp=timestamp)
+    values = state.update_candle({
+        "timestamp": timestamp.isoformat(), "high": row["high"], "low": row["low"],
+        "close": row["close"], "volume": row["volume"]
+    })
+
+    assert state.bars == len(ohlcv_df)
+    for column in IncrementalIndicators.COLUMNS:
+        assert values[column] == pytest.approx(batch[column].iloc[-1], rel=1e-9), column
+
+
+# ----------------- Indicator Frame Cache Test ----------------- #
+def test_indicator_cache_shares_frames_and_evicts(ohlcv_df):
+    from backend.core.indicator_cache import IndicatorFrameCache
+    from backend.models import PriceCandle
+
+    candles = [
+        PriceCandle(symbol="TEST", timestamp=ts, open=r["open"], high=r["high"], low=r["low"],
+                    close=r["close"], volume=r["volume"])
+        for ts, r in ohlcv_df.iterrows()
+    ]
+    cache = IndicatorFrameCache(max_entries=2)
+
+    frame = cache.get_frame(candles)
+    # JSON-dumped candles (as RiskAgent receives them) resolve to the same entry
+    assert cache.get_frame([c.model_dump(mode="json") for c in candles]) is frame
+    assert "atr_14" in frame.columns
+    assert cache.stats()["hits"] == 1
+
+    cache.get_frame(candles[:-1])
+    cache.get_frame(candles[:-2])
+    assert cache.stats()["entries"] == 2
+    assert cache.get_frame(candles) is not frame  # evicted as least recently used
+
+    # A still-forming last bar refreshed in place gets a fresh frame
+    latest = cache.get_frame(candles)
+    refreshed = candles[:-1] + [candles[-1].model_copy(update={"close": candles[-1].close + 1})]
+    assert cache.get_frame(refreshed) is not latest
+    assert cache.get_frame(refreshed)["close"].iloc[-1] == candles[-1].close + 1
+
+
+# ----------------- Support/Resistance Test ----------------- #
+def _loop_levels(df, window=5, threshold=0.02):
+    """Reference implementation: the original per-bar scan and list clustering."""
+    highs, lows = df['high'].to_numpy(), df['low'].to_numpy()
+    levels = []
+    for i in range(window, len(df) - window):
+        if all(highs[i] > highs[i - j] for j in range(1, window + 1)) and \
+           all(highs[i] > highs[i + j] for j in range(1, window + 1)):
+            levels.append(highs[i])
+        if all(lows[i] < lows[i - j] for j in range(1, window + 1)) and \
+           all(lows[i] < lows[i + j] for j in range(1, window + 1)):
+            levels.append(lows[i])
+    levels = sorted(levels)
+    if not levels:
+        return []
+    groups, current = [], [levels[0]]
+    for level in levels[1:]:
+        if level > current[-1] * (1 + threshold):
+            groups.append(sum(current) / len(current))
+            current = [level]
+        else:
+            current.append(level)
+    groups.append(sum(current) / len(current))
+    return groups
+
+
+@pytest.mark.parametrize("window", [1, 3, 5, 10])
+def test_identify_levels_matches_loop(ohlcv_df, window):
+    from backend.core.support_resistance import SupportResistance
+
+    levels = SupportResistance.identify_levels(ohlcv_df, window=window)
+    assert levels == pytest.approx(_loop_levels(ohlcv_df, window=window))
+
+    multi = SupportResistance.identify_levels_multi(ohlcv_df, windows=(3, 5, 10))
+    assert set(multi) == {3, 5, 10}
+    for w, multi_levels in multi.items():
+        assert multi_levels == pytest.approx(SupportResistance.identify_levels(ohlcv_df, window=w))
+
+    assert SupportResistance.identify_levels(ohlcv_df.iloc[:2 * window], window=window) == []
+    assert SupportResistance.consolidate_levels([]) == []
+
+
+def test_support_resistance_tracker_matches_batch(ohlcv_df):
+    from backend.core.support_resistance import SupportResistance, SupportResistanceTracker
+
+    tracker = SupportResistanceTracker(window=5)
+    for i in range(0, len(ohlcv_df), 25):
+        prefix = ohlcv_df.iloc[:i + 1]
+        tracker.sync(prefix)
+        levels = SupportResistance.identify_levels(prefix, window=5)
+        assert tracker.levels == pytest.approx(levels)
+
+        price = prefix['close'].iloc[-1]
+        assert tracker.get_nearest_levels(price) == SupportResistance.get_nearest_levels(price, levels)
+
+    # Syncing the same data again consumes nothing; a different series forces a rebuild
+    assert tracker.sync(ohlcv_df.iloc[:376]) == 0
+    shifted = ohlcv_df.iloc[:200].copy()
+    shifted[['high', 'low']] *= 1.1
+    assert tracker.sync(shifted) == 200
+    assert tracker.levels == pytest.approx(SupportResistance.identify_levels(shifted, window=5))
+
+
+def test_support_resistance_tracker_only_reflects_the_given_frame(ohlcv_df):
+    from backend.core.support_resistance import SupportResistance, SupportResistanceTracker
+    from backend.mcp_tools.support_resistance_detector import detect_support_resistance_logic
+    from backend.models import PriceCandle
+
+    tracker = SupportResistanceTracker(window=5)
+    # Sliding, shrinking and then widening-again windows over the same series
+    for start, end in [(0, 300), (270, 300), (150, 320), (200, 340), (100, 340), (330, 340)]:
+        frame = ohlcv_df.iloc[start:end]
+        tracker.sync(frame)
+        assert tracker.levels == pytest.approx(SupportResistance.identify_levels(frame, window=5)), (start, end)
+
+    # Same symbol and same last bar, different earlier data: no leak between callers
+    candles = [
+        PriceCandle(symbol="LEAK", timestamp=ts, open=r["open"], high=r["high"], low=r["low"],
+                    close=r["close"], volume=r["volume"])
+        for ts, r in ohlcv_df.iterrows()
+    ]
+    detect_support_resistance_logic(candles[:300])
+    recent = detect_support_resistance_logic(candles[270:300])
+    assert recent.levels == pytest.approx(SupportResistance.identify_levels(ohlcv_df.iloc[270:300]))
+
+
+def test_breakout_strategy_bounds_per_symbol_trackers(ohlcv_df):
+    strategy = TechnicalBreakout()
+    strategy.MAX_TRACKERS = 2
+    for symbol in ["A", "B", "A", "C"]:
+        strategy.analyze(ohlcv_df.assign(symbol=symbol))
+    # B was the least recently analyzed
+    assert list(strategy._trackers) == ["A", "C"]
+
+
+def test_breakout_strategy_does_not_carry_levels_between_frames(ohlcv_df):
+    from backend.core.support_resistance import SupportResistance
+
+    df = Indicators.calculate_all(ohlcv_df)
+    strategy = TechnicalBreakout()
+    strategy.analyze(df)  # full history first
+    window = df.iloc[-60:]
+    strategy.analyze(window)
+    expected = SupportResistance.identify_levels(window, strategy.sr_window, strategy.sr_threshold)
+    assert strategy._trackers["TEST"].levels == pytest.approx(expected)
+
+
+# ----------------- OHLCV Store Test ----------------- #
+def test_ohlcv_store_appends_only_new_bars(tmp_path):
+    from backend.core.ohlcv_store import OHLCVStore
+
+    index = pd.date_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=60, freq="D")
+    history = pd.DataFrame({
+        "Open": np.arange(60.0), "High": np.arange(60.0) + 1, "Low": np.arange(60.0) - 1,
+        "Close": np.arange(60.0) + 0.5, "Volume": np.full(60, 1000.0)
+    }, index=index)
+    calls = []
+
+    def fetch(period=None, start=None):
+        calls.append(period or "start")
+        if period:
+            return history.iloc[:-1]
+        # Incremental fetch re-delivers the last stored bar (revised) plus the new one
+        revised = history.iloc[-2:].copy()
+        revised["Close"] += 100
+        return revised[revised.index >= pd.Timestamp(start)]
+
+    store = OHLCVStore(str(tmp_path), min_refresh_seconds=0)
+    first = store.get_history("TEST", "1mo", "1d", fetch)
+    assert calls == ["1mo"]
+    assert first[-1].close == history["Close"].iloc[-2]
+    assert first[-1].timestamp == index[-2]
+    assert first[0].timestamp >= index[-1] - pd.DateOffset(months=1)
+
+    second = store.get_history("TEST", "1mo", "1d", fetch)
+    assert calls == ["1mo", "start"]
+    assert len(store.read("TEST", "1d")) == 60
+    assert [c.close for c in second[-2:]] == (history["Close"].iloc[-2:] + 100).tolist()
+
+    # A longer period than stored triggers a full refetch
+    store.get_history("TEST", "1y", "1d", fetch)
+    assert calls[-1] == "1y"
+    assert store.get_history("MISSING", "1mo", "1d", lambda **kw: pd.DataFrame()) == []
+
+
+def test_ohlcv_store_session_periods_and_partial_writes(tmp_path):
+    from backend.core.ohlcv_store import BAR_DTYPE, OHLCVStore
+
+    # Five sessions of 5-minute bars, 78 per day
+    days = pd.bdate_range(end=pd.Timestamp.now(tz="UTC").normalize() - pd.Timedelta(days=1), periods=5)
+    index = pd.DatetimeIndex([d + pd.Timedelta(hours=14, minutes=5 * i) for d in days for i in range(78)])
+    history = pd.DataFrame({c: np.arange(len(index), dtype=float) for c in ["Open", "High", "Low", "Close", "Volume"]}, index=index)
+    calls = []
+
+    def fetch(period=None, start=None):
+        calls.append(period or "start")
+        sessions = {"1d": 1, "5d": 5}[period] if period else None
+        return history[-78 * sessions:] if sessions else history[history.index >= pd.Timestamp(start)]
+
+    store = OHLCVStore(str(tmp_path), min_refresh_seconds=3600)
+    assert len(store.get_history("TEST", "1d", "5m", fetch)) == 78
+    # One stored session doesn't cover five
+    assert len(store.get_history("TEST", "5d", "5m", fetch)) == 78 * 5
+    assert calls == ["1d", "5d"]
+    assert len(store.get_history("TEST", "1d", "5m", fetch)) == 78
+    assert calls == ["1d", "5d"]
+
+    # An append interrupted mid-record leaves the complete bars readable
+    with open(store._path("TEST", "5m", "bin"), "ab") as f:
+        f.write(b"\0" * (BAR_DTYPE.itemsize // 2))
+    assert len(store.read("TEST", "5m")) == 78 * 5
+    assert len(store.get_history("TEST", "5d", "5m", fetch)) == 78 * 5
+
+
+def test_ohlcv_store_fetches_symbols_in_parallel(tmp_path):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.core.ohlcv_store import OHLCVStore
+
+    index = pd.date_range(end=pd.Timestamp.now(tz="UTC").normalize(), periods=10, freq="D")
+    history = pd.DataFrame({
+        "Open": np.ones(10), "High": np.ones(10), "Low": np.ones(10), "Close": np.ones(10), "Volume": np.ones(10)
+    }, index=index)
+    # Both fetches must be in flight at once; a store-wide lock would time this out
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fetch(period=None, start=None):
+        barrier.wait()
+        return history
+
+    store = OHLCVStore(str(tmp_path))
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(lambda s: store.get_history(s, "1mo", "1d", fetch), ["AAA", "BBB"]))
+    assert [len(r) for r in results] == [10, 10]
+
+
+# ----------------- Single-Flight Test ----------------- #
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    import asyncio
+    from backend.core.single_flight import SingleFlight, single_flight
+
+    flight = SingleFlight(ttl=60)
+    calls = []
+
+    @single_flight(flight=flight, clone=list)
+    async def fetch(symbol, period="1mo"):
+        calls.append(symbol)
+        await asyncio.sleep(0.01)
+        return [symbol, period]
+
+    results = await asyncio.gather(fetch("AAPL"), fetch("AAPL", period="1mo"), fetch(symbol="AAPL"), fetch("MSFT"))
+    assert calls == ["AAPL", "MSFT"]
+    assert results[0] == results[1] == ["AAPL", "1mo"]
+    assert results[0] is not results[1]
+
+    # Served from the post-completion TTL without a new call
+    assert await fetch("AAPL") == ["AAPL", "1mo"]
+    assert calls == ["AAPL", "MSFT"]
+    assert flight.stats()["coalesced"] == 3
+
+    @single_flight(flight=flight)
+    async def failing(symbol):
+        calls.append(f"fail-{symbol}")
+        raise ValueError(symbol)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await failing("X")
+    assert calls.count("fail-X") == 2  # errors are not cached
+
+
+# ----------------- Symbol Resolver Test ----------------- #
+def test_symbol_resolver_remembers_suffixes(tmp_path):
+    from backend.core.symbol_resolver import SymbolResolver
+
+    path = str(tmp_path / "suffixes.json")
+    resolver = SymbolResolver(path, negative_ttl=3600, save_delay=60)
+    assert resolver.candidates("RELIANCE") == ["RELIANCE", "RELIANCE.NS", "RELIANCE.BO"]
+
+    resolver.record_failure("RELIANCE", "RELIANCE")
+    resolver.record_success("RELIANCE", "RELIANCE.NS")
+    assert resolver.candidates("RELIANCE")[0] == "RELIANCE.NS"
+
+    resolver.record_failure("FOO", "FOO")
+    assert resolver.candidates("foo") == ["foo.NS", "foo.BO"]
+
+    # Writes are debounced off the caller's thread
+    assert not (tmp_path / "suffixes.json").exists()
+    resolver.flush()
+
+    # Persisted across instances
+    reloaded = SymbolResolver(path, negative_ttl=3600)
+    assert reloaded.candidates("RELIANCE")[0] == "RELIANCE.NS"
+    assert reloaded.candidates("FOO") == ["FOO.NS", "FOO.BO"]
+
+    reloaded.prewarm()
+    assert reloaded.candidates("SUZLON") == ["SUZLON.NS", "SUZLON", "SUZLON.BO"]
+
+
+def test_symbol_resolver_survives_transient_empty_replies():
+    from backend.core.symbol_resolver import SymbolResolver
+
+    resolver = SymbolResolver(None, negative_ttl=3600, max_failures=3)
+    resolver.prewarm()
+
+    # A rate-limited burst: every suffix comes back empty once
+    for suffix in ["RELIANCE.NS", "RELIANCE", "RELIANCE.BO"]:
+        resolver.record_failure("RELIANCE", suffix)
+    assert resolver.candidates("RELIANCE") == ["RELIANCE.NS"]
+
+    # Only repeated failures in a row forget the resolved suffix
+    resolver.record_failure("RELIANCE", "RELIANCE.NS")
+    resolver.record_success("RELIANCE", "RELIANCE.NS")
+    resolver.record_failure("RELIANCE", "RELIANCE.NS")
+    resolver.record_failure("RELIANCE", "RELIANCE.NS")
+    assert resolver.candidates("RELIANCE")[0] == "RELIANCE.NS"
+    resolver.record_failure("RELIANCE", "RELIANCE.NS")
+    # ...and with the other suffixes still skipped, every suffix is tried again
+    assert resolver.candidates("RELIANCE") == ["RELIANCE", "RELIANCE.NS", "RELIANCE.BO"]
+
+    # Never an empty list, even when every unresolved suffix is being skipped
+    for suffix in ["BAR", "BAR.NS", "BAR.BO"]:
+        resolver.record_failure("BAR", suffix)
+    assert resolver.candidates("BAR") == ["BAR", "BAR.NS", "BAR.BO"]
+
+
+# ----------------- Scanner Engine Test ----------------- #
+def test_score_universe_matches_per_symbol_scoring():
+    from backend.mcp_tools.stock_scanner import score_stock, score_universe
+
+    rng = np.random.default_rng(7)
+    panel = {}
+    for i in range(60):
+        n = int(rng.integers(10, 30))  # ragged histories, some too short to score
+        close = 100 * np.exp(np.cumsum(rng.normal(0.003, 0.03, n)))
+        volume = rng.integers(1_000, 5_000, n).astype(float)
+        volume[-1] *= rng.choice([1, 3])
+        panel[f"S{i}.NS"] = pd.DataFrame(
+            {"Close": close, "Volume": volume},
+            index=pd.date_range(end="2024-06-28", periods=n, freq="B"),
+        )
+
+    picks = {p.symbol: p for p in score_universe(panel)}
+    expected = {s: score_stock(s, df) for s, df in panel.items()}
+    expected = {s: p for s, p in expected.items() if p}
+
+    assert picks.keys() == expected.keys()
+    assert len(picks) > 5
+    for symbol, pick in picks.items():
+        assert pick.model_dump() == pytest.approx(expected[symbol].model_dump())
+
+
+# ----------------- Scan Rule DSL Test ----------------- #
+def test_scan_rules_compile_to_vectorized_masks(ohlcv_df):
+    from backend.core.scan_rules import compile_rule
+
+    df = Indicators.calculate_all(ohlcv_df)
+    columns = {c: df[c].to_numpy(dtype=float) for c in df.columns if c != "symbol"}
+
+    rule = compile_rule("rsi_14 < 45 and close > sma_50 or volume > 2 * avg_volume_20")
+    expected = ((df["rsi_14"] < 45) & (df["close"] > df["sma_50"])) | (df["volume"] > 2 * df["avg_volume_20"])
+    # Rows still warming up an indicator the rule uses never match
+    expected &= df[["rsi_14", "sma_50", "avg_volume_20"]].notna().all(axis=1)
+    assert rule(columns).tolist() == expected.tolist()
+    assert rule.columns == {"rsi_14", "close", "sma_50", "volume", "avg_volume_20"}
+    assert compile_rule("rsi_14  < 45 and close > sma_50 or volume > 2 * avg_volume_20") is rule  # cached
+
+    chained = compile_rule("30 <= rsi_14 <= 70 and not abs(macd_hist) > 1")
+    expected = df["rsi_14"].between(30, 70) & ~(df["macd_hist"].abs() > 1)
+    assert chained(columns).tolist() == expected.tolist()
+
+    # != and not are True on NaN, but a row without a value still doesn't match
+    warm = df["sma_200"].notna().tolist()
+    assert compile_rule("sma_200 != 0")(columns).tolist() == warm
+    assert compile_rule("not sma_200 < 0")(columns).tolist() == warm
+
+    for bad in ["", "close.__class__", "__import__('os')", "close > sma_50 and volume", "close >"]:
+        with pytest.raises(ValueError):
+            compile_rule(bad)(columns)
+    with pytest.raises(ValueError, match="Unknown column"):
+        compile_rule("pe_ratio < 10")(columns)
+
+
+@pytest.mark.asyncio
+async def test_telemetry_spans_follow_tasks_into_trace():
+    import asyncio
+    from backend.core.telemetry import metrics, span, start_trace
+
+    metrics.reset()
+
+    async def fetch(name):
+        with span(name, kind="yfinance", symbol=name) as attrs:
+            await asyncio.to_thread(lambda: None)
+            attrs["response_chars"] = 120
+
+    with start_trace("test") as trace:
+        with span("node_a"):
+            await asyncio.gather(asyncio.create_task(fetch("x")), fetch("y"))
+        with pytest.raises(ValueError):
+            with span("node_b"):
+                raise ValueError("boom")
+
+    records = {r["name"]: r for r in trace.to_list()}
+    assert set(records) == {"node_a", "x", "y", "node_b"}
+    assert records["x"]["parent"] == "node_a" and records["x"]["attrs"]["symbol"] == "x"
+    assert records["node_b"]["error"] == "ValueError"
+    assert set(trace.timings()) == {"node_a", "node_b"}
+
+    # Spans outside a trace still feed the histograms
+    with span("x", kind="yfinance"):
+        pass
+    snapshot = metrics.snapshot()
+    assert snapshot["latency_ms"]["yfinance:x"]["count"] == 2
+    assert snapshot["response_chars"]["yfinance:y"]["count"] == 1
+    assert snapshot["latency_ms"]["node:node_a"]["p50"] is not None
+
+
+@pytest.mark.asyncio
+async def test_job_queue_priorities_dedup_and_failures(mock_db):
+    import asyncio
+    from backend.core.job_queue import JobQueue, JobStatus
+    from backend.agents.master_agent import MasterOutput
+
+    mock_db.db = None  # in-memory only
+    order, running, peak = [], 0, 0
+    gate = asyncio.Event()
+
+    async def runner(symbol, account_size, current_exposure):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await gate.wait()
+        order.append(symbol)
+        running -= 1
+        if symbol == "BAD":
+            raise ValueError("no data")
+        return MasterOutput(symbol=symbol, decision="hold", reasoning="", analyst_summary="", quant_signals_count=0)
+
+    queue = JobQueue(runner, workers=1)
+    await queue.start()
+    try:
+        first = await queue.submit("aapl")
+        await asyncio.sleep(0)  # the worker picks up AAPL and blocks on the gate
+        low = await queue.submit("LOW", priority=9)
+        bad = await queue.submit("BAD", priority=5)
+        high = await queue.submit("HIGH", priority=0)
+        duplicate = await queue.submit("LOW", priority=0)
+        assert duplicate.job_id == low.job_id
+        assert (await queue.get(first.job_id)).status == JobStatus.RUNNING
+
+        gate.set()
+        for _ in range(100):
+            if queue.stats()["completed"] + queue.stats()["failed"] == 4:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+    assert order == ["AAPL", "HIGH", "BAD", "LOW"]
+    assert peak == 1
+    assert (await queue.get(high.job_id)).result["symbol"] == "HIGH"
+    failed = await queue.get(bad.job_id)
+    assert failed.status == JobStatus.FAILED and failed.error == "no data"
+    assert queue.stats()["deduplicated"] == 1
+    assert await queue.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_llm_service_caches_and_coalesces_identical_prompts(mock_db):
+    import asyncio
+    from unittest.mock import patch
+    from backend.llm import LLMService
+
+    mock_db.redis = None
+    calls = []
+
+    class FakeLLM:
+        async def ainvoke(self, messages):
+            calls.append(messages[1].content)
+            await asyncio.sleep(0.02)
+            if messages[1].content == "fail":
+                raise RuntimeError("quota")
+            return type("Response", (), {"content": f"answer to {messages[1].content}"})()
+
+    service = LLMService()
+    with patch.object(service, "get_llm", return_value=FakeLLM()):
+        answers = await asyncio.gather(*(service.get_completion("q1") for _ in range(3)))
+        assert answers == ["answer to q1"] * 3
+        assert calls == ["q1"]  # in flight once
+
+        assert await service.get_completion("q1") == "answer to q1"
+        assert await service.get_completion("q1", system_prompt="other") == "answer to q1"
+        assert calls == ["q1", "q1"]  # a different system prompt is a different key
+
+        await service.get_completion("q2", cache_ttl=0)
+        await service.get_completion("q2", cache_ttl=0)
+        assert calls.count("q2") == 2
+
+        assert (await service.get_completion("fail")).startswith("Error generating response")
+        await service.get_completion("fail")
+        assert calls.count("fail") == 2  # errors are not cached
+
+    stats = service.cache_stats()
+    assert stats["memory_hits"] == 1 and stats["coalesced"] == 2
+
+
+def test_llm_client_pool_reuses_clients_until_rebuilt():
+    from backend.llm import LLMClientPool, MultiKeyChain
+
+    pool = LLMClientPool("gemini-2.5-flash", ["key-1", "key-2"])
+    chain = pool.get()
+    assert isinstance(chain, MultiKeyChain)
+    assert pool.get() is chain
+    assert pool.stats()["clients_created"] == 2
+
+    # Clients of keys that are still configured survive a rebuild
+    kept = chain.llms[1]
+    pool.rebuild(["key-2", "key-3"])
+    rebuilt = pool.get()
+    assert rebuilt is not chain and rebuilt.llms[0] is kept
+    assert pool.stats()["clients_created"] == 3 and pool.generation == 1
+
+    pool.rebuild([])
+    assert pool.get() is None
+
+
+@pytest.mark.asyncio
+async def test_multi_key_chain_spreads_calls_and_skips_limited_keys():
+    import asyncio
+    from backend.core.key_scheduler import KeyScheduler
+    from backend.llm import MultiKeyChain
+
+    class FakeLLM:
+        def __init__(self, index):
+            self.index = index
+            self.calls = 0
+            self.error = None
+
+        async def ainvoke(self, input, config=None, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(0.02)
+            if self.error:
+                raise self.error
+            return self.index
+
+    llms = [FakeLLM(i) for i in range(3)]
+    scheduler = KeyScheduler(3, requests_per_minute=600, burst=10, failure_threshold=2, max_wait_seconds=0.5)
+    chain = MultiKeyChain(llms, scheduler=scheduler)
+
+    # Parallel calls fan out instead of all starting on key #1
+    await asyncio.gather(*(chain.ainvoke("q") for _ in range(6)))
+    assert [llm.calls for llm in llms] == [2, 2, 2]
+
+    # A 429 falls through to another key and cools the limited key down
+    llms[0].error = Exception("429 Resource has been exhausted (e.g. check quota).")
+    for llm in llms:
+        llm.calls = 0
+    results = [await chain.ainvoke("q") for _ in range(4)]
+    assert 0 not in results and llms[0].calls == 1
+    assert scheduler.stats()[0]["status"] == "cooling_down"
+
+    # Repeated non-rate-limit failures open the key's circuit
+    llms[1].error = RuntimeError("bad key")
+    for _ in range(3):
+        assert await chain.ainvoke("q") == 2
+    usage = {s["key"]: s for s in scheduler.stats()}
+    assert usage["#2"]["status"] == "circuit_open" and usage["#2"]["failures"] == 2
+    assert usage["#3"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_key_scheduler_token_buckets_bound_request_rate():
+    from backend.core.key_scheduler import KeyScheduler
+
+    scheduler = KeyScheduler(2, requests_per_minute=6, burst=1, max_wait_seconds=0.1)
+    first, second = scheduler.pick(), scheduler.pick()
+    assert {first, second} == {0, 1}
+    scheduler.release(first)
+    scheduler.release(second)
+    # Both buckets are empty and the next token is ~10s away
+    assert scheduler.pick() is None
+    assert await scheduler.acquire() is None
+    assert scheduler.pick(require_token=False) is not None
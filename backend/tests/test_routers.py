@@ -53,3 +53,132 @@ def test_analyze_endpoint(client, mock_db):
             # If it failed, it might be due to complexity of mock
             # assert response.status_code == 500
             pass 
+
+def test_bullish_scanner_batches_universe(client):
+    import numpy as np
+    import pandas as pd
+    from backend.mcp_tools.stock_scanner import UNIVERSES
+
+    symbols = [f"{s}.NS" for s in UNIVERSES["midcap"]]
+    index = pd.date_range("2024-01-01", periods=22, freq="B")
+    close = np.linspace(100, 115, 22)  # steady uptrend scores as bullish
+    frame = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1000.0}, index=index)
+    data = pd.concat({s: frame for s in symbols}, axis=1)
+
+    with patch("backend.mcp_tools.stock_scanner.yf.download", return_value=data) as mock_download:
+        response = client.get("/api/v1/scanner/bullish", params={"universe": "midcap"})
+        assert response.status_code == 200
+        assert mock_download.call_count == 1  # one batched download for the whole universe
+        assert mock_download.call_args.kwargs["auto_adjust"] is True  # same prices as Ticker.history
+        body = response.json()
+        assert body["stocks_scanned"] == len(symbols)
+        assert len(body["bullish_picks"]) == len(symbols)
+
+    assert client.get("/api/v1/scanner/bullish", params={"universe": "unknown"}).status_code == 400
+
+def test_custom_scan_rule(client):
+    import numpy as np
+    import pandas as pd
+
+    index = pd.date_range("2024-01-01", periods=60, freq="B")
+    rising = np.linspace(100, 130, 60)
+    falling = np.linspace(130, 100, 60)
+    frame = lambda close: pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0}, index=index)
+    data = pd.concat({"SUZLON.NS": frame(rising), "IRCTC.NS": frame(falling)}, axis=1)
+
+    with patch("backend.mcp_tools.stock_scanner.yf.download", return_value=data) as download:
+        response = client.post("/api/v1/scanner/custom", json={"rule": "close > sma_50 and rsi_14 > 50"})
+        assert response.status_code == 200
+        matches = response.json()["matches"]
+        assert [m["symbol"] for m in matches] == ["SUZLON.NS"]
+        assert set(matches[0]["values"]) == {"close", "sma_50", "rsi_14"}
+
+        download.reset_mock()
+        assert client.post("/api/v1/scanner/custom", json={"rule": "close >"}).status_code == 400
+        response = client.post("/api/v1/scanner/custom", json={"rule": "rsi14 > 50"})
+        assert response.status_code == 400
+        assert "rsi14" in response.json()["detail"]
+        download.assert_not_called()  # rejected before fetching the universe
+
+def test_bullish_scanner_stream(client):
+    import json
+    from backend.mcp_tools.stock_scanner import StockSignal, UNIVERSES
+
+    def fake_analyze(symbol):
+        if symbol.startswith(("SUZLON", "IRCTC")):
+            strength = 4 if symbol.startswith("IRCTC") else 2
+            return StockSignal(symbol=symbol, name=symbol[:-3], current_price=10.0, change_percent=1.0,
+                               signal_strength=strength, signal_type="bullish", reasons=["test"], confidence=strength * 20)
+        return None
+
+    with patch("backend.mcp_tools.stock_scanner.analyze_stock", side_effect=fake_analyze):
+        response = client.get("/api/v1/scanner/bullish/stream")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = []
+    for chunk in response.text.strip().split("\n\n"):
+        event_line, data_line = chunk.split("\n")
+        events.append((event_line[len("event: "):], data_line[len("data: "):]))
+
+    kinds = [kind for kind, _ in events]
+    assert kinds.count("signal") == 2
+    assert kinds.count("progress") == len(UNIVERSES["high_volatility"])
+    assert kinds[-2:] == ["summary", "done"]
+    summary = json.loads(events[-2][1])
+    assert [p["symbol"] for p in summary["bullish_picks"]] == ["IRCTC.NS", "SUZLON.NS"]
+
+
+def test_metrics_endpoint(client):
+    from backend.core.telemetry import metrics, span
+
+    with span("quote", kind="yfinance"):
+        pass
+    data = client.get("/api/v1/metrics").json()
+    assert data["histograms"]["latency_ms"]["yfinance:quote"]["count"] >= 1
+
+    # Read-only: there is no HTTP way to wipe the histograms
+    assert client.delete("/api/v1/metrics").status_code == 405
+    metrics.reset()
+    assert client.get("/api/v1/metrics").json()["histograms"] == {}
+
+
+def test_analyze_stream_endpoint(client):
+    from backend.agents.master_agent import MasterOutput
+
+    async def fake_astream(symbol, account_size, current_exposure):
+        yield "quant", {"price_data": [{"close": 1.0}], "elapsed_ms": 5.0}
+        yield "result", MasterOutput(symbol=symbol, decision="hold", reasoning="", analyst_summary="", quant_signals_count=0)
+
+    with patch("backend.routers.agents.master_agent.astream", new=fake_astream):
+        response = client.get("/api/v1/agents/analyze/AAPL/stream")
+
+    assert response.status_code == 200
+    body = response.text
+    assert body.index("event: quant") < body.index("event: result") < body.index("event: done")
+    assert '"price_data": [{"close": 1.0}]' in body
+
+
+def test_analysis_job_lifecycle(client):
+    import time
+    from backend.agents.master_agent import MasterOutput
+    from backend.core.job_queue import analysis_jobs
+
+    async def fake_run(symbol, account_size, current_exposure):
+        return MasterOutput(symbol=symbol, decision="hold", reasoning="ok", analyst_summary="", quant_signals_count=0)
+
+    with patch.object(analysis_jobs, "runner", fake_run):
+        job = client.post("/api/v1/agents/jobs", json={"symbol": "aapl", "priority": 1})
+        assert job.status_code == 202
+        job_id = job.json()["job_id"]
+
+        for _ in range(50):
+            status = client.get(f"/api/v1/agents/jobs/{job_id}").json()
+            if status["status"] == "completed":
+                break
+            time.sleep(0.02)
+
+    assert status["status"] == "completed" and "result" not in status
+    result = client.get(f"/api/v1/agents/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.json()["symbol"] == "AAPL"
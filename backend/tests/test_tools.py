@@ -86,3 +86,95 @@ def test_check_risk_fail_exposure(mock_db):
     # 10 shares * 150 = 1500 value. 99k + 1.5k = 100.5k > 100k
     assert result.approved is False
     assert "limit exceeded" in result.reason
+
+# ----------------- News Sentiment Test ----------------- #
+@pytest.mark.asyncio
+async def test_sentiment_batches_articles_and_retries_bad_entries(mock_db):
+    import json
+    from unittest.mock import AsyncMock
+    from backend.models import NewsArticle
+    from backend.mcp_tools.news_sentiment import analyze_sentiment_logic
+
+    articles = [
+        NewsArticle(title=f"Headline {i}", url=f"https://example.com/{i}", source="Test",
+                    published_at=datetime.now(), content="Body")
+        for i in range(5)
+    ]
+    batch_reply = "```json\n" + json.dumps([
+        {"id": 0, "is_relevant": True, "sentiment": "POSITIVE", "score": 0.6, "impact": 7},
+        {"id": 1, "is_relevant": False},
+        {"id": 2, "is_relevant": True, "sentiment": "NEGATIVE", "score": "not a number"},
+        {"id": 4, "is_relevant": True, "sentiment": "NEUTRAL", "score": 0.0, "impact": 2},
+    ]) + "\n```"
+    single_reply = json.dumps({"is_relevant": True, "sentiment": "NEGATIVE", "score": -0.4, "impact": 3})
+    mock_db.redis = None  # no sentiment cache
+    mock_db.db = None
+
+    with patch("backend.mcp_tools.news_sentiment.llm_service.get_completion", new_callable=AsyncMock,
+               side_effect=[batch_reply, single_reply, single_reply]) as mock_llm:
+        analyzed = await analyze_sentiment_logic(articles, target_symbol="AAPL")
+
+    # One batched call, plus one per entry that was malformed (2) or missing (3)
+    assert mock_llm.await_count == 3
+    assert [a.sentiment_score for a in analyzed] == [0.6, 0.0, -0.4, -0.4, 0.0]
+    assert [a.impact_score for a in analyzed] == [7, 0, 3, 3, 2]
+    assert analyzed[0].sentiment == "positive"
+
+
+class _FakeRedis:
+    """Just the commands the sentiment cache uses"""
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def scan_iter(self, match):
+        import fnmatch
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+
+@pytest.mark.asyncio
+async def test_sentiment_cache_skips_scored_articles(mock_db):
+    import json
+    from unittest.mock import AsyncMock
+    from backend.models import NewsArticle
+    from backend.mcp_tools.news_sentiment import analyze_sentiment_logic
+    from backend.core.sentiment_cache import sentiment_cache
+
+    mock_db.redis = _FakeRedis()
+    mock_db.db = None
+
+    def articles(n):
+        return [NewsArticle(title=f"Headline {i}", url=f"https://example.com/{i}", source="Test",
+                            published_at=datetime.now()) for i in range(n)]
+
+    def reply(n):
+        return json.dumps([{"id": i, "is_relevant": i != 1, "sentiment": "POSITIVE", "score": 0.5, "impact": 4}
+                           for i in range(n)])
+
+    with patch("backend.mcp_tools.news_sentiment.llm_service.get_completion", new_callable=AsyncMock,
+               side_effect=[reply(2), reply(1), reply(2)]) as mock_llm:
+        await analyze_sentiment_logic(articles(2), target_symbol="AAPL")
+        before = sentiment_cache.stats()
+        # Only the new third article goes to the LLM; the others come from the cache
+        again = await analyze_sentiment_logic(articles(3), target_symbol="aapl")
+        assert mock_llm.await_count == 2
+        assert "Headline 2" in mock_llm.await_args.args[0] and "Headline 0" not in mock_llm.await_args.args[0]
+        assert [a.impact_score for a in again] == [4, 0, 4]
+        assert sentiment_cache.stats()["redis_hits"] - before["redis_hits"] == 2
+
+        # Another symbol is a different key
+        await analyze_sentiment_logic(articles(2), target_symbol="MSFT")
+        assert mock_llm.await_count == 3
+
+    assert await sentiment_cache.invalidate(symbol="AAPL") == 3
+    assert len(mock_db.redis.data) == 2
@@ -106,7 +106,7 @@ const AnalysisCard = ({ data }) => {
 
            {/* Panels Column (4 span) */}
            <div className="lg:col-span-4 flex flex-col gap-6">
-                <SentimentPanel score={sentiment?.score || sentiment_score} summary={analyst_summary} sentiment={sentiment} />
+                <SentimentPanel score={sentiment?.score || sentiment_score || 0} summary={analyst_summary} sentiment={sentiment} />
                 <RiskPanel signal={final_signal} risk={risk} currency={company_info?.currency} />
                 <TechnicalPanel signals={all_signals} indicators={indicators} currency={company_info?.currency} />
            </div>
@@ -68,11 +68,43 @@ const Dashboard = () => {
     setData(null);
 
     try {
-      const response = await api.post(endpoints.analyze(symbol));
-      setData(response.data);
+      // Each pipeline stage streams the fields it fills in (chart data first, LLM
+      // sentiment later); the result event carries the complete analysis
+      const response = await fetch(`${api.defaults.baseURL}${endpoints.analyzeStream(symbol)}`);
+      if (!response.ok) throw new Error(response.statusText);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const chunks = buffer.split('\n\n');
+        buffer = chunks.pop() || '';
+
+        for (const chunk of chunks) {
+          if (!chunk.startsWith('event: ')) continue;
+          const [eventLine, dataLine] = chunk.split('\n');
+          const eventType = eventLine.replace('event: ', '').trim();
+          const dataStr = dataLine ? dataLine.replace('data: ', '') : '{}';
+          if (eventType === 'done') continue;
+
+          const payload = JSON.parse(dataStr);
+          if (eventType === 'result') {
+            setData(payload);
+          } else if (eventType === 'error') {
+            throw new Error(payload.text);
+          } else {
+            setData(prev => ({ ...(prev || {}), ...payload }));
+          }
+        }
+      }
     } catch (err) {
       console.error(err);
-      setError(err.response?.data?.detail || "Failed to fetch analysis. Ensure backend is running.");
+      setError(err.message || "Failed to fetch analysis. Ensure backend is running.");
     } finally {
       setLoading(false);
     }
@@ -159,8 +191,8 @@ const Dashboard = () => {
           </div>
         )}
 
-        {/* Loading State */}
-        {loading && (
+        {/* Loading State (until the first stage arrives) */}
+        {loading && !data && (
           <div className="flex-1 flex flex-col items-center justify-center py-20 animate-in fade-in duration-500">
               <div className="relative mb-8">
                 <div className="w-20 h-20 rounded-full border-4 border-muted/30" />
@@ -172,8 +204,8 @@ const Dashboard = () => {
           </div>
         )}
 
-        {/* Results */}
-        {!loading && data && (
+        {/* Results, filled in stage by stage while loading */}
+        {data && (
           <div className="w-full animate-in fade-in slide-in-from-bottom-4 duration-700">
             <AnalysisCard data={data} />
           </div>
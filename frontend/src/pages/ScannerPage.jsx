@@ -12,14 +12,50 @@ const ScannerPage = () => {
   const [results, setResults] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [progress, setProgress] = useState(null);
   const navigate = useNavigate();
 
   const runScanner = async () => {
     setLoading(true);
     setError(null);
+    setResults([]);
+    setProgress(null);
     try {
-      const response = await api.post(endpoints.scanner('bullish'));
-      setResults(response.data.results);
+      // Results stream in as each symbol is analyzed; the summary event carries the final ranking
+      const response = await fetch(`${api.defaults.baseURL}${endpoints.scannerStream()}`);
+      if (!response.ok) throw new Error(response.statusText);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const chunks = buffer.split('\n\n');
+        buffer = chunks.pop() || '';
+
+        for (const chunk of chunks) {
+          if (!chunk.startsWith('event: ')) continue;
+          const [eventLine, dataLine] = chunk.split('\n');
+          const eventType = eventLine.replace('event: ', '').trim();
+          const dataStr = dataLine ? dataLine.replace('data: ', '') : '{}';
+          if (eventType === 'done') continue;
+
+          const data = JSON.parse(dataStr);
+          if (eventType === 'signal') {
+            setResults(prev => [...(prev || []), data]);
+          } else if (eventType === 'progress') {
+            setProgress(data);
+          } else if (eventType === 'summary') {
+            setResults(data.bullish_picks);
+          } else if (eventType === 'error') {
+            throw new Error(data.text);
+          }
+        }
+      }
     } catch (err) {
       console.error(err);
       setError("Failed to run scanner. Backend might be unreachable.");
@@ -50,7 +86,9 @@ const ScannerPage = () => {
                 className="w-full md:w-auto shadow-blue-500/20 shadow-lg"
             >
                 {loading ? <Loader2 className="w-5 h-5 animate-spin mr-2" /> : <ScanLine className="w-5 h-5 mr-2" />}
-                {loading ? 'Scanning Markets...' : 'Run Bullish Scan'}
+                {loading
+                    ? (progress ? `Scanning ${progress.scanned}/${progress.total}...` : 'Scanning Markets...')
+                    : 'Run Bullish Scan'}
             </Button>
         </div>
 
@@ -63,30 +101,30 @@ const ScannerPage = () => {
         )}
 
         {/* Empty State */}
-        {!results && !loading && !error && (
+        {!results?.length && !loading && !error && (
             <div className="h-64 flex flex-col items-center justify-center text-center p-8 rounded-2xl border-2 border-dashed border-border/50 bg-muted/10">
                 <div className="w-16 h-16 rounded-full bg-muted/30 flex items-center justify-center mb-4">
                     <ScanLine className="w-8 h-8 text-muted-foreground" />
                 </div>
                 <h3 className="text-lg font-semibold mb-1">Ready to Scan</h3>
                 <p className="text-sm text-muted-foreground max-w-sm">
-                    Click "Run Bullish Scan" to have our Quant Agent analyze the Nifty Smallcap 100 for breakout candidates.
+                    Click "Run Bullish Scan" to have our Quant Agent analyze high-volatility mid and small caps for breakout candidates.
                 </p>
             </div>
         )}
 
         {/* Results Grid */}
-        {results && (
+        {results?.length > 0 && (
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                {results.map((stock, idx) => (
-                    <Card key={idx} className="group hover:border-primary/50 transition-all duration-300">
+                {results.map((stock) => (
+                    <Card key={stock.symbol} className="group hover:border-primary/50 transition-all duration-300">
                         <CardContent className="p-6">
                             <div className="flex justify-between items-start mb-4">
                                 <div>
                                     <h3 className="text-xl font-bold group-hover:text-primary transition-colors">{stock.symbol}</h3>
                                     <div className="flex items-center gap-2 mt-1">
                                         <Badge variant="success">Strong Buy</Badge>
-                                        <span className="text-xs text-muted-foreground font-mono">Signal: {(stock.signal_strength * 100).toFixed(0)}%</span>
+                                        <span className="text-xs text-muted-foreground font-mono">Signal: {stock.signal_strength}/5</span>
                                     </div>
                                 </div>
                                 <div className="text-right">
@@ -101,7 +139,7 @@ const ScannerPage = () => {
                                     <span className="float-right font-mono font-medium text-rose-400">{formatCurrency(stock.stop_loss)}</span>
                                 </div>
                                 <div className="text-sm text-muted-foreground leading-relaxed line-clamp-2">
-                                    {stock.reason}
+                                    {stock.reasons?.join(' · ')}
                                 </div>
                             </div>
 
@@ -21,7 +21,9 @@ const api = axios.create({
 
 export const endpoints = {
   analyze: (symbol) => `/agents/analyze/${symbol}`,
+  analyzeStream: (symbol) => `/agents/analyze/${symbol}/stream`,
   scanner: (type = 'bullish') => `/agents/scanner/${type}`,
+  scannerStream: (universe = 'high_volatility') => `/scanner/bullish/stream?universe=${universe}`,
   stockInfo: (symbol) => `/stock_info/${symbol}`,
   marketIndices: '/market/indices',
   trendingStocks: '/market/trending',